@@ -2,11 +2,15 @@
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import health, items, users
+from app.api.v1.endpoints import auth, files, health, items, users
 
 api_router = APIRouter()
 
 # Include endpoint routers
 api_router.include_router(health.router, prefix="/health", tags=["health"])
+api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
+api_router.include_router(files.router, prefix="/files", tags=["files"])
+api_router.include_router(users.batch_router, tags=["users"])
+api_router.include_router(items.batch_router, tags=["items"])
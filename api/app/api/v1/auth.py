@@ -0,0 +1,52 @@
+"""Authentication dependencies for bearer access tokens."""
+
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.security import InvalidToken, token_service
+from app.services.repository import Repository
+from app.services.users import get_user_repository
+
+# auto_error=False so a missing token gets the same 401 as a bad one
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def require_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Dict[str, Any]:
+    """Dependency returning the claims of the request's bearer token.
+
+    Responds ``401`` when the token is missing, invalid or expired. Claims of
+    tokens seen before come from :data:`token_service`'s cache, so the
+    signature is only checked once per token.
+    """
+    if credentials is None:
+        raise unauthorized("Not authenticated")
+    try:
+        return token_service.verify(credentials.credentials)
+    except InvalidToken as exc:
+        raise unauthorized(str(exc))
+
+
+async def get_current_user(
+    claims: Dict[str, Any] = Depends(require_token),
+    repository: Repository = Depends(get_user_repository),
+) -> Dict[str, Any]:
+    """Dependency returning the active user the bearer token was issued to."""
+    try:
+        user = await repository.get(int(claims["sub"]))
+    except (KeyError, ValueError):
+        user = None
+    if user is None or not user.get("is_active", True):
+        raise unauthorized("User not found or inactive")
+    return user
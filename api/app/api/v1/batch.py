@@ -0,0 +1,113 @@
+"""Request parsing and per-row results for bulk endpoints."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+
+from app.core.config import settings
+from app.core.serialization import dump_json
+
+RowResult = Dict[str, Any]
+
+# Body of the bulk delete endpoints: a JSON array of record IDs
+record_ids: TypeAdapter = TypeAdapter(List[int])
+
+
+def _message(error: Dict[str, Any]) -> str:
+    field = ".".join(str(part) for part in error["loc"][1:])
+    return f"{field}: {error['msg']}" if field else error["msg"]
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get("$ref")
+        if ref is not None:
+            return _inline_refs(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {key: _inline_refs(value, defs) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(value, defs) for value in schema]
+    return schema
+
+
+def batch_body(adapter: TypeAdapter) -> Dict[str, Any]:
+    """OpenAPI ``requestBody`` for a route that reads its body with ``adapter``."""
+    schema = adapter.json_schema()
+    schema = _inline_refs(schema, schema.pop("$defs", {}))
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+async def validate_rows(
+    request: Request, adapter: TypeAdapter
+) -> Tuple[List[Any], Dict[int, str]]:
+    """Validate a JSON array request body with ``adapter`` in one pass.
+
+    Returns the validated rows, with ``None`` where a row failed, and an
+    error message per failed index. The body is parsed once, and a batch of
+    more than ``BATCH_MAX_ROWS`` rows is rejected before any row is
+    validated. Only when some rows fail are the others validated a second
+    time, since a ``ValidationError`` carries no partial result. A body that
+    is not a JSON array is rejected as a whole.
+    """
+    try:
+        raw = from_json(await request.body())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid JSON: {e}",
+        )
+    if isinstance(raw, list) and len(raw) > settings.BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may hold at most {settings.BATCH_MAX_ROWS} rows",
+        )
+    errors: Dict[int, str] = {}
+
+    try:
+        rows: List[Optional[Any]] = adapter.validate_python(raw)
+    except ValidationError as e:
+        for error in e.errors(include_url=False, include_context=False):
+            index = error["loc"][0] if error["loc"] else None
+            if not isinstance(index, int):
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=_message(error),
+                )
+            errors.setdefault(index, _message(error))
+
+        valid = [index for index in range(len(raw)) if index not in errors]
+        validated = adapter.validate_python([raw[i] for i in valid])
+        rows = [None] * len(raw)
+        for index, row in zip(valid, validated):
+            rows[index] = row
+    return rows, errors
+
+
+def row_ok(index: int, status_code: int, record_id: int) -> RowResult:
+    """Result for a row that was applied."""
+    return {"index": index, "status": status_code, "id": record_id, "error": None}
+
+
+def row_failed(
+    index: int, status_code: int, error: str, record_id: Optional[int] = None
+) -> RowResult:
+    """Result for a row that was rejected."""
+    return {"index": index, "status": status_code, "id": record_id, "error": error}
+
+
+def batch_response(results: List[RowResult]) -> Response:
+    """Serialize per-row results, in request order, as a ``BatchResult``."""
+    results.sort(key=lambda result: result["index"])
+    failed = sum(1 for result in results if result["status"] >= 400)
+    return Response(
+        content=dump_json(
+            {"succeeded": len(results) - failed, "failed": failed, "results": results}
+        ),
+        media_type="application/json",
+    )
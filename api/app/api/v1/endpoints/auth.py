@@ -0,0 +1,63 @@
+"""Authentication endpoints."""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.v1.auth import get_current_user, unauthorized
+from app.core.cache import invalidate
+from app.core.logging import get_logger
+from app.core.security import token_service
+from app.schemas.token import Token, TokenRequest
+from app.schemas.user import User
+from app.services.passwords import PasswordHashingBusy, password_hasher
+from app.services.repository import Repository
+from app.services.users import get_user_repository
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+@router.post("/token", response_model=Token)
+async def create_token(
+    credentials: TokenRequest,
+    repository: Repository = Depends(get_user_repository),
+) -> Token:
+    """Exchange an email and password for a bearer access token."""
+    logger.info("Issuing token", email=credentials.email)
+
+    user = await repository.get_by("email", credentials.email)
+    if user is None or not user.get("hashed_password") or not user["is_active"]:
+        raise unauthorized("Incorrect email or password")
+
+    hashed_password = user["hashed_password"]
+    try:
+        if not await password_hasher.verify(credentials.password, hashed_password):
+            raise unauthorized("Incorrect email or password")
+        if password_hasher.needs_rehash(hashed_password):
+            # Moves the stored hash to the current scheme and cost
+            new_hash = await password_hasher.hash(credentials.password)
+            await repository.update(
+                user["id"],
+                {"hashed_password": new_hash, "updated_at": datetime.utcnow()},
+            )
+            # The new version has a new ETag; drop the cached one
+            await invalidate("users", [user["id"]])
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    return Token(
+        access_token=token_service.issue(str(user["id"])),
+        expires_in=token_service.expire_minutes * 60,
+    )
+
+
+@router.get("/me", response_model=User)
+async def read_current_user(user: Dict[str, Any] = Depends(get_current_user)) -> Any:
+    """Get the user the bearer token was issued to."""
+    return User(**user)
@@ -0,0 +1,183 @@
+"""File upload and download endpoints."""
+
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.api.v1.uploads import UploadStream
+from app.core.conditional import is_not_modified, is_not_modified_since, not_modified
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.file import FileInfo
+from app.services.files import FileTooLarge, file_store, get_file_repository
+from app.services.repository import Repository
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            },
+            "application/octet-stream": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+        },
+    }
+}
+
+
+def too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {file_store.max_size} byte limit",
+    )
+
+
+def content_disposition(filename: str) -> str:
+    """``attachment`` disposition for ``filename``, as ``FileResponse`` sends it."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+@router.post(
+    "/",
+    response_model=FileInfo,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_UPLOAD_BODY,
+)
+async def upload_file(
+    request: Request,
+    response: Response,
+    filename: Optional[str] = Query(
+        None, description="File name for a raw (non-multipart) body"
+    ),
+    repository: Repository = Depends(get_file_repository),
+) -> Any:
+    """Upload a file.
+
+    Send it as the ``file`` field of a ``multipart/form-data`` body, or as
+    the raw body with ``?filename=``. The body is streamed to disk, and the
+    upload is rejected with ``413`` as soon as it passes ``MAX_FILE_SIZE``.
+    Content that is already stored is not stored twice; the response says
+    so with ``deduplicated``.
+    """
+    upload = UploadStream(request, filename)
+    content_length = request.headers.get("content-length", "")
+    if (
+        not upload.multipart
+        and content_length.isdigit()
+        and int(content_length) > file_store.max_size
+    ):
+        raise too_large()
+
+    try:
+        blob = await file_store.save(upload)
+    except FileTooLarge:
+        raise too_large()
+
+    logger.info(
+        "Stored file",
+        filename=upload.filename,
+        size=blob.size,
+        deduplicated=blob.deduplicated,
+    )
+    now = datetime.utcnow()
+    record = await repository.create(
+        {
+            "filename": upload.filename,
+            "content_type": upload.content_type,
+            "size": blob.size,
+            "sha256": blob.sha256,
+            "created_at": now,
+            "updated_at": now,
+        }
+    )
+
+    response.headers["Location"] = f"{request.url.path.rstrip('/')}/{record['id']}"
+    return FileInfo(**record, deduplicated=blob.deduplicated)
+
+
+@router.api_route(
+    "/{file_id}",
+    methods=["GET", "HEAD"],
+    response_class=FileResponse,
+    responses={
+        200: {"content": {"application/octet-stream": {}}},
+        206: {"description": "Partial content for a Range request"},
+        304: {"description": "Not modified"},
+    },
+)
+async def download_file(
+    file_id: int,
+    request: Request,
+    repository: Repository = Depends(get_file_repository),
+) -> Response:
+    """Download a file.
+
+    Supports ``Range`` (with ``If-Range``), ``If-None-Match`` against the
+    content hash ETag, and ``If-Modified-Since``. The file is sent from disk
+    in chunks, or, with ``FILES_ACCEL_REDIRECT`` set, handed to nginx to
+    send with ``sendfile``.
+    """
+    record = await repository.get(file_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+        )
+
+    etag = f'"{record["sha256"]}"'
+    if is_not_modified(request, etag) or is_not_modified_since(
+        request, record["created_at"]
+    ):
+        return not_modified(etag)
+
+    created_at = record["created_at"].replace(tzinfo=timezone.utc)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(created_at, usegmt=True),
+    }
+    if settings.FILES_ACCEL_REDIRECT:
+        # nginx handles Range and If-Range itself for internal redirects
+        return Response(
+            media_type=record["content_type"],
+            headers={
+                **headers,
+                "Content-Disposition": content_disposition(record["filename"]),
+                "X-Accel-Redirect": settings.FILES_ACCEL_REDIRECT.rstrip("/")
+                + "/"
+                + file_store.relative_path(record["sha256"]),
+            },
+        )
+
+    path = file_store.path(record["sha256"])
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        logger.error("File content missing", file_id=file_id, path=str(path))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="File content not found"
+        )
+
+    return FileResponse(
+        path,
+        media_type=record["content_type"],
+        filename=record["filename"],
+        headers=headers,
+        stat_result=stat_result,
+    )
@@ -7,8 +7,12 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
 from app import __version__
+from app.core.cache import response_cache
+from app.core.coalesce import request_coalescer
 from app.core.config import settings
+from app.core.health import HEALTHY, health_registry
 from app.core.logging import get_logger
+from app.core.security import token_service
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -25,33 +29,61 @@ async def health_check() -> Dict[str, str]:
     }
 
 
+@router.get("/live", response_class=JSONResponse)
+async def liveness() -> Dict[str, str]:
+    """Liveness probe: the process is up and serving.
+
+    Never checks dependencies, so an outage elsewhere does not get healthy
+    workers restarted.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready", response_class=JSONResponse)
+async def readiness() -> JSONResponse:
+    """Readiness probe: every critical dependency passed its last check.
+
+    Answers ``503`` otherwise, so the instance is taken out of rotation.
+    """
+    results = await health_registry.results()
+    ready = health_registry.is_ready(results)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "checks": {name: result.status for name, result in results.items()},
+        },
+    )
+
+
 @router.get("/detailed", response_class=JSONResponse)
-async def detailed_health_check() -> Dict[str, Any]:
-    """Detailed health check with system information."""
-    try:
-        # Add checks for external dependencies here
-        # e.g., database connection, redis connection, etc.
-
-        return {
-            "status": "healthy",
+async def detailed_health_check() -> Any:
+    """Detailed health check with system information.
+
+    Dependency checks come from the probe cache, with each probe's latency
+    and error. Answers ``503`` when a critical probe fails; failing
+    non-critical probes report ``degraded``.
+    """
+    results = await health_registry.results()
+    if not health_registry.is_ready(results):
+        overall = "unhealthy"
+    elif any(result.status != HEALTHY for result in results.values()):
+        overall = "degraded"
+    else:
+        overall = "healthy"
+
+    return JSONResponse(
+        status_code=503 if overall == "unhealthy" else 200,
+        content={
+            "status": overall,
             "timestamp": datetime.utcnow().isoformat(),
             "version": __version__,
             "environment": settings.ENVIRONMENT,
             "app_name": settings.APP_NAME,
             "debug": settings.DEBUG,
-            "checks": {
-                "api": "healthy",
-                # "database": "healthy",  # Uncomment when database is added
-                # "redis": "healthy",     # Uncomment when redis is added
-            },
-        }
-    except Exception as e:
-        logger.error("Health check failed", error=str(e))
-        return JSONResponse(
-            status_code=503,
-            content={
-                "status": "unhealthy",
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e),
-            },
-        )
+            "checks": {name: result.as_dict() for name, result in results.items()},
+            "cache": response_cache.stats(),
+            "token_cache": token_service.stats(),
+            "coalescing": request_coalescer.stats(),
+        },
+    )
@@ -1,120 +1,309 @@
 """Item endpoints."""
 
 from datetime import datetime
-from typing import List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from pydantic import TypeAdapter
 
+from app.api.v1.batch import (
+    batch_body,
+    batch_response,
+    record_ids,
+    row_failed,
+    row_ok,
+    validate_rows,
+)
+from app.api.v1.fields import fields_query, parse_fields
+from app.api.v1.pagination import (
+    NDJSON_MEDIA_TYPE,
+    PageParams,
+    list_filters,
+    list_page,
+    ndjson_response,
+    wants_ndjson,
+)
+from app.core.cache import cache_writes, cached, invalidate
+from app.core.conditional import (
+    if_match_version,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    record_etag,
+    version_conflict,
+)
 from app.core.logging import get_logger
-from app.schemas.item import Item, ItemCreate, ItemUpdate
+from app.core.serialization import dump_row, dump_rows, json_response
+from app.schemas.batch import BatchResult
+from app.schemas.item import Item, ItemBatchUpdate, ItemCreate, ItemUpdate
+from app.services.items import get_item_repository
+from app.services.repository import Repository, VersionConflictError
 
 logger = get_logger(__name__)
 router = APIRouter()
+# Bulk routes live at /items:batch, outside the /items prefix
+batch_router = APIRouter()
 
-# Mock data for demonstration
-MOCK_ITEMS = [
-    {
-        "id": 1,
-        "title": "Sample Item 1",
-        "description": "This is a sample item for demonstration",
-        "is_active": True,
-        "owner_id": 1,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-    },
-    {
-        "id": 2,
-        "title": "Sample Item 2",
-        "description": "Another sample item",
-        "is_active": True,
-        "owner_id": 2,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-    },
-]
-
-
-@router.get("/", response_model=List[Item])
-async def list_items() -> List[Item]:
-    """Get all items."""
-    logger.info("Fetching all items")
-    return [Item(**item) for item in MOCK_ITEMS]
+# Owner of items created without one, for the demo
+DEFAULT_OWNER_ID = 1
+
+_create_rows: TypeAdapter = TypeAdapter(List[ItemCreate])
+_update_rows: TypeAdapter = TypeAdapter(List[ItemBatchUpdate])
+
+
+@router.get(
+    "/",
+    response_model=List[Item],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_items(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    owner_id: Optional[int] = Query(None, description="Only this user's items"),
+    is_active: Optional[bool] = Query(None, description="Only (in)active items"),
+    fields: Optional[str] = fields_query(Item),
+    repository: Repository = Depends(get_item_repository),
+) -> Any:
+    """Get a page of items.
+
+    Pass the ``X-Next-Cursor`` response header back as ``after`` to fetch the
+    next page. Send ``Accept: application/x-ndjson`` to stream every item after
+    the cursor instead. ``owner_id`` and ``is_active`` are answered from
+    indexes, so filtering does not scan the collection. ``fields`` picks the
+    columns to return.
+    """
+    filters = list_filters(owner_id=owner_id, is_active=is_active)
+    columns = parse_fields(Item, fields)
+    logger.info("Fetching all items", **filters)
+
+    if wants_ndjson(request):
+        return ndjson_response(repository, Item, page, filters, columns)
+
+    etag = make_etag("items", await repository.collection_version(), *columns or ())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    rows = await list_page(repository, page, request, response, filters)
+    return json_response(dump_rows(Item, rows, columns), response)
 
 
 @router.get("/{item_id}", response_model=Item)
-async def get_item(item_id: int) -> Item:
-    """Get an item by ID."""
+@cached("items", "item_id")
+async def get_item(
+    item_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = fields_query(Item),
+    repository: Repository = Depends(get_item_repository),
+) -> Any:
+    """Get an item by ID, or only the ``fields`` asked for."""
     logger.info("Fetching item", item_id=item_id)
+    columns = parse_fields(Item, fields)
 
-    item = next((item for item in MOCK_ITEMS if item["id"] == item_id), None)
+    item = await repository.get(item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
         )
 
+    etag = record_etag(item, columns or ())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if columns:
+        return json_response(dump_row(Item, item, columns), response)
     return Item(**item)
 
 
 @router.post("/", response_model=Item, status_code=status.HTTP_201_CREATED)
-async def create_item(item_data: ItemCreate) -> Item:
+@cache_writes("items")
+async def create_item(
+    item_data: ItemCreate,
+    repository: Repository = Depends(get_item_repository),
+) -> Item:
     """Create a new item."""
     logger.info("Creating new item", title=item_data.title)
 
     # Create new item
-    new_item = {
-        "id": len(MOCK_ITEMS) + 1,
-        "title": item_data.title,
-        "description": item_data.description,
-        "is_active": item_data.is_active,
-        "owner_id": 1,  # Default owner for demo
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-    }
-
-    MOCK_ITEMS.append(new_item)
+    new_item = await repository.create(
+        {
+            "title": item_data.title,
+            "description": item_data.description,
+            "is_active": item_data.is_active,
+            "owner_id": item_data.owner_id or DEFAULT_OWNER_ID,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+    )
 
     return Item(**new_item)
 
 
 @router.put("/{item_id}", response_model=Item)
-async def update_item(item_id: int, item_data: ItemUpdate) -> Item:
-    """Update an item."""
+@cache_writes("items", "item_id")
+async def update_item(
+    item_id: int,
+    item_data: ItemUpdate,
+    request: Request,
+    response: Response,
+    repository: Repository = Depends(get_item_repository),
+) -> Item:
+    """Update an item.
+
+    Send the ``ETag`` from a previous read as ``If-Match`` to get a ``412``,
+    or the ``version`` it returned in the body to get a ``409``, instead of
+    overwriting someone else's change.
+    """
     logger.info("Updating item", item_id=item_id)
 
-    item_index = next(
-        (i for i, item in enumerate(MOCK_ITEMS) if item["id"] == item_id), None
-    )
+    # Update item data
+    update_data = item_data.model_dump(exclude_unset=True)
+    expected = update_data.pop("version", None)
+    matched = await if_match_version(request, repository, item_id, "Item not found")
+    precondition = expected is None and matched is not None
+    if precondition:
+        expected = matched
+    update_data["updated_at"] = datetime.utcnow()
 
-    if item_index is None:
+    try:
+        item = await repository.update(item_id, update_data, expected)
+    except VersionConflictError as e:
+        raise version_conflict(e.actual, precondition)
+    if item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
         )
 
-    # Update item data
-    item = MOCK_ITEMS[item_index]
-    update_data = item_data.dict(exclude_unset=True)
-
-    for field, value in update_data.items():
-        if field in item:
-            item[field] = value
-
-    item["updated_at"] = datetime.utcnow()
-
+    response.headers["ETag"] = record_etag(item)
     return Item(**item)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_item(item_id: int) -> None:
-    """Delete an item."""
+@cache_writes("items", "item_id")
+async def delete_item(
+    item_id: int,
+    request: Request,
+    repository: Repository = Depends(get_item_repository),
+) -> None:
+    """Delete an item, if it is still at the ETag sent as ``If-Match``."""
     logger.info("Deleting item", item_id=item_id)
 
-    item_index = next(
-        (i for i, item in enumerate(MOCK_ITEMS) if item["id"] == item_id), None
-    )
-
-    if item_index is None:
+    expected = await if_match_version(request, repository, item_id, "Item not found")
+    try:
+        deleted = await repository.delete(item_id, expected)
+    except VersionConflictError as e:
+        raise version_conflict(e.actual, precondition=True)
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
         )
 
-    MOCK_ITEMS.pop(item_index)
+
+@batch_router.post(
+    "/items:batch", response_model=BatchResult, openapi_extra=batch_body(_create_rows)
+)
+async def create_items(
+    request: Request,
+    repository: Repository = Depends(get_item_repository),
+) -> Any:
+    """Create many items in one request.
+
+    The body is a JSON array of items. Rows succeed or fail independently and
+    the response reports a status per row, in request order.
+    """
+    rows, errors = await validate_rows(request, _create_rows)
+    logger.info("Creating items in bulk", rows=len(rows), invalid=len(errors))
+
+    now = datetime.utcnow()
+    pending = [index for index, row in enumerate(rows) if row is not None]
+    created = await repository.create_many(
+        [
+            {
+                "title": rows[index].title,
+                "description": rows[index].description,
+                "is_active": rows[index].is_active,
+                "owner_id": rows[index].owner_id or DEFAULT_OWNER_ID,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index in pending
+        ]
+    )
+
+    results = [row_failed(index, 422, error) for index, error in errors.items()]
+    for index, item in zip(pending, created):
+        results.append(row_ok(index, 201, item["id"]))
+    return batch_response(results)
+
+
+@batch_router.patch(
+    "/items:batch", response_model=BatchResult, openapi_extra=batch_body(_update_rows)
+)
+async def update_items(
+    request: Request,
+    repository: Repository = Depends(get_item_repository),
+) -> Any:
+    """Update many items in one request.
+
+    The body is a JSON array of partial items, each with its ``id``. Rows
+    that include a ``version`` fail with ``409`` if the item has moved on.
+    """
+    rows, errors = await validate_rows(request, _update_rows)
+    logger.info("Updating items in bulk", rows=len(rows), invalid=len(errors))
+
+    now = datetime.utcnow()
+    pending = [index for index, row in enumerate(rows) if row is not None]
+    changes = []
+    versions = []
+    for index in pending:
+        update_data = rows[index].model_dump(exclude_unset=True, exclude={"id"})
+        versions.append(update_data.pop("version", None))
+        update_data["updated_at"] = now
+        changes.append((rows[index].id, update_data))
+    updated = await repository.update_many(changes, versions)
+    await invalidate("items", [item_id for item_id, _ in changes])
+
+    results = [row_failed(index, 422, error) for index, error in errors.items()]
+    for index, (item_id, _), item in zip(pending, changes, updated):
+        if isinstance(item, VersionConflictError):
+            results.append(row_failed(index, 409, str(item), item_id))
+        elif item is None:
+            results.append(row_failed(index, 404, "Item not found", item_id))
+        else:
+            results.append(row_ok(index, 200, item_id))
+    return batch_response(results)
+
+
+@batch_router.delete(
+    "/items:batch", response_model=BatchResult, openapi_extra=batch_body(record_ids)
+)
+async def delete_items(
+    request: Request,
+    repository: Repository = Depends(get_item_repository),
+) -> Any:
+    """Delete many items in one request. The body is a JSON array of IDs."""
+    item_ids, errors = await validate_rows(request, record_ids)
+    logger.info("Deleting items in bulk", rows=len(item_ids), invalid=len(errors))
+
+    pending = [index for index, item_id in enumerate(item_ids) if item_id is not None]
+    deleted = await repository.delete_many([item_ids[index] for index in pending])
+    await invalidate("items", [item_ids[index] for index in pending])
+
+    results = [row_failed(index, 422, error) for index, error in errors.items()]
+    for index, found in zip(pending, deleted):
+        if found:
+            results.append(row_ok(index, 204, item_ids[index]))
+        else:
+            results.append(row_failed(index, 404, "Item not found", item_ids[index]))
+    return batch_response(results)
@@ -1,124 +1,434 @@
 """User endpoints."""
 
 from datetime import datetime
-from typing import List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from pydantic import TypeAdapter
 
+from app.api.v1.batch import (
+    batch_body,
+    batch_response,
+    record_ids,
+    row_failed,
+    row_ok,
+    validate_rows,
+)
+from app.api.v1.fields import fields_query, parse_fields
+from app.api.v1.pagination import (
+    NDJSON_MEDIA_TYPE,
+    PageParams,
+    list_filters,
+    list_page,
+    ndjson_response,
+    wants_ndjson,
+)
+from app.core.cache import cache_writes, cached, invalidate
+from app.core.conditional import (
+    if_match_version,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    record_etag,
+    version_conflict,
+)
 from app.core.logging import get_logger
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.core.serialization import dump_row, dump_rows, json_response
+from app.schemas.batch import BatchResult
+from app.schemas.item import Item
+from app.schemas.user import User, UserBatchUpdate, UserCreate, UserUpdate
+from app.services.items import get_item_repository
+from app.services.passwords import PasswordHashingBusy, password_hasher
+from app.services.repository import (
+    DuplicateKeyError,
+    Repository,
+    VersionConflictError,
+)
+from app.services.users import get_user_repository
 
 logger = get_logger(__name__)
 router = APIRouter()
+# Bulk routes live at /users:batch, outside the /users prefix
+batch_router = APIRouter()
+
+_create_rows: TypeAdapter = TypeAdapter(List[UserCreate])
+_update_rows: TypeAdapter = TypeAdapter(List[UserBatchUpdate])
 
-# Mock data for demonstration
-MOCK_USERS = [
-    {
-        "id": 1,
-        "email": "alice@example.com",
-        "name": "Alice Johnson",
-        "is_active": True,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-    },
-    {
-        "id": 2,
-        "email": "bob@example.com",
-        "name": "Bob Smith",
-        "is_active": True,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-    },
-]
 
+HASHING_BUSY = "Too many password changes in progress, retry shortly"
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password off the event loop, or fail with a 503 when busy."""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=HASHING_BUSY,
+            headers={"Retry-After": "1"},
+        )
 
-@router.get("/", response_model=List[User])
-async def list_users() -> List[User]:
-    """Get all users."""
-    logger.info("Fetching all users")
-    return [User(**user) for user in MOCK_USERS]
+
+@router.get(
+    "/",
+    response_model=List[User],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_users(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    is_active: Optional[bool] = Query(None, description="Only (in)active users"),
+    fields: Optional[str] = fields_query(User),
+    repository: Repository = Depends(get_user_repository),
+) -> Any:
+    """Get a page of users.
+
+    Pass the ``X-Next-Cursor`` response header back as ``after`` to fetch the
+    next page. Send ``Accept: application/x-ndjson`` to stream every user after
+    the cursor instead. ``is_active`` is answered from an index. ``fields``
+    picks the columns to return.
+    """
+    filters = list_filters(is_active=is_active)
+    columns = parse_fields(User, fields)
+    logger.info("Fetching all users", **filters)
+
+    if wants_ndjson(request):
+        return ndjson_response(repository, User, page, filters, columns)
+
+    etag = make_etag("users", await repository.collection_version(), *columns or ())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    rows = await list_page(repository, page, request, response, filters)
+    return json_response(dump_rows(User, rows, columns), response)
 
 
 @router.get("/{user_id}", response_model=User)
-async def get_user(user_id: int) -> User:
-    """Get a user by ID."""
+@cached("users", "user_id")
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = fields_query(User),
+    repository: Repository = Depends(get_user_repository),
+) -> Any:
+    """Get a user by ID, or only the ``fields`` asked for."""
     logger.info("Fetching user", user_id=user_id)
+    columns = parse_fields(User, fields)
 
-    user = next((user for user in MOCK_USERS if user["id"] == user_id), None)
+    user = await repository.get(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
+    etag = record_etag(user, columns or ())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if columns:
+        return json_response(dump_row(User, user, columns), response)
     return User(**user)
 
 
+@router.get(
+    "/{user_id}/items",
+    response_model=List[Item],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_user_items(
+    user_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    is_active: Optional[bool] = Query(None, description="Only (in)active items"),
+    fields: Optional[str] = fields_query(Item),
+    repository: Repository = Depends(get_user_repository),
+    items: Repository = Depends(get_item_repository),
+) -> Any:
+    """Get a page of the items a user owns.
+
+    Paginates and streams like ``GET /items/``, served from the item
+    repository's owner index.
+    """
+    logger.info("Fetching user items", user_id=user_id)
+    columns = parse_fields(Item, fields)
+
+    if await repository.get(user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+
+    filters = list_filters(owner_id=user_id, is_active=is_active)
+    if wants_ndjson(request):
+        return ndjson_response(items, Item, page, filters, columns)
+
+    etag = make_etag("items", await items.collection_version(), *columns or ())
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    rows = await list_page(items, page, request, response, filters)
+    return json_response(dump_rows(Item, rows, columns), response)
+
+
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
-async def create_user(user_data: UserCreate) -> User:
+@cache_writes("users")
+async def create_user(
+    user_data: UserCreate,
+    repository: Repository = Depends(get_user_repository),
+) -> User:
     """Create a new user."""
     logger.info("Creating new user", email=user_data.email)
 
-    # Check if user already exists
-    if any(user["email"] == user_data.email for user in MOCK_USERS):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists",
-        )
+    hashed_password = await hash_password(user_data.password)
 
     # Create new user
     new_user = {
-        "id": len(MOCK_USERS) + 1,
         "email": user_data.email,
         "name": user_data.name,
+        "hashed_password": hashed_password,
         "is_active": user_data.is_active,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
     }
 
-    MOCK_USERS.append(new_user)
+    try:
+        new_user = await repository.create(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists",
+        )
 
     return User(**new_user)
 
 
 @router.put("/{user_id}", response_model=User)
-async def update_user(user_id: int, user_data: UserUpdate) -> User:
-    """Update a user."""
+@cache_writes("users", "user_id")
+async def update_user(
+    user_id: int,
+    user_data: UserUpdate,
+    request: Request,
+    response: Response,
+    repository: Repository = Depends(get_user_repository),
+) -> User:
+    """Update a user.
+
+    Send the ``ETag`` from a previous read as ``If-Match`` to get a ``412``,
+    or the ``version`` it returned in the body to get a ``409``, instead of
+    overwriting someone else's change.
+    """
     logger.info("Updating user", user_id=user_id)
 
-    user_index = next(
-        (i for i, user in enumerate(MOCK_USERS) if user["id"] == user_id), None
-    )
+    # Update user data
+    update_data = user_data.model_dump(exclude_unset=True)
+    expected = update_data.pop("version", None)
+    matched = await if_match_version(request, repository, user_id, "User not found")
+    precondition = expected is None and matched is not None
+    if precondition:
+        expected = matched
+    if "password" in update_data:
+        password = update_data.pop("password")
+        if password is not None:
+            update_data["hashed_password"] = await hash_password(password)
+    update_data["updated_at"] = datetime.utcnow()
 
-    if user_index is None:
+    try:
+        user = await repository.update(user_id, update_data, expected)
+    except DuplicateKeyError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists",
         )
+    except VersionConflictError as e:
+        raise version_conflict(e.actual, precondition)
 
-    # Update user data
-    user = MOCK_USERS[user_index]
-    update_data = user_data.dict(exclude_unset=True)
-
-    for field, value in update_data.items():
-        if field in user:
-            user[field] = value
-
-    user["updated_at"] = datetime.utcnow()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
 
+    response.headers["ETag"] = record_etag(user)
     return User(**user)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(user_id: int) -> None:
-    """Delete a user."""
+@cache_writes("users", "user_id")
+async def delete_user(
+    user_id: int,
+    request: Request,
+    repository: Repository = Depends(get_user_repository),
+) -> None:
+    """Delete a user, if it is still at the ETag sent as ``If-Match``."""
     logger.info("Deleting user", user_id=user_id)
 
-    user_index = next(
-        (i for i, user in enumerate(MOCK_USERS) if user["id"] == user_id), None
-    )
-
-    if user_index is None:
+    expected = await if_match_version(request, repository, user_id, "User not found")
+    try:
+        deleted = await repository.delete(user_id, expected)
+    except VersionConflictError as e:
+        raise version_conflict(e.actual, precondition=True)
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    MOCK_USERS.pop(user_index)
+
+@batch_router.post(
+    "/users:batch", response_model=BatchResult, openapi_extra=batch_body(_create_rows)
+)
+async def create_users(
+    request: Request,
+    repository: Repository = Depends(get_user_repository),
+) -> Any:
+    """Create many users in one request.
+
+    The body is a JSON array of users. Rows succeed or fail independently and
+    the response reports a status per row, in request order. Rows whose
+    password could not be hashed while the hashing pool is busy fail with
+    ``503`` and can be sent again.
+    """
+    rows, errors = await validate_rows(request, _create_rows)
+    logger.info("Creating users in bulk", rows=len(rows), invalid=len(errors))
+
+    now = datetime.utcnow()
+    pending = [index for index, row in enumerate(rows) if row is not None]
+    hashed = await password_hasher.hash_many(
+        [rows[index].password for index in pending]
+    )
+    busy = [index for index, password in zip(pending, hashed) if password is None]
+    ready = [
+        (index, password)
+        for index, password in zip(pending, hashed)
+        if password is not None
+    ]
+    created = await repository.create_many(
+        [
+            {
+                "email": rows[index].email,
+                "name": rows[index].name,
+                "hashed_password": hashed_password,
+                "is_active": rows[index].is_active,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index, hashed_password in ready
+        ]
+    )
+
+    results = [row_failed(index, 422, error) for index, error in errors.items()]
+    results += [row_failed(index, 503, HASHING_BUSY) for index in busy]
+    for (index, _), user in zip(ready, created):
+        if isinstance(user, DuplicateKeyError):
+            results.append(
+                row_failed(index, 400, "User with this email already exists")
+            )
+        else:
+            results.append(row_ok(index, 201, user["id"]))
+    return batch_response(results)
+
+
+@batch_router.patch(
+    "/users:batch", response_model=BatchResult, openapi_extra=batch_body(_update_rows)
+)
+async def update_users(
+    request: Request,
+    repository: Repository = Depends(get_user_repository),
+) -> Any:
+    """Update many users in one request.
+
+    The body is a JSON array of partial users, each with its ``id``. Rows
+    that include a ``version`` fail with ``409`` if the user has moved on,
+    and rows whose new password could not be hashed fail with ``503``.
+    """
+    rows, errors = await validate_rows(request, _update_rows)
+    logger.info("Updating users in bulk", rows=len(rows), invalid=len(errors))
+
+    now = datetime.utcnow()
+    pending = [index for index, row in enumerate(rows) if row is not None]
+    changes = []
+    versions = []
+    for index in pending:
+        update_data = rows[index].model_dump(exclude_unset=True, exclude={"id"})
+        versions.append(update_data.pop("version", None))
+        update_data["updated_at"] = now
+        changes.append((rows[index].id, update_data))
+
+    rehashed = [
+        position
+        for position, (_, data) in enumerate(changes)
+        if data.get("password") is not None
+    ]
+    hashed = await password_hasher.hash_many(
+        [changes[position][1]["password"] for position in rehashed]
+    )
+    busy = set()
+    for position, hashed_password in zip(rehashed, hashed):
+        if hashed_password is None:
+            busy.add(position)
+        else:
+            changes[position][1]["hashed_password"] = hashed_password
+    for _, data in changes:
+        data.pop("password", None)
+
+    results = [row_failed(index, 422, error) for index, error in errors.items()]
+    results += [
+        row_failed(pending[position], 503, HASHING_BUSY, changes[position][0])
+        for position in busy
+    ]
+    kept = [position for position in range(len(changes)) if position not in busy]
+    pending = [pending[position] for position in kept]
+    changes = [changes[position] for position in kept]
+    versions = [versions[position] for position in kept]
+
+    updated = await repository.update_many(changes, versions)
+    await invalidate("users", [user_id for user_id, _ in changes])
+
+    for index, (user_id, _), user in zip(pending, changes, updated):
+        if isinstance(user, DuplicateKeyError):
+            results.append(
+                row_failed(index, 400, "User with this email already exists", user_id)
+            )
+        elif isinstance(user, VersionConflictError):
+            results.append(row_failed(index, 409, str(user), user_id))
+        elif user is None:
+            results.append(row_failed(index, 404, "User not found", user_id))
+        else:
+            results.append(row_ok(index, 200, user_id))
+    return batch_response(results)
+
+
+@batch_router.delete(
+    "/users:batch", response_model=BatchResult, openapi_extra=batch_body(record_ids)
+)
+async def delete_users(
+    request: Request,
+    repository: Repository = Depends(get_user_repository),
+) -> Any:
+    """Delete many users in one request. The body is a JSON array of IDs."""
+    user_ids, errors = await validate_rows(request, record_ids)
+    logger.info("Deleting users in bulk", rows=len(user_ids), invalid=len(errors))
+
+    pending = [index for index, user_id in enumerate(user_ids) if user_id is not None]
+    deleted = await repository.delete_many([user_ids[index] for index in pending])
+    await invalidate("users", [user_ids[index] for index in pending])
+
+    results = [row_failed(index, 422, error) for index, error in errors.items()]
+    for index, found in zip(pending, deleted):
+        if found:
+            results.append(row_ok(index, 204, user_ids[index]))
+        else:
+            results.append(row_failed(index, 404, "User not found", user_ids[index]))
+    return batch_response(results)
@@ -0,0 +1,49 @@
+"""Sparse fieldsets: the ``fields`` query parameter."""
+
+import functools
+from typing import Any, Optional, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+from app.core.serialization import Fields
+
+
+def fields_query(model: Type[BaseModel]) -> Any:
+    """The ``fields`` query parameter for responses shaped like ``model``.
+
+    Handlers take the raw string and call :func:`parse_fields`; a plain
+    parameter is cheaper for FastAPI to resolve than a sub-dependency.
+    """
+    return Query(
+        None, description=f"Comma-separated subset of: {', '.join(model.model_fields)}"
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_fields(model: Type[BaseModel], value: Optional[str]) -> Fields:
+    """Validate a comma-separated field list against ``model``.
+
+    Returns the requested names in the model's declaration order, so every
+    spelling of a subset shares one cached serializer, or ``None`` when the
+    parameter is absent or names every field. Raises a ``400`` for names the
+    model does not declare.
+    """
+    if value is None:
+        return None
+
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Unknown fields: {', '.join(sorted(unknown))}; "
+                if unknown
+                else "No fields requested; "
+            )
+            + f"choose from {', '.join(model.model_fields)}",
+        )
+    if len(requested) == len(model.model_fields):
+        return None
+    return tuple(name for name in model.model_fields if name in requested)
@@ -0,0 +1,137 @@
+"""Keyset pagination and NDJSON streaming helpers for list endpoints."""
+
+import base64
+import binascii
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Type
+
+from fastapi import HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.serialization import Fields, dump_ndjson
+from app.services.repository import Repository
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(record_id: int) -> str:
+    """Encode a record ID as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"id:{record_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by :func:`encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+class PageParams:
+    """Query parameters for keyset pagination."""
+
+    def __init__(
+        self,
+        after: Optional[str] = Query(
+            None, description="Opaque cursor returned as X-Next-Cursor"
+        ),
+        limit: Optional[int] = Query(
+            None, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Page size"
+        ),
+    ) -> None:
+        self.after = decode_cursor(after) if after is not None else None
+        self.limit = limit
+
+
+def list_filters(**values: Any) -> Dict[str, Any]:
+    """The filters a client actually sent; ``None`` means not filtered."""
+    return {field: value for field, value in values.items() if value is not None}
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Return whether the client asked for a streamed NDJSON response."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def list_page(
+    repository: Repository,
+    page: PageParams,
+    request: Request,
+    response: Response,
+    filters: Optional[Mapping[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch one page of records and set the next-page headers.
+
+    One extra row is read to decide whether a next page exists, so the last
+    page never carries a cursor.
+    """
+    limit = page.limit or settings.PAGINATION_DEFAULT_LIMIT
+    rows = await repository.list(after=page.after, limit=limit + 1, filters=filters)
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        cursor = encode_cursor(rows[-1]["id"])
+        next_url = request.url.include_query_params(after=cursor, limit=limit)
+        response.headers["X-Next-Cursor"] = cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    return rows
+
+
+async def iter_ndjson(
+    repository: Repository,
+    model: Type[BaseModel],
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Fields = None,
+) -> AsyncIterator[bytes]:
+    """Yield records as NDJSON, reading the repository one chunk at a time.
+
+    Each chunk is a fresh keyset query, so memory stays bounded by
+    ``STREAM_CHUNK_SIZE`` and concurrent writes never invalidate the stream.
+    """
+    remaining = limit
+    chunk_size = settings.STREAM_CHUNK_SIZE
+
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        rows = await repository.list(after=after, limit=size, filters=filters)
+        if not rows:
+            return
+
+        yield dump_ndjson(model, rows, fields)
+
+        after = rows[-1]["id"]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            return
+
+
+def ndjson_response(
+    repository: Repository,
+    model: Type[BaseModel],
+    page: PageParams,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Fields = None,
+) -> StreamingResponse:
+    """Stream every record after the cursor as NDJSON."""
+    return StreamingResponse(
+        iter_ndjson(
+            repository,
+            model,
+            after=page.after,
+            limit=page.limit,
+            filters=filters,
+            fields=fields,
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
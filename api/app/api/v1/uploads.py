@@ -0,0 +1,134 @@
+"""Streaming request-body readers for file uploads."""
+
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+DEFAULT_FILENAME = "upload"
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+def clean_filename(filename: str) -> str:
+    """Drop any directory part a client sent along with the name."""
+    return filename.replace("\\", "/").rsplit("/", 1)[-1].strip() or DEFAULT_FILENAME
+
+
+class UploadStream:
+    """The uploaded file in a request, read chunk by chunk.
+
+    Iterating yields the file's bytes as they arrive. For
+    ``multipart/form-data`` bodies, the first part named ``field`` that
+    carries a filename is the file; other parts are skipped unread, and the
+    part's filename and content type are available once iteration reaches
+    the file. Any other body is taken as the raw file content, named by
+    ``filename`` and typed by the request's ``Content-Type``.
+    """
+
+    def __init__(
+        self, request: Request, filename: Optional[str] = None, field: str = "file"
+    ) -> None:
+        self.request = request
+        self.field = field
+        self.filename = clean_filename(filename or DEFAULT_FILENAME)
+        content_type, params = parse_options_header(
+            request.headers.get("content-type", "")
+        )
+        self.multipart = content_type == b"multipart/form-data"
+        self.content_type = (
+            content_type.decode("latin-1") if content_type else DEFAULT_CONTENT_TYPE
+        )
+        self._boundary = params.get(b"boundary")
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        if self.multipart:
+            return self._multipart()
+        return self._raw()
+
+    async def _raw(self) -> AsyncIterator[bytes]:
+        async for chunk in self.request.stream():
+            if chunk:
+                yield chunk
+
+    async def _multipart(self) -> AsyncIterator[bytes]:
+        if not self._boundary:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Missing boundary in multipart body",
+            )
+
+        data: List[bytes] = []
+        headers: Dict[bytes, bytes] = {}
+        field_name = bytearray()
+        field_value = bytearray()
+        state = {"in_file": False, "found": False}
+
+        def on_part_begin() -> None:
+            headers.clear()
+
+        def on_header_field(buf: bytes, start: int, end: int) -> None:
+            field_name.extend(buf[start:end])
+
+        def on_header_value(buf: bytes, start: int, end: int) -> None:
+            field_value.extend(buf[start:end])
+
+        def on_header_end() -> None:
+            headers[bytes(field_name).lower()] = bytes(field_value)
+            field_name.clear()
+            field_value.clear()
+
+        def on_headers_finished() -> None:
+            _, params = parse_options_header(headers.get(b"content-disposition", b""))
+            filename = params.get(b"filename")
+            if (
+                not state["found"]
+                and params.get(b"name") == self.field.encode()
+                and filename is not None
+            ):
+                state["in_file"] = state["found"] = True
+                self.filename = clean_filename(filename.decode("utf-8", "replace"))
+                content_type = headers.get(b"content-type")
+                self.content_type = (
+                    content_type.decode("latin-1")
+                    if content_type
+                    else DEFAULT_CONTENT_TYPE
+                )
+
+        def on_part_data(buf: bytes, start: int, end: int) -> None:
+            if state["in_file"]:
+                data.append(buf[start:end])
+
+        def on_part_end() -> None:
+            state["in_file"] = False
+
+        parser = MultipartParser(
+            self._boundary,
+            {
+                "on_part_begin": on_part_begin,
+                "on_header_field": on_header_field,
+                "on_header_value": on_header_value,
+                "on_header_end": on_header_end,
+                "on_headers_finished": on_headers_finished,
+                "on_part_data": on_part_data,
+                "on_part_end": on_part_end,
+            },
+        )
+        try:
+            async for chunk in self.request.stream():
+                parser.write(chunk)
+                if data:
+                    yield b"".join(data)
+                    data.clear()
+            parser.finalize()
+        except MultipartParseError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Malformed multipart body",
+            )
+
+        if not state["found"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No file in the {self.field!r} field",
+            )
@@ -0,0 +1,306 @@
+"""Two-tier response cache: an in-process LRU in front of optional Redis."""
+
+import asyncio
+import functools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from .conditional import is_not_modified, model_etag, not_modified
+from .config import settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+INVALIDATION_CHANNEL = "oshima:cache:invalidate"
+
+
+class LRUCache:
+    """Bounded LRU mapping with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ResponseCache:
+    """Serialized-response cache with a local LRU tier and a Redis tier.
+
+    Reads check the local tier first, then Redis, and backfill the local tier
+    on a Redis hit. Writes go to both tiers. When Redis is shared by several
+    workers, every write is also published so other workers drop their local
+    copy; the local TTL bounds staleness if a message is missed. Redis errors
+    are logged and treated as misses so the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        local_ttl: float = 30,
+        redis_ttl: int = 300,
+        prefix: str = "oshima:cache:",
+    ) -> None:
+        self.local = LRUCache(max_entries, local_ttl)
+        self.redis: Any = None
+        self.redis_ttl = redis_ttl
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.prefix = prefix
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional["asyncio.Task[None]"] = None
+
+    async def connect(self, redis: Any, listen: bool = True) -> None:
+        """Attach a Redis tier.
+
+        ``redis`` is a ``redis.asyncio`` client or a URL to build one from.
+        """
+        if isinstance(redis, str):
+            from redis import asyncio as aioredis
+
+            redis = aioredis.from_url(redis, db=settings.REDIS_DB)
+
+        self.redis = redis
+        if listen:
+            self._listener = asyncio.create_task(self._listen())
+        logger.info("Response cache connected to Redis")
+
+    async def close(self) -> None:
+        """Stop the invalidation listener and detach Redis."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    async def _listen(self) -> None:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                # "<origin> <key> [<key> ...]"; keys never contain spaces
+                origin, *keys = message["data"].decode().split(" ")
+                if origin != self._origin:
+                    for key in keys:
+                        self.local.delete(key)
+        finally:
+            await pubsub.aclose()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for ``key``, or ``None``."""
+        value = self.local.get(key)
+        if value is not None or self.redis is None:
+            return value
+
+        try:
+            value = await self.redis.get(self.prefix + key)
+        except Exception as e:
+            logger.warning("Redis cache read failed", key=key, error=str(e))
+            return None
+
+        if value is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        """Store ``value`` in both tiers."""
+        self.local.set(key, value)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.set(self.prefix + key, value, ex=self.redis_ttl)
+            await self.redis.publish(INVALIDATION_CHANNEL, f"{self._origin} {key}")
+        except Exception as e:
+            logger.warning("Redis cache write failed", key=key, error=str(e))
+
+    async def delete(self, key: str) -> None:
+        """Remove ``key`` from both tiers."""
+        self.local.delete(key)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.delete(self.prefix + key)
+            await self.redis.publish(INVALIDATION_CHANNEL, f"{self._origin} {key}")
+        except Exception as e:
+            logger.warning("Redis cache delete failed", key=key, error=str(e))
+
+    async def delete_many(self, keys: List[str]) -> None:
+        """Remove several keys from both tiers with one Redis round trip."""
+        for key in keys:
+            self.local.delete(key)
+        if self.redis is None or not keys:
+            return
+
+        try:
+            await self.redis.delete(*(self.prefix + key for key in keys))
+            await self.redis.publish(
+                INVALIDATION_CHANNEL, " ".join([self._origin, *keys])
+            )
+        except Exception as e:
+            logger.warning("Redis cache delete failed", keys=len(keys), error=str(e))
+
+    async def ping(self) -> None:
+        """Round-trip to Redis (a health probe)."""
+        if self.redis is None:
+            raise RuntimeError("Redis is not connected")
+        await self.redis.ping()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for both tiers."""
+        return {
+            "local": {
+                "hits": self.local.hits,
+                "misses": self.local.misses,
+                "entries": len(self.local),
+            },
+            "redis": {
+                "enabled": self.redis is not None,
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+            },
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    local_ttl=settings.CACHE_LOCAL_TTL,
+    redis_ttl=settings.CACHE_REDIS_TTL,
+)
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+def cache_key(namespace: str, record_id: Any) -> str:
+    """Build the cache key for one record."""
+    return f"{namespace}:{record_id}"
+
+
+async def invalidate(namespace: str, record_ids: Iterable[Any]) -> None:
+    """Drop the cached entries for ``record_ids``, e.g. after a bulk write."""
+    if settings.CACHE_ENABLED:
+        await response_cache.delete_many(
+            [cache_key(namespace, record_id) for record_id in record_ids]
+        )
+
+
+def _entry(model: BaseModel) -> bytes:
+    # Entries hold the ETag and the JSON body separated by a newline; JSON
+    # from model_dump_json never contains a raw newline.
+    return model_etag(model).encode() + b"\n" + model.model_dump_json().encode()
+
+
+def cached(namespace: str, key_param: str) -> Callable[[Handler], Handler]:
+    """Serve a GET handler's response from the cache.
+
+    The key is built from ``namespace`` and the ``key_param`` path parameter.
+    On a miss the handler runs and its model is serialized once and stored
+    with its ETag; on a hit the stored bytes are returned without calling the
+    handler, or a ``304`` if the request's ``If-None-Match`` matches. The
+    handler must take a ``request`` parameter. Only full representations are
+    cached: requests with a ``fields`` subset go straight to the handler.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        @functools.wraps(handler)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not settings.CACHE_ENABLED or kwargs.get("fields") is not None:
+                return await handler(*args, **kwargs)
+
+            key = cache_key(namespace, kwargs[key_param])
+            entry = await response_cache.get(key)
+            if entry is None:
+                result = await handler(*args, **kwargs)
+                if not isinstance(result, BaseModel):
+                    return result
+                entry = _entry(result)
+                await response_cache.set(key, entry)
+                raw_etag, _, body = entry.partition(b"\n")
+            else:
+                raw_etag, _, body = entry.partition(b"\n")
+                if is_not_modified(kwargs["request"], raw_etag.decode()):
+                    return not_modified(raw_etag.decode())
+
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={"ETag": raw_etag.decode()},
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def cache_writes(namespace: str, key_param: str = "id") -> Callable[[Handler], Handler]:
+    """Keep the cache in step with a create/update/delete handler.
+
+    A handler returning a model writes it through to the cache under its
+    ``id``; a handler returning ``None`` (a delete) invalidates the entry for
+    its ``key_param`` path parameter. Failed writes raise before the cache is
+    touched.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        @functools.wraps(handler)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            result = await handler(*args, **kwargs)
+            if not settings.CACHE_ENABLED:
+                return result
+
+            if isinstance(result, BaseModel):
+                key = cache_key(namespace, getattr(result, "id"))
+                await response_cache.set(key, _entry(result))
+            elif result is None:
+                await response_cache.delete(cache_key(namespace, kwargs[key_param]))
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,228 @@
+"""Single-flight coalescing of identical concurrent GET requests.
+
+The first GET for a key (the leader) runs the app as usual while its
+response is recorded. GETs with the same key that arrive while it is in
+flight (followers) wait for that response and replay it instead of doing the
+work again, so a burst of requests for one popular record costs one lookup.
+"""
+
+import asyncio
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+Key = Tuple[Any, ...]
+# The recorded start message and body, or None when followers must do the work
+Recorded = Optional[Tuple[Message, bytes]]
+
+
+def _param_name(param: bytes) -> bytes:
+    return param.split(b"=", 1)[0]
+
+
+class _Recorder:
+    """Forwards the leader's messages and keeps a copy for its followers."""
+
+    __slots__ = (
+        "send",
+        "flights",
+        "key",
+        "future",
+        "max_body",
+        "start",
+        "chunks",
+        "size",
+    )
+
+    def __init__(
+        self,
+        send: Send,
+        flights: Dict[Key, "asyncio.Future[Recorded]"],
+        key: Key,
+        max_body: int,
+    ) -> None:
+        self.send = send
+        self.flights = flights
+        self.key = key
+        self.future: "asyncio.Future[Recorded]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.max_body = max_body
+        self.start: Optional[Message] = None
+        self.chunks: List[bytes] = []
+        self.size = 0
+        flights[key] = self.future
+
+    async def __call__(self, message: Message) -> None:
+        if not self.future.done():
+            self._record(message)
+        await self.send(message)
+
+    def finish(self, recorded: Recorded) -> None:
+        """Hand ``recorded`` to the followers and stop collecting more.
+
+        Called as soon as the response is complete, even if background tasks
+        keep the app running.
+        """
+        if self.future.done():
+            return
+        self.future.set_result(recorded)
+        if self.flights.get(self.key) is self.future:
+            del self.flights[self.key]
+
+    def _record(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            # Copied before outer middleware adds its own headers
+            self.start = dict(message, headers=list(message.get("headers", [])))
+            return
+        if kind != "http.response.body" or self.start is None:
+            # Trailers, pathsend and other extensions are not replayed
+            self.finish(None)
+            return
+
+        body = message.get("body", b"")
+        self.size += len(body)
+        self.chunks.append(body)
+        if self.size > self.max_body:
+            self.finish(None)
+        elif not message.get("more_body", False):
+            self.finish((self.start, b"".join(self.chunks)))
+
+
+class RequestCoalescer:
+    """In-flight GETs by key, and counters for how requests were served.
+
+    A key is the scheme, path (which fixes the route and its path
+    parameters), query string with parameters ordered by name, and the
+    request headers listed in ``vary_headers``. Followers wait at most
+    ``max_wait`` seconds and then run the request themselves; responses with
+    bodies over ``max_body`` bytes, or streamed in ways that cannot be
+    replayed, are not shared.
+    """
+
+    def __init__(
+        self, vary_headers: Iterable[str], max_wait: float, max_body: int
+    ) -> None:
+        self.vary_headers = frozenset(
+            name.lower().encode("latin-1") for name in vary_headers
+        )
+        self.max_wait = max_wait
+        self.max_body = max_body
+        self._flights: Dict[Key, "asyncio.Future[Recorded]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+
+    def key(self, scope: Scope) -> Optional[Key]:
+        """The coalescing key for ``scope``, or ``None`` if it has a body."""
+        vary = []
+        for name, value in scope["headers"]:
+            if name in self.vary_headers:
+                vary.append((name, value))
+            elif name == b"transfer-encoding" or (
+                name == b"content-length" and value != b"0"
+            ):
+                return None
+        if len(vary) > 1:
+            vary.sort(key=itemgetter(0))
+
+        query = scope.get("query_string", b"")
+        if b"&" in query:
+            params = query.split(b"&")
+            params.sort(key=_param_name)
+            query = b"&".join(params)
+        return (
+            scope.get("scheme"),
+            scope.get("root_path", ""),
+            scope["path"],
+            query,
+            tuple(vary),
+        )
+
+    async def serve(
+        self, key: Key, app: ASGIApp, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Run ``app`` for ``scope``, or replay an identical request's response."""
+        future = self._flights.get(key)
+        # A flight left behind by a closed event loop cannot be awaited here
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            await self._lead(key, app, scope, receive, send)
+            return
+
+        try:
+            async with asyncio.timeout(self.max_wait):
+                recorded = await asyncio.shield(future)
+        except TimeoutError:
+            self.timeouts += 1
+            logger.debug("Coalesced request timed out", path=scope["path"])
+            await app(scope, receive, send)
+            return
+
+        if recorded is None:
+            self.fallbacks += 1
+            await app(scope, receive, send)
+            return
+
+        self.coalesced += 1
+        start, body = recorded
+        await send(dict(start, headers=list(start["headers"])))
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lead(
+        self, key: Key, app: ASGIApp, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        self.leaders += 1
+        recorder = _Recorder(send, self._flights, key, self.max_body)
+        try:
+            await app(scope, receive, recorder)
+        finally:
+            recorder.finish(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how GETs were served since startup."""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class CoalescingMiddleware:
+    """ASGI middleware sending identical concurrent GETs through ``coalescer``.
+
+    Install it innermost, so headers that outer middleware varies on (such as
+    ``Accept-Encoding`` for compression) need not be part of the key and
+    every request still passes rate limiting and metrics.
+    """
+
+    def __init__(self, app: ASGIApp, coalescer: RequestCoalescer) -> None:
+        self.app = app
+        self.coalescer = coalescer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        key = self.coalescer.key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        await self.coalescer.serve(key, self.app, scope, receive, send)
+
+
+request_coalescer = RequestCoalescer(
+    vary_headers=settings.COALESCE_VARY_HEADERS,
+    max_wait=settings.COALESCE_MAX_WAIT,
+    max_body=settings.COALESCE_MAX_BODY,
+)
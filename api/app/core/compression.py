@@ -0,0 +1,270 @@
+"""Response compression negotiated from ``Accept-Encoding``."""
+
+import functools
+import zlib
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.conditional import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional speedup
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is an optional speedup
+    zstandard = None
+
+# Content types that are already compressed, or too dense to be worth it
+INCOMPRESSIBLE_TYPES = (
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "image/avif",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-xz",
+)
+
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 1}
+
+# Statuses whose responses carry no body, or only part of one
+_SKIPPED_STATUSES = frozenset([204, 206, 304])
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # wbits 16 + 15 writes a gzip header and trailer instead of raw zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = (
+            zstandard.COMPRESSOBJ_FLUSH_FINISH
+            if final
+            else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+def available_encoders() -> Dict[str, Callable[[int], object]]:
+    """Encoders whose libraries are installed, keyed by content coding."""
+    encoders: Dict[str, Callable[[int], object]] = {"gzip": GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    return encoders
+
+
+@functools.lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, supported: Tuple[str, ...]) -> Optional[str]:
+    """Pick the coding to use for an ``Accept-Encoding`` header.
+
+    The highest ``q`` wins; ties go to the earliest coding in ``supported``.
+    ``*`` stands for any coding the header does not name, and ``q=0`` rules a
+    coding out. Returns ``None`` when the body should be sent as is.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip()
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing response bodies with gzip, brotli or zstd.
+
+    The coding is negotiated from ``Accept-Encoding`` in the order of
+    ``encodings``, among those whose library is installed. Bodies smaller
+    than ``minimum_size``, already-encoded responses, incompressible content
+    types and ``Cache-Control: no-transform`` responses are sent as is.
+
+    A single-message body is compressed in one go. A streaming body is
+    compressed chunk by chunk and flushed after each one, so the client gets
+    every chunk as soon as the app sends it, without the middleware
+    buffering the response. Compressed responses get ``Vary:
+    Accept-Encoding`` and their ``ETag`` tagged with the coding (see
+    ``encoded_etag``), since the bytes differ from the identity
+    representation.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Iterable[str] = ("zstd", "br", "gzip"),
+        levels: Optional[Mapping[str, int]] = None,
+        excluded_types: Iterable[str] = INCOMPRESSIBLE_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.excluded_types = tuple(excluded_types)
+
+        encoders = available_encoders()
+        levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.encoders = {
+            coding: functools.partial(encoders[coding], levels[coding])
+            for coding in encodings
+            if coding in encoders
+        }
+        self.encodings = tuple(self.encoders)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        coding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                coding = negotiate(value.decode("latin-1"), self.encodings)
+                break
+
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _Responder(self, coding, send))
+
+    def compressible(self, start: Message) -> bool:
+        """Whether a response, judged by its start message, may be compressed."""
+        status = start["status"]
+        if status < 200 or status in _SKIPPED_STATUSES:
+            return False
+
+        content_type = ""
+        for name, value in start.get("headers", ()):
+            if name == b"content-encoding":
+                return False
+            if name == b"cache-control" and b"no-transform" in value.lower():
+                return False
+            if name == b"content-length" and int(value) < self.minimum_size:
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return bool(content_type) and not content_type.startswith(self.excluded_types)
+
+
+class _Responder:
+    """``send`` wrapper compressing one response."""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.encoder: Any = None
+
+    async def __call__(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            if self.middleware.compressible(message):
+                # Held back until the first body chunk shows how to send it
+                self.start = message
+            else:
+                await self.send(message)
+            return
+
+        if self.encoder is not None and kind == "http.response.body":
+            more_body = message.get("more_body", False)
+            await self.send(
+                {
+                    "type": "http.response.body",
+                    "body": self.encoder.compress(
+                        message.get("body", b""), final=not more_body
+                    ),
+                    "more_body": more_body,
+                }
+            )
+            return
+
+        if self.start is None:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if kind != "http.response.body" or (
+            not more_body and len(body) < self.middleware.minimum_size
+        ):
+            # Too small, or e.g. http.response.pathsend, whose body never
+            # passes through here
+            await self._send_start()
+            await self.send(message)
+            return
+
+        self.encoder = self.middleware.encoders[self.coding]()
+        body = self.encoder.compress(body, final=not more_body)
+        await self._send_start(compressed_length=None if more_body else len(body))
+        await self.send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+    async def _send_start(self, compressed_length: Optional[int] = -1) -> None:
+        """Send the held start message, with encoding headers if compressing.
+
+        ``compressed_length`` is the compressed body size, ``None`` for a
+        streaming body, and ``-1`` (the default) to send the response as is.
+        """
+        start, self.start = self.start, None
+        assert start is not None
+
+        if compressed_length != -1:
+            start["headers"] = list(start.get("headers", ()))
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            if compressed_length is None:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(compressed_length)
+            etag = headers.get("ETag")
+            if etag is not None:
+                headers["ETag"] = encoded_etag(etag, self.coding)
+        await self.send(start)
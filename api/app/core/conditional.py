@@ -0,0 +1,149 @@
+"""Conditional request helpers: ETags, If-None-Match and If-Match."""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterable, Mapping, Optional
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the given parts."""
+    digest = hashlib.blake2b(
+        ":".join(str(part) for part in parts).encode(), digest_size=8
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def record_etag(record: Mapping[str, Any], fields: Iterable[str] = ()) -> str:
+    """ETag for a single record, derived from its ``id`` and ``version``.
+
+    Pass the ``fields`` of a sparse representation so it gets its own tag.
+    """
+    return make_etag(record["id"], record["version"], *fields)
+
+
+def model_etag(model: Any) -> str:
+    """ETag for a response model with ``id`` and ``version`` fields."""
+    return make_etag(model.id, model.version)
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """Tag ``etag`` with a content coding, e.g. ``"abc"`` to ``"abc-gzip"``.
+
+    Keeps a strong tag strong while telling the encoded bytes apart from
+    the identity ones. Weak tags are returned unchanged.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def _matches(header: str, etag: str, weak: bool) -> bool:
+    # A client echoes the tag of the representation it got, which may
+    # carry the content coding suffix from encoded_etag()
+    encoded = etag[:-1] + "-"
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag or (
+            candidate.startswith(encoded)
+            and candidate.endswith('"')
+            and candidate[len(encoded) : -1].isalnum()
+        ):
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Return whether ``If-None-Match`` already names ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    return header is not None and _matches(header, etag, weak=True)
+
+
+def is_not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """Return whether ``If-Modified-Since`` is at or after ``last_modified``.
+
+    Ignored when the request has ``If-None-Match``, which takes precedence.
+    Naive datetimes are taken as UTC.
+    """
+    header = request.headers.get("if-modified-since")
+    if header is None or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return int(last_modified.timestamp()) <= int(since.timestamp())
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty ``304 Not Modified`` response."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def has_precondition(request: Request) -> bool:
+    """Return whether the request carries an ``If-Match`` header."""
+    return "if-match" in request.headers
+
+
+def version_conflict(actual: Optional[int], precondition: bool) -> HTTPException:
+    """Error for a write that lost a race with another writer.
+
+    ``412 Precondition Failed`` when the expected version came from
+    ``If-Match``, ``409 Conflict`` when it was sent in the body.
+    """
+    if precondition:
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
+    detail = "Resource has been modified"
+    if actual is not None:
+        detail += f"; it is now at version {actual}"
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+def check_if_match(request: Request, etag: str) -> None:
+    """Raise ``412 Precondition Failed`` unless ``If-Match`` names ``etag``.
+
+    Uses strong comparison, so weak validators never satisfy it. Requests
+    without an ``If-Match`` header pass.
+    """
+    header = request.headers.get("if-match")
+    if header is not None and not _matches(header, etag, weak=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
+
+
+async def if_match_version(
+    request: Request, repository: Any, record_id: int, not_found: str
+) -> Optional[int]:
+    """Version of the record that ``If-Match`` names, or ``None`` without one.
+
+    Raises ``404`` with ``not_found`` if the record does not exist, and
+    ``412`` unless ``If-Match`` names its current ETag. Pass the version on
+    as the write's expected version, so a change made after this check is
+    still caught.
+    """
+    if not has_precondition(request):
+        return None
+    current = await repository.get(record_id)
+    if current is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    check_if_match(request, record_etag(current))
+    version: int = current["version"]
+    return version
@@ -21,11 +21,45 @@ class Settings(BaseSettings):
     HOST: str = "127.0.0.1"
     PORT: int = 8000
     RELOAD: bool = False
+    # Production serving (oshima-api); see app/server.py
+    SERVER_WORKERS: Optional[int] = None  # None: one per available CPU
+    SERVER_LOOP: str = "auto"  # "auto", "uvloop" or "asyncio"
+    SERVER_HTTP: str = "auto"  # "auto", "httptools" or "h11"
+    # Let each worker bind its own SO_REUSEPORT socket instead of sharing
+    # one bound by the supervisor
+    SERVER_REUSE_PORT: bool = False
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_TIMEOUT: int = 5
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # Replace a worker after this many requests (0 disables), plus a random
+    # 0..jitter so workers do not all retire at once
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    # How long a rolling restart waits for a new worker to start serving
+    SERVER_READY_TIMEOUT: float = 60
 
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
+    # Tokens name their signing key in the "kid" header. To rotate, move the
+    # current key into PREVIOUS_SECRET_KEYS (kid -> key, verify only) and set
+    # a new SECRET_KEY and SECRET_KEY_ID; drop the old key once its tokens
+    # have expired.
+    SECRET_KEY_ID: str = "default"
+    PREVIOUS_SECRET_KEYS: Dict[str, str] = {}
+    # Verified tokens whose claims are cached, so repeat requests skip the
+    # signature check
+    TOKEN_CACHE_SIZE: int = 10000
+    # Password hashing runs in a process pool (see app/services/passwords.py).
+    # Rounds are bcrypt's log2 cost, or argon2's time cost (argon2 extra).
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # None: one per CPU
+    # Hash jobs in the pool at once (None: one per pool worker); callers
+    # over the cap wait up to the queue timeout, then get a 503
+    PASSWORD_HASH_MAX_CONCURRENCY: Optional[int] = None
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
 
     # CORS Configuration
     ALLOWED_ORIGINS: List[AnyHttpUrl] = [
@@ -38,22 +72,117 @@ class Settings(BaseSettings):
 
     # Database Configuration
     DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+    DB_CREATE_ALL: bool = False
+
+    # Durable in-memory store: without DATABASE_URL, setting STORE_PATH
+    # journals every write there and restores the data on startup. Journals
+    # with STORE_SNAPSHOT_MIN_ENTRIES writes are compacted into a snapshot
+    # every STORE_SNAPSHOT_INTERVAL seconds
+    STORE_PATH: Optional[str] = None
+    STORE_FSYNC: bool = True
+    STORE_SNAPSHOT_INTERVAL: float = 60.0
+    STORE_SNAPSHOT_MIN_ENTRIES: int = 10000
 
     # Redis Configuration
     REDIS_URL: Optional[str] = None
     REDIS_DB: int = 0
 
+    # Cache Configuration
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_LOCAL_TTL: float = 30
+    CACHE_REDIS_TTL: int = 300
+
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
+    LOG_QUEUE_ENABLED: bool = True
+    # Lines waiting for the log writer; more are dropped and counted
+    LOG_QUEUE_MAX_LINES: int = 10000
+    # Keep 1 in N debug/info events, by event name or "prefix*" pattern
+    LOG_SAMPLE_RATES: Dict[str, int] = {}
+    # Debug/info events per second per (logger, event); 0 (default) disables
+    LOG_RATE_LIMIT: float = 0
+    LOG_RATE_LIMIT_BURST: int = 200
+    LOG_SUPPRESSION_SUMMARY_INTERVAL: float = 10
 
     # File Upload
     MAX_FILE_SIZE: int = 10485760  # 10MB
     UPLOAD_PATH: str = "./uploads"
+    # Uploads are written to disk in buffers of this size
+    UPLOAD_BUFFER_SIZE: int = 1048576
+    # Internal nginx location mapped to UPLOAD_PATH (e.g. "/_files/"); when
+    # set, downloads are handed to nginx with X-Accel-Redirect, which serves
+    # them with sendfile
+    FILES_ACCEL_REDIRECT: Optional[str] = None
 
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis"
+    RATE_LIMIT_MAX_CLIENTS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = [
+        "/health",
+        "/api/v1/health/",
+        "/api/v1/health/detailed",
+        "/api/v1/health/live",
+        "/api/v1/health/ready",
+        "/metrics",
+    ]
+
+    # Health probes: results are cached for HEALTH_CACHE_TTL seconds and
+    # refreshed in the background every HEALTH_REFRESH_INTERVAL seconds
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    HEALTH_CACHE_TTL: float = 15.0
+    HEALTH_REFRESH_INTERVAL: float = 5.0
+
+    # Request coalescing: identical concurrent GETs share one response.
+    # Followers wait up to COALESCE_MAX_WAIT seconds for it, then run the
+    # request themselves; bodies over COALESCE_MAX_BODY bytes are not shared
+    COALESCE_ENABLED: bool = True
+    COALESCE_MAX_WAIT: float = 5.0
+    COALESCE_MAX_BODY: int = 1048576
+    # Request headers a response may depend on, and so part of the key
+    COALESCE_VARY_HEADERS: List[str] = [
+        "accept",
+        "authorization",
+        "cookie",
+        "host",
+        "if-modified-since",
+        "if-none-match",
+        "if-range",
+        "range",
+    ]
+
+    # Metrics (needs the monitoring extra)
+    METRICS_ENABLED: bool = True
+    METRICS_PATH: str = "/metrics"
+    METRICS_LOOP_LAG_INTERVAL: float = 0.5
+
+    # Response compression (br and zstd need the compression extra)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    # Preferred first when the client accepts several equally
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_GZIP_LEVEL: int = 1
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Pagination
+    PAGINATION_DEFAULT_LIMIT: int = 100
+    PAGINATION_MAX_LIMIT: int = 1000
+    STREAM_CHUNK_SIZE: int = 500
+
+    # Bulk endpoints
+    BATCH_MAX_ROWS: int = 100000
 
     @field_validator("ALLOWED_ORIGINS", mode="before")
     @classmethod
@@ -0,0 +1,194 @@
+"""Dependency health probes, run concurrently and served from a cache."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+
+# A probe returns normally when the dependency is usable and raises otherwise
+Probe = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one probe run."""
+
+    status: str
+    latency_ms: float
+    checked_at: datetime
+    critical: bool
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at.isoformat(),
+            "critical": self.critical,
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+
+
+@dataclass
+class RegisteredProbe:
+    name: str
+    check: Probe
+    timeout: float
+    critical: bool
+
+
+class HealthRegistry:
+    """Named dependency probes with a cached, periodically refreshed result.
+
+    A refresh runs every probe concurrently, each under its own timeout, so
+    one hung dependency costs at most its timeout rather than stalling the
+    others. Health endpoints read the last snapshot instead of probing, so
+    orchestrator polling never reaches the dependencies: :meth:`start` keeps
+    the snapshot fresh every ``interval`` seconds, and a read that finds it
+    older than ``ttl`` returns it anyway and refreshes in the background.
+    Only the very first read waits for probes. Concurrent refreshes share
+    one run.
+
+    A failing ``critical`` probe makes the service not ready; a failing
+    non-critical one only marks it degraded.
+    """
+
+    def __init__(
+        self, ttl: float = 15.0, timeout: float = 2.0, interval: float = 5.0
+    ) -> None:
+        self.ttl = ttl
+        self.timeout = timeout
+        self.interval = interval
+        self._probes: Dict[str, RegisteredProbe] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._refreshed_at: Optional[float] = None
+        self._refreshing: Optional["asyncio.Task[Dict[str, ProbeResult]]"] = None
+        self._refresher: Optional["asyncio.Task[None]"] = None
+
+    def register(
+        self,
+        name: str,
+        check: Probe,
+        timeout: Optional[float] = None,
+        critical: bool = True,
+    ) -> None:
+        """Add (or replace) the probe called ``name``."""
+        self._probes[name] = RegisteredProbe(
+            name, check, self.timeout if timeout is None else timeout, critical
+        )
+        self._refreshed_at = None
+
+    def unregister(self, name: str) -> None:
+        self._probes.pop(name, None)
+        self._results.pop(name, None)
+
+    async def _run(self, probe: RegisteredProbe) -> ProbeResult:
+        checked_at = datetime.utcnow()
+        start = time.perf_counter()
+        error = None
+        try:
+            async with asyncio.timeout(probe.timeout):
+                await probe.check()
+        except TimeoutError:
+            error = f"Timed out after {probe.timeout}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        return ProbeResult(
+            UNHEALTHY if error else HEALTHY,
+            latency_ms,
+            checked_at,
+            probe.critical,
+            error,
+        )
+
+    async def _refresh(self) -> Dict[str, ProbeResult]:
+        probes = list(self._probes.values())
+        outcomes = await asyncio.gather(*(self._run(probe) for probe in probes))
+        results = {probe.name: result for probe, result in zip(probes, outcomes)}
+
+        for name, result in results.items():
+            previous = self._results.get(name)
+            if previous is not None and previous.status != result.status:
+                logger.warning(
+                    "Health probe changed status",
+                    probe=name,
+                    status=result.status,
+                    error=result.error,
+                )
+            elif previous is None and result.error:
+                logger.warning("Health probe failed", probe=name, error=result.error)
+
+        self._results = results
+        self._refreshed_at = time.monotonic()
+        return results
+
+    def _refresh_task(self) -> "asyncio.Task[Dict[str, ProbeResult]]":
+        task = self._refreshing
+        # A task left over from another event loop (tests) cannot be awaited
+        if (
+            task is None
+            or task.done()
+            or task.get_loop() is not asyncio.get_running_loop()
+        ):
+            task = self._refreshing = asyncio.create_task(self._refresh())
+        return task
+
+    async def refresh(self) -> Dict[str, ProbeResult]:
+        """Run every probe now, joining a refresh already in progress."""
+        return await asyncio.shield(self._refresh_task())
+
+    async def results(self) -> Dict[str, ProbeResult]:
+        """The latest probe results, refreshed only when missing or stale."""
+        if self._refreshed_at is None:
+            return await self.refresh()
+        if time.monotonic() - self._refreshed_at > self.ttl:
+            self._refresh_task()
+        return self._results
+
+    @staticmethod
+    def is_ready(results: Dict[str, ProbeResult]) -> bool:
+        """Whether every critical probe passed."""
+        return all(r.status == HEALTHY for r in results.values() if r.critical)
+
+    async def start(self) -> None:
+        """Probe now, then keep refreshing every ``interval`` seconds."""
+        await self.refresh()
+        self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:  # never let the refresher die
+                logger.error("Health refresh failed", error=str(e))
+
+    async def stop(self) -> None:
+        """Cancel the background refresher and any refresh in progress."""
+        for task in (self._refresher, self._refreshing):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresher = self._refreshing = None
+
+
+health_registry = HealthRegistry(
+    ttl=settings.HEALTH_CACHE_TTL,
+    timeout=settings.HEALTH_PROBE_TIMEOUT,
+    interval=settings.HEALTH_REFRESH_INTERVAL,
+)
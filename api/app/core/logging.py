@@ -1,71 +1,483 @@
 """Logging configuration for the application."""
 
+import atexit
+import json
 import logging
+import queue
 import sys
-from typing import Any, Dict
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Any, Callable, Dict, List, Mapping, Optional, TextIO, Tuple
 
 import structlog
-from rich.console import Console
-from rich.logging import RichHandler
 
 from .config import settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
 
-def setup_logging() -> None:
-    """Set up structured logging for the application."""
+
+# Frames from these modules are logging machinery, never the caller
+_LOGGING_MODULES = ("logging", "structlog", __name__)
+
+
+class _Logger(logging.Logger):
+    """Logger whose caller lookup skips structlog and can be turned off.
+
+    JSON lines carry no source location, so with ``find_caller`` off no
+    stack is walked at all unless ``stack_info`` asks for one (see
+    "Optimization" in the logging docs).
+    """
+
+    find_caller = True
+
+    def findCaller(
+        self, stack_info: bool = False, stacklevel: int = 1
+    ) -> Tuple[str, int, str, Optional[str]]:
+        if not _Logger.find_caller and not stack_info:
+            return "(unknown file)", 0, "(unknown function)", None
+
+        frame = sys._getframe(1)
+        while frame.f_back is not None and _is_logging_frame(frame):
+            frame = frame.f_back
+        for _ in range(stacklevel - 1):
+            if frame.f_back is None:
+                break
+            frame = frame.f_back
+
+        sinfo = None
+        if stack_info:
+            stack = "".join(traceback.format_stack(frame)).rstrip("\n")
+            sinfo = f"Stack (most recent call last):\n{stack}"
+        code = frame.f_code
+        return code.co_filename, frame.f_lineno, code.co_name, sinfo
+
+
+def _is_logging_frame(frame: Any) -> bool:
+    module = frame.f_globals.get("__name__", "")
+    return any(
+        module == name or module.startswith(f"{name}.") for name in _LOGGING_MODULES
+    )
+
+
+class LogWriter:
+    """Background thread writing queued log lines to a stream in batches.
+
+    Each wakeup drains everything queued so far and writes it with a single
+    ``write`` and ``flush``, so a burst of log calls costs one syscall rather
+    than one per line, and the calling thread never blocks on the stream.
+
+    At most ``max_lines`` lines wait in the queue. Past that, lines are
+    dropped and counted in ``dropped``, and the writer reports how many with
+    a warning line once it catches up, so a slow stream cannot grow memory
+    without bound.
+    """
+
+    def __init__(self, stream: TextIO, max_lines: int = 10_000) -> None:
+        self.stream = stream
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(max_lines)
+        self.dropped = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, line: str) -> None:
+        """Queue a line, or count it as dropped if the queue is full."""
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything still queued, then stop the thread."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            lines = [self.queue.get()]
+            try:
+                while True:
+                    lines.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stopping = lines[-1] is None
+            text = "".join(f"{line}\n" for line in lines if line is not None)
+            with self._lock:
+                dropped, self._reported = self.dropped - self._reported, self.dropped
+            if dropped:
+                text += self._dropped_line(dropped)
+            if text:
+                try:
+                    self.stream.write(text)
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    pass
+            if stopping:
+                return
+
+    @staticmethod
+    def _dropped_line(count: int) -> str:
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        event = {
+            "event": f"Dropped {count} log lines behind a slow log stream",
+            "dropped": count,
+            "logger": __name__,
+            "level": "warning",
+            "timestamp": timestamp,
+        }
+        return f"{json_dumps(event)}\n"
+
+
+class _LineQueueHandler(QueueHandler):
+    """Queue handler that hands each record's formatted line to a writer.
+
+    Formatting happens on the calling thread (structlog has already rendered
+    the JSON), so the writer only has strings to join and write.
+    """
+
+    def __init__(self, writer: LogWriter) -> None:
+        super().__init__(writer.queue)
+        self.writer = writer
+
+    def prepare(self, record: logging.LogRecord) -> Any:
+        return self.format(record)
+
+    def enqueue(self, record: Any) -> None:
+        self.writer.put(record)
+
+
+_writer: Optional[LogWriter] = None
+_reporter: Optional["_SummaryReporter"] = None
+
+# Only these levels are sampled or throttled; warnings and errors always pass
+_THINNED_METHODS = frozenset(["debug", "info"])
+
+
+class _KeyState:
+    __slots__ = ("seen", "tokens", "updated", "suppressed", "reported", "method")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.seen = 0
+        self.tokens = tokens
+        self.updated = now
+        self.suppressed = 0
+        self.reported = now
+        self.method = "info"
+
+
+class LogSampler:
+    """structlog processor thinning out high-frequency debug and info events.
+
+    Events are keyed by ``(logger name, event)``. Two policies apply per key:
+
+    - ``sample_rates`` maps an event name, or a ``"prefix*"`` pattern, to N;
+      only every Nth matching event is kept, tagged with ``sample_rate=N``.
+    - When ``rate`` is positive, a token bucket admits ``rate`` events per
+      second with bursts of up to ``burst``. Events over budget are dropped
+      and counted. The count is attached as ``suppressed=X`` to the key's
+      next admitted event, or, if none gets through for ``summary_interval``
+      seconds, a dropped event is replaced by a "Suppressed X similar events"
+      summary. :meth:`pending` hands out the counts of bursts that stopped
+      before either happened.
+
+    Warnings and errors always pass. At most ``max_keys`` keys are tracked;
+    the least recently seen is forgotten first.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Mapping[str, int]] = None,
+        rate: float = 0.0,
+        burst: int = 1,
+        summary_interval: float = 10.0,
+        max_keys: int = 10_000,
+    ) -> None:
+        sample_rates = sample_rates or {}
+        self._exact = {k: n for k, n in sample_rates.items() if not k.endswith("*")}
+        self._prefixes = [
+            (k[:-1], n) for k, n in sample_rates.items() if k.endswith("*")
+        ]
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.summary_interval = summary_interval
+        self.max_keys = max_keys
+        self._rates: Dict[str, int] = {}
+        self._keys: "OrderedDict[Tuple[str, str], _KeyState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sample_rate(self, event: str) -> int:
+        rate = self._rates.get(event)
+        if rate is None:
+            rate = self._exact.get(event)
+            if rate is None:
+                rate = next(
+                    (n for prefix, n in self._prefixes if event.startswith(prefix)), 1
+                )
+            if len(self._rates) >= self.max_keys:
+                self._rates.clear()
+            self._rates[event] = rate
+        return rate
+
+    def _state(self, key: Tuple[str, str], now: float) -> _KeyState:
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState(self.burst, now)
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        return state
+
+    def __call__(
+        self, logger: Any, method_name: str, event_dict: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        event = event_dict.get("event")
+        if (
+            method_name not in _THINNED_METHODS
+            or not isinstance(event, str)
+            or "suppressed_event" in event_dict
+        ):
+            return event_dict
+
+        with self._lock:
+            now = time.monotonic()
+            state = self._state((getattr(logger, "name", ""), event), now)
+
+            sample_rate = self._sample_rate(event)
+            if sample_rate > 1:
+                state.seen += 1
+                if state.seen % sample_rate != 1:
+                    raise structlog.DropEvent
+                event_dict["sample_rate"] = sample_rate
+
+            if self.rate <= 0:
+                return event_dict
+
+            state.tokens = min(
+                self.burst, state.tokens + (now - state.updated) * self.rate
+            )
+            state.updated = now
+            if state.tokens >= 1:
+                state.tokens -= 1
+                if state.suppressed:
+                    event_dict["suppressed"] = state.suppressed
+                    state.suppressed = 0
+                    state.reported = now
+                return event_dict
+
+            state.suppressed += 1
+            state.method = method_name
+            if now - state.reported < self.summary_interval:
+                raise structlog.DropEvent
+
+            count, state.suppressed, state.reported = state.suppressed, 0, now
+            return _summary(event, count)
+
+    def pending(self, force: bool = False) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Take the summaries of events dropped and not yet reported.
+
+        Returns ``(logger name, method, event)`` for each key whose last
+        report is at least ``summary_interval`` old, or for every key with
+        dropped events when ``force`` is set (e.g. at shutdown).
+        """
+        summaries = []
+        with self._lock:
+            now = time.monotonic()
+            for (name, event), state in self._keys.items():
+                if not state.suppressed:
+                    continue
+                if not force and now - state.reported < self.summary_interval:
+                    continue
+                summaries.append(
+                    (name, state.method, _summary(event, state.suppressed))
+                )
+                state.suppressed, state.reported = 0, now
+        return summaries
+
+
+def _summary(event: str, count: int) -> Dict[str, Any]:
+    return {
+        "event": f"Suppressed {count} similar events",
+        "suppressed_event": event,
+        "suppressed": count,
+    }
+
+
+class _SummaryReporter:
+    """Thread logging :meth:`LogSampler.pending` every ``summary_interval``.
+
+    Without it, the count of a burst that simply stops would never be
+    reported. :meth:`stop` reports whatever is left.
+    """
+
+    def __init__(self, sampler: LogSampler) -> None:
+        self.sampler = sampler
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="log-summaries", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.report(force=True)
+
+    def report(self, force: bool = False) -> None:
+        for name, method, event_dict in self.sampler.pending(force):
+            getattr(structlog.get_logger(name), method)(**event_dict)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.sampler.summary_interval):
+            self.report()
+
+
+def json_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize a log event to JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, default=default)
+
+
+def stop_logging() -> None:
+    """Report pending suppressed counts, then flush and stop the log writer."""
+    global _reporter, _writer
+    if _reporter is not None:
+        _reporter.stop()
+        _reporter = None
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+def _create_handler(
+    log_format: str, use_queue: bool, stream: TextIO
+) -> logging.Handler:
+    global _writer
+
+    if log_format != "json":
+        # Imported lazily so JSON deployments never load Rich
+        from rich.console import Console
+        from rich.logging import RichHandler
+
+        return RichHandler(
+            console=Console(file=stream),
+            show_time=True,
+            show_path=True,
+            markup=True,
+            rich_tracebacks=True,
+        )
+
+    if not use_queue:
+        return logging.StreamHandler(stream)
+
+    # The calling thread only enqueues the rendered line; the writer thread
+    # does the blocking I/O.
+    _writer = LogWriter(stream, settings.LOG_QUEUE_MAX_LINES)
+    _writer.start()
+    return _LineQueueHandler(_writer)
+
+
+def setup_logging(
+    log_format: Optional[str] = None,
+    use_queue: Optional[bool] = None,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Set up structured logging for the application.
+
+    With ``LOG_FORMAT="json"`` events are rendered as one JSON line each and,
+    unless ``LOG_QUEUE_ENABLED`` is off, written to stderr by a background
+    thread. Any other format uses Rich console output for development.
+    Arguments override the corresponding settings.
+    """
+    global _reporter
+
+    log_format = log_format or settings.LOG_FORMAT
+    use_queue = settings.LOG_QUEUE_ENABLED if use_queue is None else use_queue
+
+    stop_logging()
+    handler = _create_handler(log_format, use_queue, stream or sys.stderr)
+
+    _Logger.find_caller = log_format != "json"
 
     # Configure standard library logging
     logging.basicConfig(
         level=getattr(logging, settings.LOG_LEVEL.upper()),
         format="%(message)s",
         datefmt="[%X]",
-        handlers=[
-            RichHandler(
-                console=Console(stderr=True),
-                show_time=True,
-                show_path=True,
-                markup=True,
-                rich_tracebacks=True,
-            )
-        ],
+        handlers=[handler],
+        force=True,
     )
 
     # Configure structlog
     timestamper = structlog.processors.TimeStamper(fmt="ISO")
 
-    if settings.LOG_FORMAT == "json":
-        processors = [
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            timestamper,
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer(),
-        ]
+    processors: List[Any] = [structlog.stdlib.filter_by_level]
+    sampler: Optional[LogSampler] = None
+    if settings.LOG_SAMPLE_RATES or settings.LOG_RATE_LIMIT > 0:
+        # Right after the level filter, so dropped events cost as little as
+        # possible
+        sampler = LogSampler(
+            sample_rates=settings.LOG_SAMPLE_RATES,
+            rate=settings.LOG_RATE_LIMIT,
+            burst=settings.LOG_RATE_LIMIT_BURST,
+            summary_interval=settings.LOG_SUPPRESSION_SUMMARY_INTERVAL,
+        )
+        processors.append(sampler)
+    processors += [
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        timestamper,
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+        structlog.processors.UnicodeDecoder(),
+    ]
+    if log_format == "json":
+        processors.append(structlog.processors.JSONRenderer(serializer=json_dumps))
     else:
-        processors = [
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            timestamper,
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.dev.ConsoleRenderer(colors=True),
-        ]
+        processors.append(structlog.dev.ConsoleRenderer(colors=True))
 
+    logger_factory = structlog.stdlib.LoggerFactory()
+    # The factory installs structlog's own logger class; stdlib loggers
+    # created from here on use ours instead
+    logging.setLoggerClass(_Logger)
     structlog.configure(
         processors=processors,
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
+        logger_factory=logger_factory,
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
 
+    if sampler is not None and sampler.rate > 0:
+        _reporter = _SummaryReporter(sampler)
+        _reporter.start()
+
+
+atexit.register(stop_logging)
+
 
 def get_logger(name: str) -> structlog.BoundLogger:
     """Get a structured logger instance."""
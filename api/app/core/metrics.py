@@ -0,0 +1,199 @@
+"""Prometheus metrics: per-route request middleware and event-loop lag.
+
+Needs the ``[monitoring]`` extra. When ``PROMETHEUS_MULTIPROC_DIR`` is set
+before this module is imported, every worker writes its samples to that
+directory and ``/metrics`` aggregates them across processes.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import BaseRoute, Match, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Requests that match no route, or use a non-standard method, share one label
+# value each to keep cardinality bounded
+UNMATCHED_ROUTE = "<unmatched>"
+OTHER_METHOD = "OTHER"
+METHODS = frozenset(
+    ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"]
+)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status code.",
+    ["method", "route", "status"],
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body chunk.",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a sleeping task.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+def route_template(routes: Sequence[BaseRoute], scope: Scope) -> str:
+    """Return the path template of the route that will serve ``scope``.
+
+    Follows Starlette's router: the first full match wins, otherwise the first
+    route whose path matches with the wrong method. Plain routes are matched
+    on their compiled regex alone, which avoids building a child scope for
+    every candidate.
+    """
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+
+    partial: Optional[str] = None
+    for route in routes:
+        if isinstance(route, Route):
+            if not route.path_regex.match(path):
+                continue
+            if route.methods and scope["method"] not in route.methods:
+                partial = partial or route.path
+                continue
+            return route.path
+
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match is Match.PARTIAL:
+            partial = partial or getattr(route, "path", UNMATCHED_ROUTE)
+
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, in-flight requests, latency
+    and response size, labeled by route template rather than raw path.
+
+    ``routes`` is the application's route list; it is read on every request,
+    so routes added after the middleware is registered are picked up.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Sequence[BaseRoute],
+        exclude_paths: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.exclude_paths = frozenset(exclude_paths)
+        # Labeled children, cached to skip the label lookup on every request
+        self._series: Dict[Tuple[str, str], Tuple[Any, Any, Any]] = {}
+        self._counters: Dict[Tuple[str, str, int], Any] = {}
+
+    def _series_for(self, method: str, route: str) -> Tuple[Any, Any, Any]:
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = (
+                IN_PROGRESS.labels(method, route),
+                LATENCY.labels(method, route),
+                RESPONSE_SIZE.labels(method, route),
+            )
+        return series
+
+    def _counter_for(self, method: str, route: str, status_code: int) -> Any:
+        key = (method, route, status_code)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = REQUESTS.labels(
+                method, route, str(status_code)
+            )
+        return counter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in METHODS else OTHER_METHOD
+        route = route_template(self.routes, scope)
+        status_code = 500
+        size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress, latency, response_size = self._series_for(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            latency.observe(time.perf_counter() - start)
+            response_size.observe(size)
+            self._counter_for(method, route, status_code).inc()
+            in_progress.dec()
+
+
+async def monitor_event_loop_lag(interval: float) -> None:
+    """Record how late each ``interval``-second sleep wakes up, forever."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+
+def is_multiprocess() -> bool:
+    """Return whether samples are shared between worker processes."""
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess aggregate."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Expose all metrics in the Prometheus text format."""
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
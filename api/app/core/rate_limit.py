@@ -0,0 +1,216 @@
+"""Sliding-window rate limiting as pure ASGI middleware."""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, NamedTuple, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of counting one request against a client's quota."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int
+    retry_after: int
+
+
+def _evaluate(
+    limit: int, window: float, now: float, current: int, previous: int
+) -> RateLimitResult:
+    """Apply the sliding-window-counter estimate to the two window counts.
+
+    The previous window's count is weighted by how much of it still overlaps
+    the sliding window ending at ``now``. ``current`` already includes the
+    request being evaluated.
+    """
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    estimated = previous * weight + current
+    reset_after = math.ceil(window - elapsed)
+
+    if estimated <= limit:
+        remaining = max(0, int(limit - estimated))
+        return RateLimitResult(True, limit, remaining, reset_after, 0)
+
+    if current > limit or previous == 0:
+        retry_after = reset_after
+    else:
+        # Time until the previous window has decayed enough to admit one more
+        target_weight = (limit - current) / previous
+        retry_after = math.ceil((weight - target_weight) * window)
+    return RateLimitResult(False, limit, 0, reset_after, max(1, retry_after))
+
+
+class _Counter:
+    __slots__ = ("window", "current", "previous")
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.current = 0
+        self.previous = 0
+
+
+class MemoryRateLimiter:
+    """Per-process sliding-window-counter limiter.
+
+    Each client costs three integers, and the number of tracked clients is
+    capped at ``max_clients``: the least recently seen client is evicted
+    first, so memory stays bounded under high-cardinality traffic. Every
+    call is O(1).
+    """
+
+    def __init__(self, limit: int, window: float, max_clients: int = 100_000) -> None:
+        self.limit = limit
+        self.window = window
+        self.max_clients = max_clients
+        self._clients: "OrderedDict[str, _Counter]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def hit(self, client: str) -> RateLimitResult:
+        """Count one request for ``client``."""
+        now = time.monotonic()
+        window = int(now // self.window)
+
+        counter = self._clients.get(client)
+        if counter is None:
+            counter = self._clients[client] = _Counter(window)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client)
+
+        if counter.window != window:
+            counter.previous = counter.current if counter.window == window - 1 else 0
+            counter.current = 0
+            counter.window = window
+
+        counter.current += 1
+        result = _evaluate(
+            self.limit, self.window, now, counter.current, counter.previous
+        )
+        if not result.allowed:
+            # Rejected requests do not consume quota
+            counter.current -= 1
+        return result
+
+
+class RedisRateLimiter:
+    """Sliding-window-counter limiter shared by all workers through Redis.
+
+    One pipelined round trip per request increments the current window's key
+    and reads the previous one; keys expire after two windows. If Redis is
+    unreachable the limiter fails open.
+    """
+
+    def __init__(
+        self,
+        redis: Any,
+        limit: int,
+        window: float,
+        prefix: str = "oshima:ratelimit:",
+    ) -> None:
+        self.redis = redis
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+
+    async def hit(self, client: str) -> RateLimitResult:
+        """Count one request for ``client``."""
+        now = time.time()
+        window = int(now // self.window)
+        key = f"{self.prefix}{client}:{window}"
+
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, int(self.window * 2))
+                pipe.get(f"{self.prefix}{client}:{window - 1}")
+                current, _, previous = await pipe.execute()
+        except Exception as e:
+            logger.warning("Rate limiter unavailable", error=str(e))
+            return RateLimitResult(True, self.limit, self.limit, 0, 0)
+
+        result = _evaluate(
+            self.limit, self.window, now, int(current), int(previous or 0)
+        )
+        if not result.allowed:
+            # Rejected requests do not consume quota
+            try:
+                await self.redis.decr(key)
+            except Exception:
+                pass
+        return result
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing a per-client request quota.
+
+    Clients are identified by their remote address, or by the first
+    ``X-Forwarded-For`` entry when ``trust_forwarded`` is set. Rejected
+    requests get ``429`` with ``Retry-After``; every limited response carries
+    ``X-RateLimit-Limit``, ``X-RateLimit-Remaining`` and
+    ``X-RateLimit-Reset``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Any,
+        exempt_paths: Iterable[str] = (),
+        trust_forwarded: bool = False,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = frozenset(exempt_paths)
+        self.trust_forwarded = trust_forwarded
+
+    def _client(self, scope: Scope) -> str:
+        if self.trust_forwarded:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client: Optional[Tuple[str, int]] = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        result = await self.limiter.hit(self._client(scope))
+        headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+            (b"x-ratelimit-reset", str(result.reset_after).encode()),
+        ]
+
+        if not result.allowed:
+            body = json.dumps({"detail": "Too Many Requests"}).encode()
+            headers += [
+                (b"retry-after", str(result.retry_after).encode()),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            await send(
+                {"type": "http.response.start", "status": 429, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,141 @@
+"""JWT access tokens: issuing, verification and a verified-claims cache."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from jose import ExpiredSignatureError, JWTError, jwt
+
+from .config import settings
+
+
+class InvalidToken(Exception):
+    """The token is malformed, expired, or not signed by a known key."""
+
+
+class TokenService:
+    """Issue and verify signed JWTs, caching verified claims.
+
+    ``keys`` maps key IDs to secrets. Tokens are signed with
+    ``keys[current_kid]`` and carry its ID in the ``kid`` header; any key in
+    ``keys`` verifies, so a rotated-out key keeps working until it is
+    retired.
+
+    Verifying a signature on every request is wasted work for a token the
+    client sends again and again, so decoded claims are kept in a bounded
+    LRU keyed by a hash of the token. An entry lives until the token's
+    ``exp`` and is dropped when its signing key is retired.
+    """
+
+    def __init__(
+        self,
+        keys: Mapping[str, str],
+        current_kid: str,
+        algorithm: str = "HS256",
+        expire_minutes: int = 30,
+        cache_size: int = 10_000,
+    ) -> None:
+        if current_kid not in keys:
+            raise ValueError(f"No key with ID {current_kid!r}")
+        self.keys = dict(keys)
+        self.current_kid = current_kid
+        self.algorithm = algorithm
+        self.expire_minutes = expire_minutes
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        # token hash -> (exp, kid, claims)
+        self._cache: "OrderedDict[bytes, Tuple[float, str, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+
+    def issue(
+        self,
+        subject: str,
+        claims: Optional[Mapping[str, Any]] = None,
+        expires_delta: Optional[timedelta] = None,
+    ) -> str:
+        """Sign a token for ``subject`` that expires after ``expires_delta``."""
+        now = datetime.now(timezone.utc)
+        expires = now + (expires_delta or timedelta(minutes=self.expire_minutes))
+        payload = {
+            **(claims or {}),
+            "sub": subject,
+            "iat": int(now.timestamp()),
+            "exp": int(expires.timestamp()),
+        }
+        return jwt.encode(
+            payload,
+            self.keys[self.current_kid],
+            algorithm=self.algorithm,
+            headers={"kid": self.current_kid},
+        )
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's claims, or raise :class:`InvalidToken`."""
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return dict(entry[2])
+            del self._cache[key]
+            raise InvalidToken("Token has expired")
+
+        self.misses += 1
+        claims, kid = self._decode(token)
+        if self.cache_size > 0:
+            self._cache[key] = (float(claims["exp"]), kid, claims)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(claims)
+
+    def _decode(self, token: str) -> Tuple[Dict[str, Any], str]:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            secret = self.keys.get(kid) if isinstance(kid, str) else None
+            if secret is None:
+                raise InvalidToken("Token signed with an unknown key")
+            claims = jwt.decode(
+                token,
+                secret,
+                algorithms=[self.algorithm],
+                options={"verify_aud": False, "require_exp": True},
+            )
+        except ExpiredSignatureError:
+            raise InvalidToken("Token has expired")
+        except JWTError:
+            raise InvalidToken("Invalid token")
+        return claims, kid
+
+    def rotate(self, kid: str, secret: str) -> None:
+        """Sign new tokens with ``secret``; older keys still verify."""
+        self.keys[kid] = secret
+        self.current_kid = kid
+
+    def retire(self, kid: str) -> None:
+        """Stop accepting tokens signed with ``kid``, cached ones included."""
+        if kid == self.current_kid:
+            raise ValueError("Cannot retire the current signing key")
+        self.keys.pop(kid, None)
+        for key in [k for k, entry in self._cache.items() if entry[1] == kid]:
+            del self._cache[key]
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the claims cache."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
+
+token_service = TokenService(
+    keys={**settings.PREVIOUS_SECRET_KEYS, settings.SECRET_KEY_ID: settings.SECRET_KEY},
+    current_kid=settings.SECRET_KEY_ID,
+    algorithm=settings.ALGORITHM,
+    expire_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+    cache_size=settings.TOKEN_CACHE_SIZE,
+)
@@ -0,0 +1,100 @@
+"""Fast JSON serialization for trusted repository rows."""
+
+import functools
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+# A subset of a model's field names, in declaration order; ``None`` is all
+Fields = Optional[Tuple[str, ...]]
+
+
+@functools.lru_cache(maxsize=None)
+def _row_type(model: Type[BaseModel], fields: Fields = None) -> Any:
+    names = model.model_fields if fields is None else fields
+    annotations = {name: model.model_fields[name].annotation for name in names}
+    suffix = "" if fields is None else "_" + "_".join(fields)
+    return TypedDict(  # type: ignore[operator]
+        f"{model.__name__}Row{suffix}", annotations
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def row_adapter(model: Type[BaseModel], fields: Fields = None) -> TypeAdapter:
+    """TypeAdapter serializing one plain-dict row with ``model``'s fields.
+
+    With ``fields``, only those keys are dumped. One adapter is built per
+    subset and reused; a model with n fields has at most 2**n of them.
+    """
+    return TypeAdapter(_row_type(model, fields))
+
+
+@functools.lru_cache(maxsize=None)
+def rows_adapter(model: Type[BaseModel], fields: Fields = None) -> TypeAdapter:
+    """TypeAdapter serializing a list of plain-dict rows, like :func:`row_adapter`."""
+    return TypeAdapter(List[_row_type(model, fields)])  # type: ignore[misc]
+
+
+def dump_rows(
+    model: Type[BaseModel], rows: List[Dict[str, Any]], fields: Fields = None
+) -> bytes:
+    """Serialize repository rows as a JSON array shaped like ``model``.
+
+    The rows are dumped straight from their dicts, without building or
+    validating a model per row, and keys ``model`` does not declare (such as
+    ``hashed_password``) are left out, as are keys outside ``fields`` when it
+    is given. Only use it for rows that are already valid, i.e. ones the
+    repository stored from validated input.
+    """
+    return rows_adapter(model, fields).dump_json(rows)
+
+
+def dump_row(
+    model: Type[BaseModel], row: Dict[str, Any], fields: Fields = None
+) -> bytes:
+    """Serialize one repository row as a JSON object, like :func:`dump_rows`."""
+    return row_adapter(model, fields).dump_json(row)
+
+
+def dump_ndjson(
+    model: Type[BaseModel], rows: Iterable[Dict[str, Any]], fields: Fields = None
+) -> bytes:
+    """Serialize repository rows as newline-delimited JSON, like :func:`dump_rows`."""
+    dump = row_adapter(model, fields).dump_json
+    return b"".join(dump(row) + b"\n" for row in rows)
+
+
+_any_adapter: TypeAdapter = TypeAdapter(Any)
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize plain data (dicts, lists, scalars, datetimes) to JSON bytes."""
+    return _any_adapter.dump_json(content)
+
+
+def json_response(content: bytes, response: Response) -> Response:
+    """Send pre-serialized JSON, keeping the headers set on ``response``.
+
+    FastAPI drops the injected response's headers when a handler returns its
+    own ``Response``, so they are carried over here.
+    """
+    headers: Mapping[str, str] = response.headers
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def default_response_class() -> Type[JSONResponse]:
+    """orjson-backed ``JSONResponse`` when orjson is installed."""
+    if orjson is not None:
+        from fastapi.responses import ORJSONResponse
+
+        return ORJSONResponse
+    return JSONResponse
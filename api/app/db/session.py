@@ -0,0 +1,97 @@
+"""Async engine and session management."""
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Async drivers used when DATABASE_URL names a bare dialect
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+engine: Optional[AsyncEngine] = None
+session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def to_async_url(database_url: str) -> str:
+    """Rewrite a database URL to use an async driver."""
+    scheme, sep, rest = database_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Return connection pool options for the given URL.
+
+    In-memory SQLite uses a single shared connection, so queue pool sizing
+    does not apply to it.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+async def init_db(database_url: str) -> AsyncEngine:
+    """Create the engine and session factory."""
+    global engine, session_factory
+
+    url = to_async_url(database_url)
+    engine = create_async_engine(url, **engine_options(url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    if settings.DB_CREATE_ALL:
+        from app.db.base import Base
+        from app.models import File, Item, User  # noqa: F401  (register tables)
+
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    logger.info("Database engine created", backend=engine.dialect.name)
+    return engine
+
+
+async def ping_db() -> None:
+    """Run a trivial query on a pooled connection (a health probe)."""
+    if engine is None:
+        raise RuntimeError("Database engine is not initialized")
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def close_db() -> None:
+    """Dispose of the engine and release pooled connections."""
+    global engine, session_factory
+
+    if engine is not None:
+        await engine.dispose()
+        logger.info("Database engine disposed")
+
+    engine = None
+    session_factory = None
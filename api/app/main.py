@@ -1,9 +1,9 @@
 """Main FastAPI application."""
 
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
-import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -11,8 +11,19 @@ from fastapi.responses import JSONResponse
 
 from app import __description__, __version__
 from app.api.v1.api import api_router
+from app.core.cache import response_cache
+from app.core.coalesce import CoalescingMiddleware, request_coalescer
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.health import health_registry
 from app.core.logging import get_logger, setup_logging
+from app.core.rate_limit import (
+    MemoryRateLimiter,
+    RateLimitMiddleware,
+    RedisRateLimiter,
+)
+from app.core.serialization import default_response_class
+from app.services.passwords import password_hasher
 
 # Set up logging
 setup_logging()
@@ -25,16 +36,85 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
     logger.info("Starting Oshima API", version=__version__)
 
-    # Add any startup logic here
-    # e.g., database connection, cache initialization
+    if settings.DATABASE_URL:
+        # Imported lazily so the in-memory mode does not need the db extra
+        from app.db.session import close_db, init_db, ping_db
+
+        await init_db(settings.DATABASE_URL)
+        health_registry.register("database", ping_db)
+
+    store = None
+    if settings.STORE_PATH and not settings.DATABASE_URL:
+        from app.services.files import file_repository
+        from app.services.items import item_repository
+        from app.services.journal import DurableStore
+        from app.services.users import user_repository
+
+        store = DurableStore(
+            settings.STORE_PATH,
+            {
+                "users": user_repository,
+                "items": item_repository,
+                "files": file_repository,
+            },
+            fsync=settings.STORE_FSYNC,
+            snapshot_interval=settings.STORE_SNAPSHOT_INTERVAL,
+            snapshot_min_entries=settings.STORE_SNAPSHOT_MIN_ENTRIES,
+        )
+        await store.open()
+
+    if settings.REDIS_URL and settings.CACHE_ENABLED:
+        await response_cache.connect(settings.REDIS_URL)
+        # The cache treats Redis errors as misses, so this only degrades
+        health_registry.register("redis", response_cache.ping, critical=False)
+
+    await health_registry.start()
+
+    lag_monitor = None
+    if app.state.metrics_enabled:
+        from app.core.metrics import monitor_event_loop_lag
+
+        lag_monitor = asyncio.create_task(
+            monitor_event_loop_lag(settings.METRICS_LOOP_LAG_INTERVAL)
+        )
 
     yield
 
     # Shutdown
     logger.info("Shutting down Oshima API")
 
-    # Add any cleanup logic here
-    # e.g., close database connections, cleanup caches
+    if lag_monitor is not None:
+        from app.core.metrics import mark_process_dead
+
+        lag_monitor.cancel()
+        mark_process_dead()
+
+    await health_registry.stop()
+    if store is not None:
+        await store.close()
+    await response_cache.close()
+    password_hasher.close()
+
+    if settings.DATABASE_URL:
+        await close_db()
+
+
+def create_rate_limiter() -> Any:
+    """Create the rate limiter selected by ``RATE_LIMIT_BACKEND``."""
+    if settings.RATE_LIMIT_BACKEND == "redis" and settings.REDIS_URL:
+        from redis import asyncio as aioredis
+
+        return RedisRateLimiter(
+            aioredis.from_url(settings.REDIS_URL, db=settings.REDIS_DB),
+            limit=settings.RATE_LIMIT_REQUESTS,
+            window=settings.RATE_LIMIT_WINDOW,
+        )
+
+    return MemoryRateLimiter(
+        limit=settings.RATE_LIMIT_REQUESTS,
+        window=settings.RATE_LIMIT_WINDOW,
+        max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+    )
 
 
 def create_application() -> FastAPI:
@@ -47,9 +127,15 @@ def create_application() -> FastAPI:
         openapi_url="/api/v1/openapi.json" if settings.DEBUG else None,
         docs_url="/docs" if settings.DEBUG else None,
         redoc_url="/redoc" if settings.DEBUG else None,
+        default_response_class=default_response_class(),
         lifespan=lifespan,
     )
 
+    # Add request coalescing first so it is innermost, behind rate limiting
+    # and metrics, and sees responses before they are compressed
+    if settings.COALESCE_ENABLED:
+        app.add_middleware(CoalescingMiddleware, coalescer=request_coalescer)
+
     # Add security middleware
     if not settings.DEBUG:
         app.add_middleware(
@@ -57,6 +143,15 @@ def create_application() -> FastAPI:
             allowed_hosts=["localhost", "127.0.0.1", "*.oshima.dev"],
         )
 
+    # Add rate limiting middleware
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=create_rate_limiter(),
+            exempt_paths=settings.RATE_LIMIT_EXEMPT_PATHS,
+            trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+        )
+
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -64,8 +159,49 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=settings.ALLOWED_METHODS,
         allow_headers=settings.ALLOWED_HEADERS,
+        expose_headers=[
+            "ETag",
+            "Link",
+            "Retry-After",
+            "X-Next-Cursor",
+            "X-RateLimit-Limit",
+            "X-RateLimit-Remaining",
+            "X-RateLimit-Reset",
+        ],
     )
 
+    # Add compression middleware outside CORS and rate limiting, so their
+    # headers are set before the body is encoded
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            encodings=settings.COMPRESSION_ENCODINGS,
+            levels={
+                "gzip": settings.COMPRESSION_GZIP_LEVEL,
+                "br": settings.COMPRESSION_BROTLI_QUALITY,
+                "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+            },
+        )
+
+    # Add metrics middleware last so it is outermost and times the whole stack
+    app.state.metrics_enabled = False
+    if settings.METRICS_ENABLED:
+        try:
+            from app.core.metrics import MetricsMiddleware, metrics_endpoint
+        except ImportError:
+            logger.warning("prometheus-client is not installed, metrics disabled")
+        else:
+            app.add_middleware(
+                MetricsMiddleware,
+                routes=app.router.routes,
+                exclude_paths=[settings.METRICS_PATH],
+            )
+            app.add_route(
+                settings.METRICS_PATH, metrics_endpoint, include_in_schema=False
+            )
+            app.state.metrics_enabled = True
+
     # Include API routers
     app.include_router(api_router, prefix="/api/v1")
 
@@ -99,14 +235,16 @@ app = create_application()
 
 
 def main() -> None:
-    """Run the application."""
-    uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.RELOAD,
-        log_level=settings.LOG_LEVEL.lower(),
-    )
+    """Run the application (the ``oshima-api`` script).
+
+    Serves with ``SERVER_WORKERS`` supervised uvicorn workers, or with a
+    single reloading server when ``RELOAD`` is set; see :mod:`app.server`.
+    """
+    # Imported here so serving app.main:app from another server, or importing
+    # it in tests and tooling, does not pay for uvicorn
+    from app.server import serve
+
+    serve()
 
 
 if __name__ == "__main__":
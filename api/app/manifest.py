@@ -0,0 +1,99 @@
+"""Precomputed route manifest.
+
+Tooling such as ``ping_endpoints.py`` reads the manifest to list endpoints
+without importing (and so configuring) the whole application. Regenerate it
+after adding or changing routes:
+
+    python -m app.manifest          # write route_manifest.json
+    python -m app.manifest --check  # exit 1 if it is out of date
+
+The manifest is built from an app created with ``MANIFEST_SETTINGS``, so
+it does not depend on the environment: routes that only some settings add
+(``/docs`` with ``DEBUG``, ``/metrics`` with ``METRICS_ENABLED``) are left
+out.
+
+This module must stay cheap to import: it only imports the app in
+:func:`manifest_routes`.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / "route_manifest.json"
+
+# Settings that add or remove routes, pinned while building the manifest
+MANIFEST_SETTINGS: Dict[str, Any] = {"DEBUG": False, "METRICS_ENABLED": False}
+
+
+def build_manifest(routes: Any) -> List[Dict[str, Any]]:
+    """Describe every route with methods, skipping HEAD and OPTIONS."""
+    endpoints = []
+    for route in routes:
+        methods = sorted(
+            m
+            for m in getattr(route, "methods", None) or ()
+            if m not in ("HEAD", "OPTIONS")
+        )
+        if methods and hasattr(route, "path"):
+            endpoints.append(
+                {
+                    "path": route.path,
+                    "methods": methods,
+                    "name": getattr(route, "name", "unknown"),
+                    "tags": list(getattr(route, "tags", None) or []),
+                }
+            )
+    return sorted(endpoints, key=lambda endpoint: endpoint["path"])
+
+
+def manifest_routes() -> Any:
+    """Routes of an app created with ``MANIFEST_SETTINGS``."""
+    from app.core.config import settings
+    from app.main import create_application
+
+    saved = {name: getattr(settings, name) for name in MANIFEST_SETTINGS}
+    try:
+        for name, value in MANIFEST_SETTINGS.items():
+            setattr(settings, name, value)
+        return create_application().routes
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Optional[List[Dict[str, Any]]]:
+    """Return the saved manifest, or ``None`` if there is none."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def dumps(manifest: List[Dict[str, Any]]) -> str:
+    return json.dumps(manifest, indent=2) + "\n"
+
+
+def main() -> None:
+    """Write the manifest, or check it is current."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Fail if out of date")
+    parser.add_argument("--output", type=Path, default=MANIFEST_PATH)
+    args = parser.parse_args()
+
+    manifest = build_manifest(manifest_routes())
+    if args.check:
+        if load_manifest(args.output) != manifest:
+            print(f"{args.output} is out of date; run python -m app.manifest")
+            sys.exit(1)
+        return
+
+    args.output.write_text(dumps(manifest))
+    print(f"Wrote {len(manifest)} routes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
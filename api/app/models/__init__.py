@@ -0,0 +1,11 @@
+"""SQLAlchemy ORM models."""
+
+from .file import File
+from .item import Item
+from .user import User
+
+__all__ = [
+    "User",
+    "Item",
+    "File",
+]
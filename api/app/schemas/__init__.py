@@ -1,15 +1,26 @@
 """Pydantic schemas for request/response models."""
 
-from .item import Item, ItemCreate, ItemInDB, ItemUpdate
-from .user import User, UserCreate, UserInDB, UserUpdate
+from .batch import BatchResult, BatchRowResult
+from .file import FileInDB, FileInfo
+from .item import Item, ItemBatchUpdate, ItemCreate, ItemInDB, ItemUpdate
+from .token import Token, TokenRequest
+from .user import User, UserBatchUpdate, UserCreate, UserInDB, UserUpdate
 
 __all__ = [
     "User",
     "UserCreate",
     "UserUpdate",
+    "UserBatchUpdate",
     "UserInDB",
     "Item",
     "ItemCreate",
     "ItemUpdate",
+    "ItemBatchUpdate",
     "ItemInDB",
+    "BatchResult",
+    "BatchRowResult",
+    "FileInfo",
+    "FileInDB",
+    "Token",
+    "TokenRequest",
 ]
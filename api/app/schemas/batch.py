@@ -0,0 +1,22 @@
+"""Schemas for bulk create/update/delete endpoints."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class BatchRowResult(BaseModel):
+    """Outcome of one row in a batch request."""
+
+    index: int
+    status: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    """Per-row outcomes of a batch request, in request order."""
+
+    succeeded: int
+    failed: int
+    results: List[BatchRowResult]
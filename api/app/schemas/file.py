@@ -0,0 +1,27 @@
+"""File schemas for upload responses."""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class FileInDB(BaseModel):
+    """Schema for an upload record as stored."""
+
+    id: int
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class FileInfo(FileInDB):
+    """Schema for an upload response."""
+
+    # The same content was already stored and is shared with this upload
+    deduplicated: bool = False
@@ -17,7 +17,8 @@ class ItemBase(BaseModel):
 class ItemCreate(ItemBase):
     """Schema for creating an item."""
 
-    pass
+    # Defaults to the demo owner
+    owner_id: Optional[int] = None
 
 
 class ItemUpdate(BaseModel):
@@ -26,6 +27,15 @@ class ItemUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     is_active: Optional[bool] = None
+    owner_id: Optional[int] = None
+    # The version this update was based on; a 409 if the record has moved on
+    version: Optional[int] = None
+
+
+class ItemBatchUpdate(ItemUpdate):
+    """Schema for one row of a bulk item update."""
+
+    id: int
 
 
 class ItemInDB(ItemBase):
@@ -33,6 +43,7 @@ class ItemInDB(ItemBase):
 
     id: int
     owner_id: int
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -45,6 +56,7 @@ class Item(ItemBase):
 
     id: int
     owner_id: int
+    version: int
     created_at: datetime
     updated_at: datetime
 
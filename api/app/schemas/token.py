@@ -0,0 +1,18 @@
+"""Schemas for access token requests and responses."""
+
+from pydantic import BaseModel, EmailStr
+
+
+class TokenRequest(BaseModel):
+    """Credentials exchanged for an access token."""
+
+    email: EmailStr
+    password: str
+
+
+class Token(BaseModel):
+    """A bearer access token."""
+
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
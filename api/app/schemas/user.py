@@ -27,6 +27,14 @@ class UserUpdate(BaseModel):
     name: Optional[str] = None
     is_active: Optional[bool] = None
     password: Optional[str] = None
+    # The version this update was based on; a 409 if the record has moved on
+    version: Optional[int] = None
+
+
+class UserBatchUpdate(UserUpdate):
+    """Schema for one row of a bulk user update."""
+
+    id: int
 
 
 class UserInDB(UserBase):
@@ -34,6 +42,7 @@ class UserInDB(UserBase):
 
     id: int
     hashed_password: str
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -45,6 +54,7 @@ class User(UserBase):
     """Schema for user response."""
 
     id: int
+    version: int
     created_at: datetime
     updated_at: datetime
 
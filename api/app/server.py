@@ -0,0 +1,366 @@
+"""Production server: uvicorn workers under a pre-fork supervisor.
+
+The supervisor binds the listening socket once and starts
+``SERVER_WORKERS`` worker processes that accept from it, or, with
+``SERVER_REUSE_PORT``, lets every worker bind its own ``SO_REUSEPORT``
+socket so the kernel spreads connections across them. Workers that die are
+replaced. A worker that has served ``SERVER_MAX_REQUESTS`` (plus a random
+jitter) asks to be retired and keeps serving until its replacement is up.
+
+Signals to the supervisor:
+
+- ``SIGHUP``: rolling restart. Each worker is replaced by a new one that
+  has finished starting up before the old one is stopped gracefully.
+- ``SIGTTIN`` / ``SIGTTOU``: add or remove a worker.
+- ``SIGINT`` / ``SIGTERM``: stop all workers gracefully and exit.
+"""
+
+import functools
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import uvicorn
+
+# WorkerSupervisor extends uvicorn's private supervisor: it builds Process
+# objects with uvicorn's spawn context and overrides Multiprocess methods
+# (init_processes, restart_all, keep_subprocess_alive, terminate_all,
+# join_all, handle_ttin). None of this is public API, so pyproject.toml
+# pins uvicorn below the next minor release; check these hooks before
+# raising the pin.
+from uvicorn._subprocess import spawn
+from uvicorn.supervisors.multiprocess import Multiprocess, Process
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+APP = "app.main:app"
+
+
+@dataclass
+class WorkerOptions:
+    """Per-worker settings applied in the child process."""
+
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    reuse_port: bool = False
+
+
+def worker_count(configured: Optional[int] = None) -> int:
+    """The configured worker count, or one per CPU this process may use."""
+    if configured:
+        return configured
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        return os.cpu_count() or 1
+
+
+def single_worker_reason() -> Optional[str]:
+    """Why the app cannot run more than one worker, or ``None`` if it can.
+
+    Without ``DATABASE_URL`` every worker would keep its own in-memory data
+    (and ``STORE_PATH`` is locked by the first process to open it). Without
+    an explicit ``SECRET_KEY`` every worker would sign tokens with its own
+    random key, which the other workers reject.
+    """
+    if not settings.DATABASE_URL:
+        return "data is kept in the worker's memory; set DATABASE_URL"
+    if "SECRET_KEY" not in settings.model_fields_set:
+        return "each worker would generate its own SECRET_KEY; set one"
+    return None
+
+
+def safe_worker_count(workers: int) -> int:
+    """``workers``, or 1 when the app cannot share state between workers.
+
+    An explicit ``SERVER_WORKERS`` above 1 is an error; the per-CPU default
+    is quietly lowered to one worker.
+    """
+    reason = single_worker_reason()
+    if workers <= 1 or reason is None:
+        return workers
+    if settings.SERVER_WORKERS:
+        raise SystemExit(
+            f"SERVER_WORKERS={settings.SERVER_WORKERS} needs shared state: "
+            f"{reason}, or run one worker"
+        )
+    logger.warning("Running a single worker", reason=reason, cpus=workers)
+    return 1
+
+
+def reuse_port_socket(host: str, port: int) -> socket.socket:
+    """Bind a listening-ready TCP socket with ``SO_REUSEPORT`` set."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server reporting its lifecycle to the supervisor.
+
+    ``ready`` is set once startup has completed. ``retire`` is set once the
+    worker has served ``max_requests``; unlike uvicorn's own
+    ``limit_max_requests``, the worker does not exit on its own but keeps
+    serving until the supervisor stops it.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        ready: object,
+        retire: object,
+        max_requests: int = 0,
+    ) -> None:
+        super().__init__(config)
+        self.ready = ready
+        self.retire = retire
+        self.max_requests = max_requests
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.ready.set()  # type: ignore[attr-defined]
+
+    async def on_tick(self, counter: int) -> bool:
+        if (
+            self.max_requests
+            and self.server_state.total_requests >= self.max_requests
+            and not self.retire.is_set()  # type: ignore[attr-defined]
+        ):
+            self.retire.set()  # type: ignore[attr-defined]
+        return await super().on_tick(counter)
+
+
+def request_limit(max_requests: int, jitter: int) -> int:
+    """A worker's request limit: ``max_requests`` plus up to ``jitter`` more.
+
+    The jitter keeps workers started together from all retiring at once.
+    """
+    if max_requests <= 0:
+        return 0
+    return max_requests + random.randint(0, max(0, jitter))
+
+
+def run_worker(
+    options: WorkerOptions,
+    ready: object,
+    retire: object,
+    config: uvicorn.Config,
+    sockets: Optional[List[socket.socket]] = None,
+) -> None:
+    """Worker process entry point."""
+    if options.reuse_port:
+        sockets = [reuse_port_socket(config.host, config.port)]
+    max_requests = request_limit(options.max_requests, options.max_requests_jitter)
+    WorkerServer(config, ready, retire, max_requests).run(sockets=sockets)
+
+
+class WorkerSupervisor(Multiprocess):
+    """uvicorn's ``Multiprocess`` with worker options and rolling restarts.
+
+    uvicorn restarts workers by stopping each one before starting its
+    replacement; here the replacement is started, and waited for until it is
+    serving (up to ``ready_timeout`` seconds), before the old worker is
+    stopped, so capacity never drops during a restart. Workers that ask to
+    be retired are replaced the same way.
+
+    Replacements go one at a time and are advanced on each tick of the
+    supervisor loop, which never waits on a worker: signals and dead
+    workers are still handled while a replacement starts up or an old
+    worker drains.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        sockets: List[socket.socket],
+        options: WorkerOptions,
+        ready_timeout: float = 60,
+    ) -> None:
+        super().__init__(config, target=run_worker, sockets=sockets)
+        self.options = options
+        self.ready_timeout = ready_timeout
+        # Slots waiting to be replaced, the one being replaced (slot, new
+        # worker, deadline), and old workers told to stop but not yet exited
+        self.queued: List[int] = []
+        self.replacing: Optional[Tuple[int, Process, float]] = None
+        self.stopping: List[Process] = []
+
+    def spawn_worker(self) -> Process:
+        """Start one worker process."""
+        ready, retire = spawn.Event(), spawn.Event()
+        process = Process(
+            self.config,
+            functools.partial(run_worker, self.options, ready, retire, self.config),
+            self.sockets,
+        )
+        process.ready = ready  # type: ignore[attr-defined]
+        process.retire = retire  # type: ignore[attr-defined]
+        process.start()
+        return process
+
+    def init_processes(self) -> None:
+        for _ in range(self.processes_num):
+            self.processes.append(self.spawn_worker())
+
+    def replace_worker(self, index: int) -> None:
+        """Queue slot ``index`` to get a new worker before its old one stops."""
+        if index not in self.queued and (
+            self.replacing is None or self.replacing[0] != index
+        ):
+            self.queued.append(index)
+
+    def advance_replacement(self) -> None:
+        """Start the next queued replacement, or finish the current one."""
+        if self.replacing is None:
+            while self.queued:
+                index = self.queued.pop(0)
+                # SIGTTOU may have removed the slot since it was queued
+                if index < len(self.processes):
+                    deadline = time.monotonic() + self.ready_timeout
+                    self.replacing = (index, self.spawn_worker(), deadline)
+                    return
+            return
+
+        index, new, deadline = self.replacing
+        if not new.ready.is_set():  # type: ignore[attr-defined]
+            if time.monotonic() < deadline:
+                return
+            logger.warning("Worker not ready in time", pid=new.pid)
+        self.replacing = None
+        if index >= len(self.processes):
+            self.stop_worker(new)
+            return
+        old, self.processes[index] = self.processes[index], new
+        self.stop_worker(old)
+
+    def stop_worker(self, process: Process) -> None:
+        """Ask ``process`` to stop gracefully; it is reaped on a later tick."""
+        process.terminate()
+        self.stopping.append(process)
+
+    def reap_stopped(self) -> None:
+        for process in list(self.stopping):
+            if not process.process.is_alive():
+                process.join()
+                self.stopping.remove(process)
+
+    def restart_all(self) -> None:
+        for index in range(len(self.processes)):
+            self.replace_worker(index)
+
+    def keep_subprocess_alive(self) -> None:
+        self.reap_stopped()
+        if self.should_exit.is_set():
+            return
+
+        for index, process in enumerate(self.processes):
+            if self.replacing is not None and self.replacing[0] == index:
+                # Its replacement is already starting
+                continue
+            if process.retire.is_set():  # type: ignore[attr-defined]
+                if index not in self.queued:
+                    logger.info("Retiring worker", pid=process.pid)
+                    self.replace_worker(index)
+                continue
+            if process.is_alive():
+                continue
+
+            process.kill()
+            process.join()
+            if self.should_exit.is_set():
+                return
+
+            logger.info("Replacing worker", pid=process.pid)
+            self.processes[index] = self.spawn_worker()
+        self.advance_replacement()
+
+    def terminate_all(self) -> None:
+        super().terminate_all()
+        if self.replacing is not None:
+            self.stop_worker(self.replacing[1])
+            self.replacing = None
+
+    def join_all(self) -> None:
+        super().join_all()
+        for process in self.stopping:
+            process.join()
+        self.stopping.clear()
+
+    def handle_ttin(self) -> None:
+        logger.info("Received SIGTTIN, adding a worker")
+        self.processes_num += 1
+        self.processes.append(self.spawn_worker())
+
+
+def build_config(workers: int) -> uvicorn.Config:
+    """uvicorn config for ``app.main:app`` from settings."""
+    return uvicorn.Config(
+        APP,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+
+def serve() -> None:
+    """Run the API: a reloading dev server, or supervised workers."""
+    if settings.RELOAD:
+        uvicorn.run(
+            APP,
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,
+            log_level=settings.LOG_LEVEL.lower(),
+        )
+        return
+
+    workers = safe_worker_count(worker_count(settings.SERVER_WORKERS))
+    if (
+        workers > 1
+        and settings.METRICS_ENABLED
+        and not os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    ):
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set; /metrics will only show "
+            "the worker that answers the scrape"
+        )
+
+    reuse_port = settings.SERVER_REUSE_PORT
+    if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT is not supported here; sharing one socket")
+        reuse_port = False
+
+    config = build_config(workers)
+    if reuse_port:
+        sockets: List[socket.socket] = []
+        logger.info(
+            "Workers bind with SO_REUSEPORT", host=config.host, port=config.port
+        )
+    else:
+        sockets = [config.bind_socket()]
+
+    options = WorkerOptions(
+        max_requests=settings.SERVER_MAX_REQUESTS,
+        max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+        reuse_port=reuse_port,
+    )
+    logger.info("Starting workers", workers=workers)
+    WorkerSupervisor(
+        config, sockets, options, ready_timeout=settings.SERVER_READY_TIMEOUT
+    ).run()
@@ -0,0 +1,141 @@
+"""File storage: content-addressed blobs on disk plus per-upload records."""
+
+import hashlib
+import os
+import tempfile
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterable, List
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.repository import InMemoryRepository, Repository
+
+
+class FileTooLarge(Exception):
+    """The upload exceeded the store's size limit."""
+
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"File exceeds the {limit} byte limit")
+        self.limit = limit
+
+
+@dataclass
+class StoredBlob:
+    """Outcome of :meth:`FileStore.save`."""
+
+    sha256: str
+    size: int
+    # The content was already stored, so the new copy was discarded
+    deduplicated: bool
+
+
+def _write(file: Any, digest: Any, data: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so this runs in parallel
+    # with the event loop
+    digest.update(data)
+    file.write(data)
+
+
+def _finish(file: Any) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+
+
+class FileStore:
+    """Blob store under ``root``, naming each file by its SHA-256.
+
+    :meth:`save` streams chunks into a temporary file, hashing them and
+    counting their size on the way, so a file is never held in memory and an
+    oversized upload is cut off as soon as it crosses ``max_size``. Chunks
+    are gathered into ``buffer_size`` writes that run in the thread pool.
+    Once complete, the file is renamed to ``objects/<2 hex>/<62 hex>``, or
+    dropped if that content is already stored.
+    """
+
+    def __init__(self, root: str, max_size: int, buffer_size: int = 1 << 20) -> None:
+        self.root = Path(root)
+        self.max_size = max_size
+        self.buffer_size = buffer_size
+
+    def relative_path(self, sha256: str) -> str:
+        return f"objects/{sha256[:2]}/{sha256[2:]}"
+
+    def path(self, sha256: str) -> Path:
+        return self.root / self.relative_path(sha256)
+
+    async def save(self, chunks: AsyncIterable[bytes]) -> StoredBlob:
+        """Store a stream of bytes; raise :class:`FileTooLarge` past the limit."""
+        tmp_dir = self.root / "tmp"
+        await run_in_threadpool(tmp_dir.mkdir, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        file = os.fdopen(fd, "wb")
+        digest = hashlib.sha256()
+        size = 0
+        pending: List[bytes] = []
+        buffered = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_size:
+                    raise FileTooLarge(self.max_size)
+                pending.append(chunk)
+                buffered += len(chunk)
+                if buffered >= self.buffer_size:
+                    await run_in_threadpool(_write, file, digest, b"".join(pending))
+                    pending.clear()
+                    buffered = 0
+            await run_in_threadpool(_write, file, digest, b"".join(pending))
+            await run_in_threadpool(_finish, file)
+
+            sha256 = digest.hexdigest()
+            deduplicated = await run_in_threadpool(self._commit, tmp_name, sha256)
+        except BaseException:
+            # Also covers the client going away mid-upload
+            file.close()
+            with suppress(FileNotFoundError):
+                os.unlink(tmp_name)
+            raise
+        return StoredBlob(sha256, size, deduplicated)
+
+    def _commit(self, tmp_name: str, sha256: str) -> bool:
+        target = self.path(sha256)
+        if target.exists():
+            os.unlink(tmp_name)
+            return True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp creates 0600 files; a front proxy serving them needs read
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, target)
+        return False
+
+
+file_store = FileStore(
+    settings.UPLOAD_PATH, settings.MAX_FILE_SIZE, settings.UPLOAD_BUFFER_SIZE
+)
+
+# Upload records (name, type, size, hash); several may share one blob
+file_repository = InMemoryRepository()
+
+
+@lru_cache(maxsize=None)
+def _sql_file_repository() -> Repository:
+    from app.models import File as FileModel
+    from app.services.sql_repository import SQLRepository
+
+    return SQLRepository(FileModel)
+
+
+def get_file_repository() -> Repository:
+    """Dependency returning the file record repository.
+
+    Uses the database when ``DATABASE_URL`` is set, otherwise the in-memory
+    store.
+    """
+    if settings.DATABASE_URL:
+        return _sql_file_repository()
+    return file_repository
@@ -0,0 +1,50 @@
+"""Item data access."""
+
+from datetime import datetime
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.repository import InMemoryRepository, Repository
+
+# Mock data for demonstration
+MOCK_ITEMS = [
+    {
+        "id": 1,
+        "title": "Sample Item 1",
+        "description": "This is a sample item for demonstration",
+        "is_active": True,
+        "owner_id": 1,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    },
+    {
+        "id": 2,
+        "title": "Sample Item 2",
+        "description": "Another sample item",
+        "is_active": True,
+        "owner_id": 2,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    },
+]
+
+item_repository = InMemoryRepository(MOCK_ITEMS, index_fields=("owner_id", "is_active"))
+
+
+@lru_cache(maxsize=None)
+def _sql_item_repository() -> Repository:
+    from app.models import Item as ItemModel
+    from app.services.sql_repository import SQLRepository
+
+    return SQLRepository(ItemModel)
+
+
+def get_item_repository() -> Repository:
+    """Dependency returning the item repository.
+
+    Uses the database when ``DATABASE_URL`` is set, otherwise the in-memory
+    store.
+    """
+    if settings.DATABASE_URL:
+        return _sql_item_repository()
+    return item_repository
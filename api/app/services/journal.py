@@ -0,0 +1,484 @@
+"""Append-only journal and snapshots that make in-memory repositories durable.
+
+Each repository gets a directory of numbered segments::
+
+    snapshot-00000003.snap  every record as of the start of segment 3
+    journal-00000003.log    writes made since then
+
+Both start with a magic string naming the format version, then hold frames
+of ``<length:u32><crc32:u32><op:u8><payload>``; the CRC covers the op and
+payload. The payload is JSON, which reads the same on every Python version:
+a record ID for a delete, or for a put the records grouped by shape, as
+``[fields, datetime positions, rows]`` with one list of values per record.
+Datetimes are written in ISO 8601 and parsed back at the listed positions.
+Snapshots hold up to ``SNAPSHOT_BATCH`` records per put frame, add the ID
+allocator's position to their header, and are written to a temporary file
+and renamed, so a snapshot file is always complete. Recovery memory-maps the
+newest snapshot, replays the journal segments from its number on, and stops
+a segment at the first torn or corrupt frame, which can only be the tail of
+a write that was never acknowledged.
+"""
+
+import asyncio
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from pydantic_core import from_json, to_json
+from starlette.concurrency import run_in_threadpool
+
+from app.core.logging import get_logger
+from app.services.repository import InMemoryRepository
+
+logger = get_logger(__name__)
+
+PUT = 1
+DELETE = 2
+
+# Records per snapshot frame; fewer, larger frames load faster
+SNAPSHOT_BATCH = 1000
+
+_FRAME = struct.Struct("<II")  # length of op + payload, CRC32 of op + payload
+_SNAPSHOT = struct.Struct("<8sQQ")  # magic, last allocated ID, record count
+# The last character is the format version; bump it on any format change
+SNAPSHOT_MAGIC = b"OSHSNAP2"
+JOURNAL_MAGIC = b"OSHJRNL2"
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+Recovered = Tuple[List[Dict[str, Any]], int]
+
+
+class StoreLockedError(Exception):
+    """Another process has the store open."""
+
+
+class CorruptSnapshotError(Exception):
+    """A snapshot failed its checks; it was renamed into place complete, so
+    this means the disk, not a crash, damaged it."""
+
+
+class StoreFormatError(Exception):
+    """A store file is not in the format this version reads."""
+
+
+class JournalFailedError(Exception):
+    """A journal write failed, so later writes are refused until a snapshot
+    brings the disk back in line with memory."""
+
+
+def _encode(op: int, value: Any) -> bytes:
+    body = bytes((op,)) + to_json(value)
+    return _FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def _pack(records: List[Dict[str, Any]]) -> List[Any]:
+    # Field names are stored once per group rather than once per record, and
+    # JSON has no datetime type, so the positions to parse back are listed
+    groups: Dict[Tuple[Any, ...], List[List[Any]]] = {}
+    for record in records:
+        values = list(record.values())
+        dates = tuple(i for i, value in enumerate(values) if type(value) is datetime)
+        groups.setdefault((tuple(record), dates), []).append(values)
+    return [[fields, dates, rows] for (fields, dates), rows in groups.items()]
+
+
+def _unpack(groups: List[Any]) -> Iterator[Dict[str, Any]]:
+    parse = datetime.fromisoformat
+    for fields, dates, rows in groups:
+        for values in rows:
+            for i in dates:
+                values[i] = parse(values[i])
+            yield dict(zip(fields, values))
+
+
+def _check_magic(view: memoryview, magic: bytes, path: Path) -> None:
+    if bytes(view[: len(magic)]) != magic:
+        raise StoreFormatError(
+            f"{path} starts with {bytes(view[: len(magic)])!r}, not {magic!r}"
+        )
+
+
+def _replay(view: memoryview, records: Dict[int, Dict[str, Any]]) -> Tuple[int, int]:
+    """Apply the frames in ``view`` to ``records``.
+
+    Returns the number of frames applied and the offset just past the last
+    good one.
+    """
+    offset = 0
+    applied = 0
+    end = len(view)
+    while offset + _FRAME.size <= end:
+        length, crc = _FRAME.unpack_from(view, offset)
+        start = offset + _FRAME.size
+        stop = start + length
+        if length == 0 or stop > end or zlib.crc32(view[start:stop]) != crc:
+            break
+        op = view[start]
+        payload = from_json(bytes(view[start + 1 : stop]))
+        if op == PUT:
+            for record in _unpack(payload):
+                records[record["id"]] = record
+        else:
+            records.pop(payload, None)
+        applied += 1
+        offset = stop
+    return applied, offset
+
+
+def _map(path: Path, apply: Any) -> Any:
+    """Call ``apply`` with a read-only memory map of ``path``'s contents."""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return apply(memoryview(b""))
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return apply(view)
+
+
+def _sync_directory(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """Write-ahead journal and snapshots for one repository in ``directory``.
+
+    :meth:`put` and :meth:`delete` only buffer a frame; :meth:`commit` waits
+    until it is on disk. A single writer drains the buffer, so frames that
+    arrive while one write and fsync are in progress go out together in the
+    next, and concurrent requests share the cost of an fsync (group commit).
+
+    If a write fails, its frames may be missing or half written, so nothing
+    more is appended after them: the journal is marked failed, and
+    :meth:`check` and :meth:`commit` raise :class:`JournalFailedError` until
+    :meth:`snapshot` succeeds, which writes memory out whole and starts a new
+    segment.
+    """
+
+    def __init__(self, directory: Path, fsync: bool = True) -> None:
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.segment = 0
+        # Frames appended since the last snapshot
+        self.entries = 0
+        # Writes that reached disk, each covering one or more frames
+        self.flushes = 0
+        # The error that failed a write, until a snapshot succeeds
+        self.failed: Optional[Exception] = None
+        self._buffer = bytearray()
+        self._waiter: "Optional[asyncio.Future[None]]" = None
+        self._drainer: "Optional[asyncio.Task[None]]" = None
+        self._fd: Optional[int] = None
+        self._fd_segment = 0
+        self._fd_empty = False
+
+    def _path(self, kind: str, segment: int) -> Path:
+        suffix = "snap" if kind == "snapshot" else "log"
+        return self.directory / f"{kind}-{segment:08d}.{suffix}"
+
+    def _segments(self, kind: str) -> List[int]:
+        prefix = f"{kind}-"
+        return sorted(
+            int(path.stem[len(prefix) :])
+            for path in self.directory.glob(f"{prefix}*")
+            if path.stem[len(prefix) :].isdigit()
+        )
+
+    def recover(self) -> Optional[Recovered]:
+        """Load the newest snapshot and replay the journal written since.
+
+        Returns the records and the ID allocator's position, or ``None`` for
+        an empty directory. Later writes go to a new segment, so a torn tail
+        is never appended to. Blocking; run it in a thread.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshots = self._segments("snapshot")
+        journals = self._segments("journal")
+        if not snapshots and not journals:
+            return None
+
+        base = snapshots[-1] if snapshots else 0
+        records: Dict[int, Dict[str, Any]] = {}
+        last_id = 0
+        if snapshots:
+            last_id = _map(
+                self._path("snapshot", base), lambda view: self._load(view, records)
+            )
+
+        for segment in journals:
+            if segment < base:
+                continue
+            path = self._path("journal", segment)
+            applied, good, size = _map(
+                path, lambda view: (*self._replay_segment(view, records), len(view))
+            )
+            if good < size:
+                logger.warning(
+                    "Journal segment ends in a torn frame",
+                    path=str(path),
+                    frames=applied,
+                    discarded_bytes=size - good,
+                )
+
+        self.segment = max(snapshots[-1:] + journals[-1:]) + 1
+        if records:
+            last_id = max(last_id, max(records))
+        return list(records.values()), last_id
+
+    def _replay_segment(
+        self, view: memoryview, records: Dict[int, Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        # Shorter than the magic: a crash while the segment was being started
+        if len(view) < len(JOURNAL_MAGIC):
+            return 0, 0
+        _check_magic(view, JOURNAL_MAGIC, self.directory)
+        applied, good = _replay(view[len(JOURNAL_MAGIC) :], records)
+        return applied, len(JOURNAL_MAGIC) + good
+
+    def _load(self, view: memoryview, records: Dict[int, Dict[str, Any]]) -> int:
+        if len(view) < _SNAPSHOT.size:
+            raise CorruptSnapshotError(f"Truncated snapshot in {self.directory}")
+        _check_magic(view, SNAPSHOT_MAGIC, self.directory)
+        _, last_id, count = _SNAPSHOT.unpack_from(view)
+        _, good = _replay(view[_SNAPSHOT.size :], records)
+        if len(records) != count or _SNAPSHOT.size + good != len(view):
+            raise CorruptSnapshotError(
+                f"Snapshot in {self.directory} holds {len(records)} of {count} records"
+            )
+        return last_id
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Journal the current state of ``record``."""
+        self._buffer += _encode(PUT, _pack([record]))
+        self.entries += 1
+
+    def delete(self, record_id: int) -> None:
+        """Journal the deletion of ``record_id``."""
+        self._buffer += _encode(DELETE, record_id)
+        self.entries += 1
+
+    def check(self) -> None:
+        """Raise :class:`JournalFailedError` if the journal refuses writes."""
+        if self.failed is not None:
+            raise JournalFailedError(
+                f"Journal in {self.directory} failed; writes resume after a snapshot"
+            ) from self.failed
+
+    async def commit(self) -> None:
+        """Wait until every frame appended so far is on disk."""
+        self.check()
+        if self._drainer is None:
+            if not self._buffer:
+                return
+            self._drainer = asyncio.create_task(self._drain())
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        # Shielded so a cancelled request cannot fail the others in its batch
+        await asyncio.shield(self._waiter)
+
+    async def _drain(self) -> None:
+        while self._waiter is not None:
+            waiter, self._waiter = self._waiter, None
+            data, self._buffer = bytes(self._buffer), bytearray()
+            try:
+                self.check()
+                await run_in_threadpool(self._write, data, self.segment)
+            except JournalFailedError as e:
+                waiter.set_exception(e)
+            except Exception as e:
+                logger.error(
+                    "Journal write failed", directory=str(self.directory), error=str(e)
+                )
+                self.failed = e
+                waiter.set_exception(e)
+            else:
+                waiter.set_result(None)
+        self._drainer = None
+
+    def _write(self, data: bytes, segment: int) -> None:
+        if self._fd is None or self._fd_segment != segment:
+            if self._fd is not None:
+                os.close(self._fd)
+            self._fd = os.open(
+                self._path("journal", segment),
+                os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                0o644,
+            )
+            self._fd_segment = segment
+            self._fd_empty = os.fstat(self._fd).st_size == 0
+            _sync_directory(self.directory)
+        if not data:
+            return
+        if self._fd_empty:
+            data = JOURNAL_MAGIC + data
+
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+        self._fd_empty = False
+        if self.fsync:
+            _fdatasync(self._fd)
+        self.flushes += 1
+
+    async def snapshot(self, repository: InMemoryRepository) -> None:
+        """Write a compacted snapshot of ``repository`` and drop older segments.
+
+        The records are captured and a new journal segment started in one
+        step, then written out in a thread while requests carry on. A record
+        written meanwhile may be captured in either state; replaying the new
+        segment, which holds every such write, converges on the latest.
+
+        A failed journal accepts writes again once the snapshot is on disk.
+        """
+        records = list(repository)
+        last_id = repository.last_id
+        failed = self.failed
+        self.segment += 1
+        self.entries = 0
+        segment = self.segment
+
+        await run_in_threadpool(self._write_snapshot, segment, records, last_id)
+        # A write that failed while this snapshot was taken stays failed
+        if failed is not None and self.failed is failed:
+            logger.info(
+                "Journal recovered by a snapshot", directory=str(self.directory)
+            )
+            self.failed = None
+        await run_in_threadpool(self._prune, segment)
+
+    def _write_snapshot(
+        self, segment: int, records: List[Dict[str, Any]], last_id: int
+    ) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(_SNAPSHOT.pack(SNAPSHOT_MAGIC, last_id, len(records)))
+                for start in range(0, len(records), SNAPSHOT_BATCH):
+                    batch = records[start : start + SNAPSHOT_BATCH]
+                    file.write(_encode(PUT, _pack(batch)))
+                file.flush()
+                if self.fsync:
+                    os.fsync(file.fileno())
+            os.replace(tmp_name, self._path("snapshot", segment))
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(tmp_name)
+            raise
+        _sync_directory(self.directory)
+
+    def _prune(self, segment: int) -> None:
+        for kind in ("snapshot", "journal"):
+            for older in self._segments(kind):
+                if older < segment:
+                    with suppress(FileNotFoundError):
+                        os.unlink(self._path(kind, older))
+
+    async def close(self) -> None:
+        """Flush pending frames and close the segment file."""
+        if self.failed is None:
+            await self.commit()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class DurableStore:
+    """Journals for a set of named in-memory repositories under ``root``.
+
+    :meth:`open` restores each repository from its directory, or snapshots
+    its current contents when the directory is new, then journals its
+    writes. Every ``snapshot_interval`` seconds, repositories with at least
+    ``snapshot_min_entries`` journaled writes get a fresh snapshot, which
+    bounds both disk use and recovery time. Only one process may have a
+    store open; a second one gets :class:`StoreLockedError`.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        repositories: Mapping[str, InMemoryRepository],
+        fsync: bool = True,
+        snapshot_interval: float = 60.0,
+        snapshot_min_entries: int = 10000,
+    ) -> None:
+        self.root = Path(root)
+        self.repositories = dict(repositories)
+        self.journals = {
+            name: Journal(self.root / name, fsync=fsync) for name in repositories
+        }
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_min_entries = snapshot_min_entries
+        self._task: "Optional[asyncio.Task[None]]" = None
+        self._lock: Optional[int] = None
+
+    def _acquire(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise StoreLockedError(f"{self.root} is open in another process")
+        self._lock = fd
+
+    async def open(self) -> None:
+        """Recover every repository and start journaling and snapshots."""
+        await run_in_threadpool(self._acquire)
+        for name, repository in self.repositories.items():
+            journal = self.journals[name]
+            started = time.perf_counter()
+            recovered = await run_in_threadpool(journal.recover)
+            if recovered is None:
+                await journal.snapshot(repository)
+            else:
+                repository.restore(*recovered)
+            repository.attach(journal)
+            logger.info(
+                "Store opened",
+                name=name,
+                records=len(repository),
+                recovered=recovered is not None,
+                seconds=round(time.perf_counter() - started, 3),
+            )
+        self._task = asyncio.create_task(self._snapshot_forever())
+
+    async def snapshot(self, min_entries: int = 1) -> None:
+        """Snapshot every repository with at least ``min_entries`` new writes,
+        and every one whose journal has failed."""
+        for name, journal in self.journals.items():
+            if journal.failed is not None or journal.entries >= min_entries:
+                await journal.snapshot(self.repositories[name])
+
+    async def _snapshot_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await self.snapshot(self.snapshot_min_entries)
+            except Exception as e:
+                logger.error("Snapshot failed", error=str(e))
+
+    async def close(self) -> None:
+        """Stop snapshotting, flush every journal and detach it."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for name, journal in self.journals.items():
+            await journal.close()
+            self.repositories[name].attach(None)
+        if self._lock is not None:
+            os.close(self._lock)
+            self._lock = None
@@ -0,0 +1,212 @@
+"""Password hashing in a bounded process pool.
+
+bcrypt and argon2 are deliberately slow (a few hundred milliseconds per
+hash at the default cost), so hashing on the event loop would stall every
+other request. Hashes are computed in worker processes instead, which also
+keeps them off the default thread pool that sync dependencies run in. At
+most ``max_concurrency`` hash jobs are handed to the pool at once; callers
+over the cap wait for a slot for up to ``queue_timeout`` seconds and then
+get :class:`PasswordHashingBusy`, so a signup burst queues in front of the
+pool rather than starving the rest of the API.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Passwords hashed per pool job by hash_many
+HASH_CHUNK_SIZE = 16
+
+
+class PasswordHashingBusy(Exception):
+    """No hashing slot became free within the queue timeout."""
+
+
+@functools.lru_cache(maxsize=None)
+def _context(scheme: str, rounds: int) -> Any:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=[scheme], **{f"{scheme}__rounds": rounds})
+
+
+def _init_worker() -> None:
+    # passlib 1.7 cannot read the version of bcrypt>=4.1 and logs a
+    # harmless traceback about it on first use
+    logging.getLogger("passlib").setLevel(logging.ERROR)
+
+
+def _hash(scheme: str, rounds: int, passwords: Sequence[str]) -> List[str]:
+    context = _context(scheme, rounds)
+    return [context.hash(password) for password in passwords]
+
+
+def _verify(scheme: str, rounds: int, password: str, hashed: str) -> bool:
+    return bool(_context(scheme, rounds).verify(password, hashed))
+
+
+class PasswordHasher:
+    """Hash and verify passwords with passlib in a ``ProcessPoolExecutor``.
+
+    ``scheme`` is a passlib scheme name (``"bcrypt"``, or ``"argon2"`` with
+    argon2-cffi installed) and ``rounds`` its cost: log2 rounds for bcrypt,
+    time cost for argon2. The pool starts on first use, or on :meth:`start`.
+    """
+
+    def __init__(
+        self,
+        scheme: str = "bcrypt",
+        rounds: int = 12,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        queue_timeout: float = 5.0,
+    ) -> None:
+        self.scheme = scheme
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        # Batches together keep one slot free for single hashes and verifies
+        self.batch_concurrency = max(1, self.max_concurrency - 1)
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the server process runs threads (the log
+            # writer) whose locks a forked child could inherit mid-use
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _semaphores(self) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        # Semaphores belong to one event loop; TestClient and the
+        # benchmarks run the app in a fresh loop each time
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._batch_slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._batch_slots = asyncio.Semaphore(self.batch_concurrency)
+            self._loop = loop
+        return self._slots, self._batch_slots
+
+    async def _run(self, func: Any, *args: Any, batch: bool = False) -> Any:
+        slots, batch_slots = self._semaphores()
+        held: List[asyncio.Semaphore] = []
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                for semaphore in (batch_slots, slots) if batch else (slots,):
+                    await semaphore.acquire()
+                    held.append(semaphore)
+        except TimeoutError:
+            for semaphore in held:
+                semaphore.release()
+            logger.warning("Password hashing queue timeout", timeout=self.queue_timeout)
+            raise PasswordHashingBusy from None
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool(), func, self.scheme, self.rounds, *args
+            )
+        finally:
+            for semaphore in held:
+                semaphore.release()
+
+    async def start(self) -> None:
+        """Start every worker process now rather than on the first hash."""
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _hash, self.scheme, self.rounds, [])
+                for _ in range(self.workers)
+            )
+        )
+
+    def close(self) -> None:
+        """Stop the worker processes, dropping queued jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        """Hash one password.
+
+        Raises :class:`PasswordHashingBusy` if no slot frees up in time.
+        """
+        (hashed,) = await self._run(_hash, [password])
+        return hashed
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[Optional[str]]:
+        """Hash many passwords, in order, a chunk per pool job.
+
+        All running batches together take at most ``max_concurrency - 1``
+        slots, so a single hash or verify still gets one while they run
+        (unless ``max_concurrency`` is 1).
+        Once a chunk gets no slot within ``queue_timeout``, no further chunk
+        is started. Their passwords come back as ``None`` rather than
+        failing the batch, so the caller can report them row by row.
+        """
+        chunks = [
+            passwords[start : start + HASH_CHUNK_SIZE]
+            for start in range(0, len(passwords), HASH_CHUNK_SIZE)
+        ]
+        results: List[Optional[List[str]]] = [None for _ in chunks]
+        pending: Iterator[int] = iter(range(len(chunks)))
+        busy = False
+
+        async def lane() -> None:
+            nonlocal busy
+            for index in pending:
+                if busy:
+                    return
+                try:
+                    results[index] = await self._run(_hash, chunks[index], batch=True)
+                except PasswordHashingBusy:
+                    busy = True
+
+        lanes = [
+            asyncio.ensure_future(lane())
+            for _ in range(min(self.batch_concurrency, len(chunks)))
+        ]
+        try:
+            await asyncio.gather(*lanes)
+        except BaseException:
+            for task in lanes:
+                task.cancel()
+            raise
+        return [
+            hashed
+            for chunk, result in zip(chunks, results)
+            for hashed in (result if result is not None else [None] * len(chunk))
+        ]
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Check ``password`` against a stored hash."""
+        return bool(await self._run(_verify, password, hashed))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether ``hashed`` was made with another scheme or cost."""
+        return bool(_context(self.scheme, self.rounds).needs_update(hashed))
+
+
+password_hasher = PasswordHasher(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    rounds=settings.PASSWORD_HASH_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
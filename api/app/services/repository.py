@@ -0,0 +1,493 @@
+"""In-memory repository with hash indexes for record lookups."""
+
+import heapq
+from bisect import bisect_right, insort
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from app.services.journal import Journal
+
+
+class DuplicateKeyError(Exception):
+    """Raised when a write would violate a unique index."""
+
+    def __init__(self, field: str, value: Any) -> None:
+        super().__init__(f"Duplicate value for unique field {field!r}: {value!r}")
+        self.field = field
+        self.value = value
+
+
+class VersionConflictError(Exception):
+    """Raised when a write expected a version the record has moved past."""
+
+    def __init__(self, record_id: int, expected: int, actual: Optional[int]) -> None:
+        super().__init__(
+            f"Record {record_id} is at version {actual}, not {expected}"
+            if actual is not None
+            else f"Record {record_id} changed since version {expected}"
+        )
+        self.record_id = record_id
+        self.expected = expected
+        # None when a concurrent writer got there first and the new version
+        # is not known
+        self.actual = actual
+
+
+WriteError = Union[DuplicateKeyError, VersionConflictError]
+
+
+class Repository(Protocol):
+    """Interface shared by the in-memory and SQL repositories."""
+
+    async def get(self, record_id: int) -> Optional[Dict[str, Any]]: ...
+
+    async def get_by(self, field: str, value: Any) -> Optional[Dict[str, Any]]: ...
+
+    async def list(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    async def create(self, data: Dict[str, Any]) -> Dict[str, Any]: ...
+
+    async def update(
+        self,
+        record_id: int,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]: ...
+
+    async def delete(
+        self, record_id: int, expected_version: Optional[int] = None
+    ) -> bool: ...
+
+    async def create_many(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Union[Dict[str, Any], DuplicateKeyError]]: ...
+
+    async def update_many(
+        self,
+        changes: List[Tuple[int, Dict[str, Any]]],
+        expected_versions: Optional[Sequence[Optional[int]]] = None,
+    ) -> List[Union[Dict[str, Any], WriteError, None]]: ...
+
+    async def delete_many(self, record_ids: List[int]) -> List[bool]: ...
+
+    async def collection_version(self) -> str: ...
+
+
+class InMemoryRepository:
+    """Dict-backed record store.
+
+    Records are plain dicts keyed by their ``id``. Primary-key lookups, unique
+    field lookups and deletes are all O(1). IDs come from a monotonic allocator,
+    so they are never reused after a delete.
+
+    A sorted list of IDs backs keyset pagination. Deletes leave a tombstone in
+    that list, which is compacted once tombstones outnumber live rows.
+
+    Each of ``index_fields`` gets a secondary index from value to the set of
+    IDs holding it, kept current by every write, so :meth:`list` can filter
+    on those fields without scanning the collection.
+
+    Every record carries a ``version``, starting at 1. Records are never
+    changed in place: an update stores a new dict with the next version, so
+    a record handed out earlier stays a consistent snapshot. Updates and
+    deletes given an ``expected_version`` raise :class:`VersionConflictError`
+    unless the record is still at it. Nothing awaits between that check and
+    the write, so on the event loop the compare-and-swap is atomic without
+    any lock.
+
+    With a :class:`~app.services.journal.Journal` attached, every write is
+    journaled and the write methods return once it is on disk.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Dict[str, Any]] = (),
+        unique_fields: Iterable[str] = (),
+        index_fields: Iterable[str] = (),
+    ) -> None:
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._unique: Dict[str, Dict[Any, int]] = {field: {} for field in unique_fields}
+        self._indexes: Dict[str, Dict[Any, Set[int]]] = {
+            field: {} for field in index_fields
+        }
+        self._ids: List[int] = []
+        self._last_id = 0
+        self._version = 0
+        self._journal: Optional["Journal"] = None
+
+        for record in records:
+            self._insert(dict(record))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._rows
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._rows.values())
+
+    @property
+    def last_id(self) -> int:
+        """The highest ID allocated so far, including deleted ones."""
+        return self._last_id
+
+    def attach(self, journal: Optional["Journal"]) -> None:
+        """Journal every later write to ``journal``; ``None`` detaches."""
+        self._journal = journal
+
+    def restore(self, records: Iterable[Dict[str, Any]], last_id: int = 0) -> None:
+        """Replace the contents with ``records``, e.g. recovered from disk.
+
+        The indexes are rebuilt in bulk rather than record by record, and
+        nothing is journaled. IDs up to ``last_id`` are treated as allocated,
+        so IDs of deleted records are not handed out again.
+        """
+        rows = {record["id"]: record for record in records}
+        for record in rows.values():
+            record.setdefault("version", 1)
+        unique: Dict[str, Dict[Any, int]] = {field: {} for field in self._unique}
+        for field, index in unique.items():
+            for record_id, record in rows.items():
+                if field in record:
+                    if index.setdefault(record[field], record_id) != record_id:
+                        raise DuplicateKeyError(field, record[field])
+        indexes: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self._indexes}
+        for field, secondary in indexes.items():
+            for record_id, record in rows.items():
+                if field in record:
+                    ids = secondary.get(record[field])
+                    if ids is None:
+                        secondary[record[field]] = {record_id}
+                    else:
+                        ids.add(record_id)
+
+        self._rows = rows
+        self._ids = sorted(rows)
+        self._unique = unique
+        self._indexes = indexes
+        self._last_id = max(last_id, self._ids[-1] if self._ids else 0)
+        self._version += 1
+
+    def _check_journal(self) -> None:
+        # Refuse a write before it changes anything once the journal has
+        # failed, so memory runs ahead of disk by at most the failed batch
+        if self._journal is not None:
+            self._journal.check()
+
+    async def _commit(self) -> None:
+        if self._journal is not None:
+            await self._journal.commit()
+
+    def _allocate_id(self) -> int:
+        self._last_id += 1
+        return self._last_id
+
+    def _check_unique(self, record: Dict[str, Any], record_id: Optional[int]) -> None:
+        for field, index in self._unique.items():
+            if field not in record:
+                continue
+            owner = index.get(record[field])
+            if owner is not None and owner != record_id:
+                raise DuplicateKeyError(field, record[field])
+
+    def _insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        self._check_journal()
+        self._check_unique(record, None)
+
+        if record.get("id") is None:
+            record["id"] = self._allocate_id()
+        elif record["id"] in self._rows:
+            raise DuplicateKeyError("id", record["id"])
+
+        record.setdefault("version", 1)
+        record_id = record["id"]
+        if record_id > self._last_id:
+            self._ids.append(record_id)
+            self._last_id = record_id
+        else:
+            insort(self._ids, record_id)
+        self._rows[record_id] = record
+        for field, index in self._unique.items():
+            if field in record:
+                index[record[field]] = record_id
+        for field, secondary in self._indexes.items():
+            if field in record:
+                secondary.setdefault(record[field], set()).add(record_id)
+        self._version += 1
+        if self._journal is not None:
+            self._journal.put(record)
+        return record
+
+    def _unindex(self, field: str, value: Any, record_id: int) -> None:
+        ids = self._indexes[field].get(value)
+        if ids is not None:
+            ids.discard(record_id)
+            if not ids:
+                del self._indexes[field][value]
+
+    async def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """Return the record with the given ID, or ``None``."""
+        return self._rows.get(record_id)
+
+    async def get_by(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Return the record whose unique ``field`` equals ``value``, or ``None``."""
+        record_id = self._unique[field].get(value)
+        if record_id is None:
+            return None
+        return self._rows[record_id]
+
+    def _compact(self) -> None:
+        self._ids = [record_id for record_id in self._ids if record_id in self._rows]
+
+    async def list(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return records in ID order.
+
+        Only records with an ID greater than ``after`` are returned, up to
+        ``limit`` of them. The cost is O(log n + limit) regardless of how deep
+        into the collection the page starts.
+
+        ``filters`` maps indexed fields to the value they must equal. The
+        matching ID sets are intersected smallest first, so the cost follows
+        the most selective filter rather than the collection size.
+        """
+        if filters:
+            return self._list_filtered(after, limit, filters)
+
+        ids = self._ids
+        rows = self._rows
+        start = 0 if after is None else bisect_right(ids, after)
+        page: List[Dict[str, Any]] = []
+
+        for position in range(start, len(ids)):
+            record = rows.get(ids[position])
+            if record is None:
+                continue
+            page.append(record)
+            if limit is not None and len(page) >= limit:
+                break
+        return page
+
+    def _list_filtered(
+        self, after: Optional[int], limit: Optional[int], filters: Mapping[str, Any]
+    ) -> List[Dict[str, Any]]:
+        empty: Set[int] = set()
+        smallest, *rest = sorted(
+            (
+                self._indexes[field].get(value, empty)
+                for field, value in filters.items()
+            ),
+            key=len,
+        )
+        if not smallest or limit == 0:
+            return []
+
+        # Either pick the page out of the smallest ID set, which costs its
+        # size, or walk the ID list testing membership until the page is
+        # full, which takes about limit * n / len(smallest) steps
+        rows = self._rows
+        scan_cost = len(rows) if limit is None else limit * len(rows) // len(smallest)
+        if len(smallest) <= scan_cost:
+            matches: Iterable[int] = (
+                record_id
+                for record_id in smallest
+                if (after is None or record_id > after)
+                and all(record_id in ids for ids in rest)
+            )
+            if limit is None:
+                return [rows[record_id] for record_id in sorted(matches)]
+            return [rows[record_id] for record_id in heapq.nsmallest(limit, matches)]
+
+        sets = [smallest, *rest]
+        ids = self._ids
+        start = 0 if after is None else bisect_right(ids, after)
+        page: List[Dict[str, Any]] = []
+        for position in range(start, len(ids)):
+            record_id = ids[position]
+            if all(record_id in matching for matching in sets):
+                page.append(rows[record_id])
+                if limit is not None and len(page) >= limit:
+                    break
+        return page
+
+    async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new record and assign it the next ID."""
+        record = dict(data)
+        record["id"] = None
+        record["version"] = 1
+        record = self._insert(record)
+        await self._commit()
+        return record
+
+    def _check_version(
+        self, record: Dict[str, Any], expected_version: Optional[int]
+    ) -> None:
+        if expected_version is not None and record["version"] != expected_version:
+            raise VersionConflictError(
+                record["id"], expected_version, record["version"]
+            )
+
+    def _update(
+        self,
+        record_id: int,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        self._check_journal()
+        record = self._rows.get(record_id)
+        if record is None:
+            return None
+        self._check_version(record, expected_version)
+
+        changes = {
+            field: value
+            for field, value in changes.items()
+            if field in record and field != "version"
+        }
+        self._check_unique(changes, record_id)
+
+        for field, index in self._unique.items():
+            if field in changes and changes[field] != record[field]:
+                del index[record[field]]
+                index[changes[field]] = record_id
+        for field, secondary in self._indexes.items():
+            if field in changes and changes[field] != record[field]:
+                self._unindex(field, record[field], record_id)
+                secondary.setdefault(changes[field], set()).add(record_id)
+
+        # A new dict, so a snapshot being written never sees a record change
+        updated = {**record, **changes, "version": record["version"] + 1}
+        self._rows[record_id] = updated
+        self._version += 1
+        if self._journal is not None:
+            self._journal.put(updated)
+        return updated
+
+    def _delete(self, record_id: int, expected_version: Optional[int] = None) -> bool:
+        self._check_journal()
+        record = self._rows.get(record_id)
+        if record is None:
+            return False
+        self._check_version(record, expected_version)
+        del self._rows[record_id]
+
+        for field, index in self._unique.items():
+            index.pop(record.get(field), None)
+        for field in self._indexes:
+            if field in record:
+                self._unindex(field, record[field], record_id)
+        self._version += 1
+        if self._journal is not None:
+            self._journal.delete(record_id)
+        return True
+
+    async def update(
+        self,
+        record_id: int,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Apply ``changes`` to an existing record and bump its version.
+
+        Unknown fields are ignored. Returns the updated record, or ``None`` if
+        no record has the given ID. Raises :class:`VersionConflictError` if
+        ``expected_version`` is given and the record is at another version.
+        """
+        record = self._update(record_id, changes, expected_version)
+        await self._commit()
+        return record
+
+    async def delete(
+        self, record_id: int, expected_version: Optional[int] = None
+    ) -> bool:
+        """Delete a record. Returns ``False`` if it did not exist.
+
+        Raises :class:`VersionConflictError` if ``expected_version`` is given
+        and the record is at another version.
+        """
+        deleted = self._delete(record_id, expected_version)
+        if len(self._ids) > 2 * len(self._rows) + 64:
+            self._compact()
+        await self._commit()
+        return deleted
+
+    async def create_many(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Union[Dict[str, Any], DuplicateKeyError]]:
+        """Insert several records in one step.
+
+        Returns one entry per row, in order: the stored record, or the
+        :class:`DuplicateKeyError` that rejected it. Rows are checked against
+        the unique indexes, including rows earlier in the same batch. Nothing
+        awaits in between, so no other request sees a partial batch.
+        """
+        results: List[Union[Dict[str, Any], DuplicateKeyError]] = []
+        for data in rows:
+            record = dict(data)
+            record["id"] = None
+            record["version"] = 1
+            try:
+                results.append(self._insert(record))
+            except DuplicateKeyError as e:
+                results.append(e)
+        await self._commit()
+        return results
+
+    async def update_many(
+        self,
+        changes: List[Tuple[int, Dict[str, Any]]],
+        expected_versions: Optional[Sequence[Optional[int]]] = None,
+    ) -> List[Union[Dict[str, Any], WriteError, None]]:
+        """Apply several ``(record_id, changes)`` pairs in one step.
+
+        ``expected_versions``, if given, holds one expected version (or
+        ``None``) per pair. Returns one entry per pair: the updated record,
+        ``None`` if the ID does not exist, or the :class:`DuplicateKeyError`
+        or :class:`VersionConflictError` that rejected it.
+        """
+        if expected_versions is None:
+            expected_versions = [None] * len(changes)
+        results: List[Union[Dict[str, Any], WriteError, None]] = []
+        for (record_id, row_changes), expected in zip(changes, expected_versions):
+            try:
+                results.append(self._update(record_id, row_changes, expected))
+            except (DuplicateKeyError, VersionConflictError) as e:
+                results.append(e)
+        await self._commit()
+        return results
+
+    async def delete_many(self, record_ids: List[int]) -> List[bool]:
+        """Delete several records in one step; ``False`` for missing IDs."""
+        results = [self._delete(record_id) for record_id in record_ids]
+        if len(self._ids) > 2 * len(self._rows) + 64:
+            self._compact()
+        await self._commit()
+        return results
+
+    async def collection_version(self) -> str:
+        """Return a token that changes whenever any record is written."""
+        return str(self._version)
@@ -0,0 +1,336 @@
+"""SQLAlchemy-backed repository."""
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.db import session as db
+from app.db.base import Base
+from app.services.repository import (
+    DuplicateKeyError,
+    VersionConflictError,
+    WriteError,
+)
+
+# Largest number of bound parameters put in one IN (...) clause
+IN_CHUNK_SIZE = 500
+
+
+def _chunks(
+    values: Sequence[Any], size: int = IN_CHUNK_SIZE
+) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class SQLRepository:
+    """Repository over one ORM model with the same interface as
+    :class:`~app.services.repository.InMemoryRepository`.
+
+    Every call runs in its own short transaction, so a pooled connection is
+    only checked out for the duration of a single query and is never held
+    across the handler's other awaits (or while a response is streaming).
+
+    The model's ``version`` column is its mapper's ``version_id_col``, so
+    each UPDATE matches only the version that was read and a concurrent
+    writer is detected by the row count rather than held off by a lock.
+    """
+
+    def __init__(
+        self,
+        model: Type[Base],
+        unique_fields: Iterable[str] = (),
+        sessions: Optional[async_sessionmaker[AsyncSession]] = None,
+    ) -> None:
+        self.model = model
+        self.unique_fields = tuple(unique_fields)
+        self._sessions = sessions
+        self._columns = tuple(model.__table__.columns.keys())
+        self._writable = frozenset(self._columns) - {"id", "version"}
+
+    @property
+    def sessions(self) -> async_sessionmaker[AsyncSession]:
+        factory = self._sessions or db.session_factory
+        if factory is None:
+            raise RuntimeError("Database is not initialised; call init_db() first")
+        return factory
+
+    def _to_dict(self, instance: Any) -> Dict[str, Any]:
+        return {column: getattr(instance, column) for column in self._columns}
+
+    def _duplicate(self, data: Dict[str, Any]) -> DuplicateKeyError:
+        field = next((f for f in self.unique_fields if f in data), "id")
+        return DuplicateKeyError(field, data.get(field))
+
+    async def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """Return the record with the given ID, or ``None``."""
+        async with self.sessions() as session:
+            instance = await session.get(self.model, record_id)
+            return self._to_dict(instance) if instance is not None else None
+
+    async def get_by(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Return the record whose unique ``field`` equals ``value``, or ``None``."""
+        query = select(self.model).where(getattr(self.model, field) == value)
+        async with self.sessions() as session:
+            instance = (await session.execute(query)).scalar_one_or_none()
+            return self._to_dict(instance) if instance is not None else None
+
+    async def list(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return records in ID order, starting after the ``after`` ID.
+
+        ``filters`` maps columns to the value they must equal; the database
+        picks which index to use.
+        """
+        columns = self.model.__table__.c
+        query = select(self.model).order_by(columns.id)
+        if after is not None:
+            query = query.where(columns.id > after)
+        for field, value in (filters or {}).items():
+            query = query.where(getattr(self.model, field) == value)
+        if limit is not None:
+            query = query.limit(limit)
+
+        async with self.sessions() as session:
+            result = await session.execute(query)
+            return [self._to_dict(instance) for instance in result.scalars()]
+
+    async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new record; the database assigns the ID."""
+        values = {k: v for k, v in data.items() if k in self._writable}
+        instance = self.model(**values)
+
+        try:
+            async with self.sessions.begin() as session:
+                session.add(instance)
+        except IntegrityError:
+            raise self._duplicate(values)
+
+        return self._to_dict(instance)
+
+    async def update(
+        self,
+        record_id: int,
+        changes: Dict[str, Any],
+        expected_version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Apply ``changes`` to an existing record. Unknown fields are ignored.
+
+        Raises :class:`VersionConflictError` if ``expected_version`` is given
+        and the row is at, or moves on to, another version. Without it, an
+        update that loses a race is retried against the new row.
+        """
+        values = {k: v for k, v in changes.items() if k in self._writable}
+
+        while True:
+            try:
+                async with self.sessions.begin() as session:
+                    instance: Any = await session.get(self.model, record_id)
+                    if instance is None:
+                        return None
+                    if expected_version not in (None, instance.version):
+                        raise VersionConflictError(
+                            record_id, expected_version, instance.version
+                        )
+                    for field, value in values.items():
+                        setattr(instance, field, value)
+            except IntegrityError:
+                raise self._duplicate(values)
+            except StaleDataError:
+                if expected_version is not None:
+                    raise VersionConflictError(record_id, expected_version, None)
+                continue
+            return self._to_dict(instance)
+
+    async def delete(
+        self, record_id: int, expected_version: Optional[int] = None
+    ) -> bool:
+        """Delete a record. Returns ``False`` if it did not exist.
+
+        Raises :class:`VersionConflictError` if ``expected_version`` is given
+        and the row is at another version.
+        """
+        columns = self.model.__table__.c
+        query = delete(self.model).where(columns.id == record_id)
+        if expected_version is not None:
+            query = query.where(columns.version == expected_version)
+        async with self.sessions.begin() as session:
+            result = await session.execute(query)
+            if result.rowcount == 0 and expected_version is not None:
+                actual = await session.scalar(
+                    select(columns.version).where(columns.id == record_id)
+                )
+                if actual is not None:
+                    raise VersionConflictError(record_id, expected_version, actual)
+        return result.rowcount > 0
+
+    async def _existing(
+        self, session: AsyncSession, field: str, values: List[Any]
+    ) -> set:
+        column = getattr(self.model, field)
+        found: set = set()
+        for chunk in _chunks(values):
+            result = await session.execute(select(column).where(column.in_(chunk)))
+            found.update(result.scalars())
+        return found
+
+    async def create_many(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Union[Dict[str, Any], DuplicateKeyError]]:
+        """Insert several records in one transaction.
+
+        Unique fields are checked up front, against the batch itself and with
+        one ``IN`` query per chunk against the table, so rejected rows are
+        reported individually and the rest are inserted together. If a
+        concurrent writer still causes a conflict, the batch falls back to
+        row-by-row inserts.
+        """
+        values = [{k: v for k, v in row.items() if k in self._writable} for row in rows]
+        results: List[Union[Dict[str, Any], DuplicateKeyError, None]] = [None] * len(
+            values
+        )
+
+        try:
+            async with self.sessions.begin() as session:
+                for field in self.unique_fields:
+                    seen: set = set()
+                    for i, row in enumerate(values):
+                        value = row.get(field)
+                        if results[i] is None and value is not None:
+                            if value in seen:
+                                results[i] = DuplicateKeyError(field, value)
+                            seen.add(value)
+                    taken = await self._existing(session, field, list(seen))
+                    for i, row in enumerate(values):
+                        if results[i] is None and row.get(field) in taken:
+                            results[i] = DuplicateKeyError(field, row[field])
+
+                pending = [i for i, result in enumerate(results) if result is None]
+                instances = [self.model(**values[i]) for i in pending]
+                session.add_all(instances)
+        except IntegrityError:
+            return [await self._create_or_error(row) for row in rows]
+
+        for i, instance in zip(pending, instances):
+            results[i] = self._to_dict(instance)
+        return results  # type: ignore[return-value]
+
+    async def _create_or_error(
+        self, row: Dict[str, Any]
+    ) -> Union[Dict[str, Any], DuplicateKeyError]:
+        try:
+            return await self.create(row)
+        except DuplicateKeyError as e:
+            return e
+
+    async def update_many(
+        self,
+        changes: List[Tuple[int, Dict[str, Any]]],
+        expected_versions: Optional[Sequence[Optional[int]]] = None,
+    ) -> List[Union[Dict[str, Any], WriteError, None]]:
+        """Apply several ``(record_id, changes)`` pairs in one transaction.
+
+        The rows are loaded with one ``IN`` query per chunk. Pairs whose row
+        is not at its entry in ``expected_versions`` are reported as
+        :class:`VersionConflictError` and skipped. If the batch violates a
+        unique index or races a concurrent writer it is retried row by row,
+        so only the offending rows are reported.
+        """
+        if expected_versions is None:
+            expected_versions = [None] * len(changes)
+        ids = list({record_id for record_id, _ in changes})
+        column = self.model.__table__.c.id
+        results: List[Union[Dict[str, Any], WriteError, None]] = []
+
+        try:
+            async with self.sessions.begin() as session:
+                instances: Dict[int, Any] = {}
+                instance: Any
+                for chunk in _chunks(ids):
+                    query = select(self.model).where(column.in_(chunk))
+                    for instance in (await session.execute(query)).scalars():
+                        instances[instance.id] = instance
+
+                for (record_id, row_changes), expected in zip(
+                    changes, expected_versions
+                ):
+                    target = instances.get(record_id)
+                    if target is None:
+                        results.append(None)
+                        continue
+                    if expected not in (None, target.version):
+                        results.append(
+                            VersionConflictError(record_id, expected, target.version)
+                        )
+                        continue
+                    for field, value in row_changes.items():
+                        if field in self._writable:
+                            setattr(target, field, value)
+                    results.append(target)
+        except (IntegrityError, StaleDataError):
+            return [
+                await self._update_or_error(*change, expected)
+                for change, expected in zip(changes, expected_versions)
+            ]
+
+        return [
+            self._to_dict(result) if isinstance(result, self.model) else result
+            for result in results
+        ]
+
+    async def _update_or_error(
+        self, record_id: int, changes: Dict[str, Any], expected: Optional[int]
+    ) -> Union[Dict[str, Any], WriteError, None]:
+        try:
+            return await self.update(record_id, changes, expected)
+        except (DuplicateKeyError, VersionConflictError) as e:
+            return e
+
+    async def delete_many(self, record_ids: List[int]) -> List[bool]:
+        """Delete several records in one transaction; ``False`` for missing IDs."""
+        async with self.sessions.begin() as session:
+            existing = await self._existing(session, "id", list(set(record_ids)))
+            column = self.model.__table__.c.id
+            for chunk in _chunks(list(existing)):
+                await session.execute(delete(self.model).where(column.in_(chunk)))
+
+        deleted: set = set()
+        results = []
+        for record_id in record_ids:
+            results.append(record_id in existing and record_id not in deleted)
+            deleted.add(record_id)
+        return results
+
+    async def collection_version(self) -> str:
+        """Return a token that changes whenever any record is written.
+
+        Other workers share the database, so the token is derived from the
+        table itself: every create, update or delete changes the row count,
+        the highest ID or the latest ``updated_at``.
+        """
+        columns = self.model.__table__.c
+        query = select(
+            func.count(), func.max(columns.id), func.max(columns.updated_at)
+        ).select_from(self.model)
+        async with self.sessions() as session:
+            count, last_id, last_update = (await session.execute(query)).one()
+        return f"{count}:{last_id}:{last_update}"
@@ -0,0 +1,50 @@
+"""User data access."""
+
+from datetime import datetime
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.repository import InMemoryRepository, Repository
+
+# Mock data for demonstration
+MOCK_USERS = [
+    {
+        "id": 1,
+        "email": "alice@example.com",
+        "name": "Alice Johnson",
+        "is_active": True,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    },
+    {
+        "id": 2,
+        "email": "bob@example.com",
+        "name": "Bob Smith",
+        "is_active": True,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    },
+]
+
+user_repository = InMemoryRepository(
+    MOCK_USERS, unique_fields=("email",), index_fields=("is_active",)
+)
+
+
+@lru_cache(maxsize=None)
+def _sql_user_repository() -> Repository:
+    from app.models import User as UserModel
+    from app.services.sql_repository import SQLRepository
+
+    return SQLRepository(UserModel, unique_fields=("email",))
+
+
+def get_user_repository() -> Repository:
+    """Dependency returning the user repository.
+
+    Uses the database when ``DATABASE_URL`` is set, otherwise the in-memory
+    store.
+    """
+    if settings.DATABASE_URL:
+        return _sql_user_repository()
+    return user_repository
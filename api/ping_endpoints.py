@@ -4,9 +4,16 @@ Intelligent API Endpoint Ping Script
 Automatically discovers and tests all FastAPI endpoints
 """
 
+import argparse
 import asyncio
+import itertools
 import json
+import logging
+import math
+import re
 import sys
+import time
+from collections import Counter
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -18,52 +25,69 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.tree import Tree
 
-# Import the FastAPI app to introspect routes
-try:
-    from app.main import app
-except ImportError:
-    print(
-        "❌ Error: Could not import FastAPI app. Make sure you're in the api directory."
-    )
-    sys.exit(1)
+from app.manifest import build_manifest, load_manifest
 
 console = Console()
 logger = structlog.get_logger(__name__)
 
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+def percentile(sorted_values: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def fill_path_params(path: str, value: str = "1") -> str:
+    """Replace ``{param}`` placeholders so a route can be requested."""
+    return re.sub(r"\{[^}]+\}", value, path)
+
 
 class EndpointTester:
     """Automatically discovers and tests FastAPI endpoints."""
 
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", connections: int = 10):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=10.0)
-
-    async def discover_endpoints(self) -> List[Dict[str, Any]]:
-        """Discover all endpoints from the FastAPI app."""
-        endpoints = []
-
-        for route in app.routes:
-            if hasattr(route, "methods") and hasattr(route, "path"):
-                # Skip HEAD and OPTIONS methods for cleaner output
-                methods = [m for m in route.methods if m not in ["HEAD", "OPTIONS"]]
-                if methods:
-                    endpoints.append(
-                        {
-                            "path": route.path,
-                            "methods": methods,
-                            "name": getattr(route, "name", "unknown"),
-                            "tags": getattr(route, "tags", []),
-                        }
-                    )
+        # One pooled client shared by every request and virtual user
+        self.client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=connections,
+                max_keepalive_connections=connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+
+    async def discover_endpoints(
+        self, use_manifest: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Discover all endpoints, from route_manifest.json when it exists.
 
-        return sorted(endpoints, key=lambda x: x["path"])
+        Falls back to importing the FastAPI app and introspecting its routes.
+        """
+        if use_manifest:
+            manifest = load_manifest()
+            if manifest is not None:
+                return manifest
+
+        try:
+            from app.main import app
+        except ImportError:
+            print(
+                "❌ Error: Could not import FastAPI app. Make sure you're in the api directory."
+            )
+            sys.exit(1)
+        return build_manifest(app.routes)
 
     async def test_endpoint(
         self, endpoint: Dict[str, Any], method: str
     ) -> Dict[str, Any]:
         """Test a specific endpoint with a given method."""
         url = f"{self.base_url}{endpoint['path']}"
-        start_time = datetime.now()
+        start_time = time.perf_counter_ns()
 
         try:
             if method == "GET":
@@ -82,7 +106,7 @@ class EndpointTester:
                     "response_time": 0,
                 }
 
-            response_time = (datetime.now() - start_time).total_seconds() * 1000
+            response_time = (time.perf_counter_ns() - start_time) / 1e6
 
             # Try to parse JSON response
             try:
@@ -103,7 +127,7 @@ class EndpointTester:
             }
 
         except Exception as e:
-            response_time = (datetime.now() - start_time).total_seconds() * 1000
+            response_time = (time.perf_counter_ns() - start_time) / 1e6
             return {
                 "status": "FAILED",
                 "error": str(e),
@@ -167,6 +191,195 @@ class EndpointTester:
         await self.client.aclose()
         return {"endpoints": results, "summary": summary}
 
+    async def _timed_request(
+        self,
+        target: Dict[str, Any],
+        stats: Dict[str, Dict[str, Any]],
+        started_ns: Optional[int] = None,
+    ) -> None:
+        """Send one load request and record its latency.
+
+        In open-loop mode ``started_ns`` is the scheduled send time, so time
+        spent queued behind slow requests counts towards latency instead of
+        being hidden (coordinated omission).
+        """
+        start = started_ns if started_ns is not None else time.perf_counter_ns()
+        route = stats[target["key"]]
+        try:
+            response = await self.client.request(target["method"], target["url"])
+            route["status_codes"][response.status_code] += 1
+            if response.status_code >= 400:
+                route["errors"] += 1
+        except Exception as e:
+            route["status_codes"][type(e).__name__] += 1
+            route["errors"] += 1
+        route["latencies"].append(time.perf_counter_ns() - start)
+
+    async def run_load(
+        self,
+        endpoints: List[Dict[str, Any]],
+        users: int = 10,
+        duration: Optional[float] = 10.0,
+        total_requests: Optional[int] = None,
+        rate: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Drive GET endpoints with concurrent virtual users.
+
+        Closed-loop (default): ``users`` workers each send their next request
+        as soon as the previous one completes. Open-loop (``rate`` set):
+        requests are launched at a fixed arrival rate regardless of how fast
+        responses come back. Stops after ``duration`` seconds or
+        ``total_requests`` requests, whichever comes first.
+        """
+        targets = [
+            {
+                "key": f"GET {endpoint['path']}",
+                "method": "GET",
+                "path": endpoint["path"],
+                "url": f"{self.base_url}{fill_path_params(endpoint['path'])}",
+            }
+            for endpoint in endpoints
+            if "GET" in endpoint["methods"]
+        ]
+        stats: Dict[str, Dict[str, Any]] = {
+            target["key"]: {"latencies": [], "errors": 0, "status_codes": Counter()}
+            for target in targets
+        }
+
+        mode = "open" if rate else "closed"
+        console.print(
+            f"🔥 Load: {mode}-loop, {users} users, "
+            + (f"{rate:g} req/s, " if rate else "")
+            + (f"{duration:g}s" if duration else f"{total_requests} requests"),
+            style="blue",
+        )
+
+        deadline = time.perf_counter_ns() + int(duration * 1e9) if duration else None
+        sent = itertools.count()
+        next_target = itertools.cycle(targets)
+
+        def keep_going() -> bool:
+            if deadline is not None and time.perf_counter_ns() >= deadline:
+                return False
+            return total_requests is None or next(sent) < total_requests
+
+        start = time.perf_counter_ns()
+
+        if rate:
+            interval_ns = int(1e9 / rate)
+            in_flight = set()
+            for i in itertools.count():
+                if not keep_going():
+                    break
+                scheduled = start + i * interval_ns
+                delay = (scheduled - time.perf_counter_ns()) / 1e9
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(
+                    self._timed_request(next(next_target), stats, scheduled)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            await asyncio.gather(*in_flight)
+        else:
+
+            async def virtual_user() -> None:
+                while keep_going():
+                    await self._timed_request(next(next_target), stats)
+
+            await asyncio.gather(*(virtual_user() for _ in range(users)))
+
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        await self.client.aclose()
+
+        routes = []
+        all_latencies: List[int] = []
+        for target in targets:
+            route = stats[target["key"]]
+            latencies = sorted(route["latencies"])
+            all_latencies.extend(latencies)
+            routes.append(self._summarize(target["path"], latencies, route, elapsed))
+
+        all_latencies.sort()
+        total = self._summarize(
+            "TOTAL",
+            all_latencies,
+            {
+                "errors": sum(r["errors"] for r in stats.values()),
+                "status_codes": sum(
+                    (r["status_codes"] for r in stats.values()), Counter()
+                ),
+            },
+            elapsed,
+        )
+
+        return {
+            "config": {
+                "mode": mode,
+                "users": users,
+                "duration": duration,
+                "requests": total_requests,
+                "rate": rate,
+                "elapsed_s": round(elapsed, 3),
+            },
+            "routes": routes,
+            "total": total,
+        }
+
+    @staticmethod
+    def _summarize(
+        path: str, latencies: List[int], route: Dict[str, Any], elapsed: float
+    ) -> Dict[str, Any]:
+        """Summarize one route's latencies (ns) into throughput and percentiles."""
+        summary = {
+            "method": "GET",
+            "endpoint": path,
+            "requests": len(latencies),
+            "errors": route["errors"],
+            "status_codes": {str(k): v for k, v in route["status_codes"].items()},
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "mean_ms": (
+                round(sum(latencies) / len(latencies) / 1e6, 3) if latencies else 0
+            ),
+        }
+        for pct in PERCENTILES:
+            summary[f"p{pct:g}_ms"] = round(percentile(latencies, pct) / 1e6, 3)
+        return summary
+
+    def display_load_table(self, load: Dict[str, Any]):
+        """Display load test throughput and latency percentiles."""
+        console.print("\n" + "=" * 80)
+        console.print("🔥 LOAD TEST RESULTS", style="bold blue", justify="center")
+        console.print("=" * 80)
+
+        table = Table(box=box.ROUNDED)
+        table.add_column("Endpoint", style="yellow", no_wrap=True)
+        table.add_column("Reqs", justify="right")
+        table.add_column("Errors", justify="right")
+        table.add_column("Req/s", style="green", justify="right")
+        for pct in PERCENTILES:
+            table.add_column(f"p{pct:g} (ms)", style="cyan", justify="right")
+
+        for route in load["routes"] + [load["total"]]:
+            table.add_row(
+                route["endpoint"],
+                str(route["requests"]),
+                str(route["errors"]),
+                f"{route['throughput_rps']:.1f}",
+                *(f"{route[f'p{pct:g}_ms']:.2f}" for pct in PERCENTILES),
+                style="bold" if route["endpoint"] == "TOTAL" else None,
+            )
+
+        console.print(table)
+
+        codes = load["total"]["status_codes"]
+        if "429" in codes:
+            console.print(
+                f"⚠️  {codes['429']} requests were rate limited; run the server with "
+                "RATE_LIMIT_ENABLED=false to measure raw throughput",
+                style="yellow",
+            )
+
     def display_results_table(self, results: Dict[str, Any]):
         """Display results in a formatted table."""
         console.print("\n" + "=" * 80)
@@ -263,8 +476,41 @@ class EndpointTester:
         console.print(tree)
 
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Oshima API endpoint tester")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--load", action="store_true", help="Run a load test against GET routes"
+    )
+    parser.add_argument("--users", type=int, default=10, help="Virtual users")
+    parser.add_argument(
+        "--duration", type=float, default=None, help="Load duration in seconds"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=None, help="Total load requests"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Open-loop arrival rate in req/s (default: closed loop)",
+    )
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="Import the app to find routes instead of reading route_manifest.json",
+    )
+    args = parser.parse_args()
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+    return args
+
+
 async def main():
     """Main function to run the endpoint tests."""
+    args = parse_args()
+
     console.print(
         Panel.fit(
             "🚀 Oshima API Endpoint Tester\n"
@@ -277,7 +523,7 @@ async def main():
     # Check if API is running
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get("http://localhost:8000/health")
+            response = await client.get(f"{args.base_url}/health")
             if response.status_code == 200:
                 console.print("✅ API is running and healthy", style="green")
             else:
@@ -288,23 +534,37 @@ async def main():
     except Exception as e:
         console.print(f"❌ Cannot connect to API: {e}", style="red")
         console.print(
-            "💡 Make sure the API is running on http://localhost:8000", style="blue"
+            f"💡 Make sure the API is running on {args.base_url}", style="blue"
         )
         return
 
-    tester = EndpointTester()
+    tester = EndpointTester(args.base_url, connections=args.users)
 
     # Show route structure first
-    endpoints = await tester.discover_endpoints()
+    endpoints = await tester.discover_endpoints(use_manifest=not args.no_manifest)
     console.print()
     tester.display_route_tree(endpoints)
     console.print()
 
-    # Run tests
-    results = await tester.test_all_endpoints()
-
-    # Display results
-    tester.display_results_table(results)
+    if args.load:
+        # Per-request client logging would dominate the measurement
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        results = {
+            "load": await tester.run_load(
+                endpoints,
+                users=args.users,
+                duration=args.duration,
+                total_requests=args.requests,
+                rate=args.rate,
+            )
+        }
+        tester.display_load_table(results["load"])
+    else:
+        # Run tests
+        results = await tester.test_all_endpoints()
+
+        # Display results
+        tester.display_results_table(results)
 
     # Save results to file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Authentication overhead benchmark
+Times the same handler with and without the require_token dependency,
+with the verified-claims cache on and off, through an in-process ASGI
+transport, and the bare cost of TokenService.verify per call
+
+Run from the api directory:
+    python -m tests.bench.bench_auth
+"""
+
+import os
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import asyncio  # noqa: E402
+import time  # noqa: E402
+from typing import Any, Callable, Dict, List, Optional  # noqa: E402
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from rich import box  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from app.api.v1.auth import require_token  # noqa: E402
+from app.core.security import token_service  # noqa: E402
+
+console = Console()
+
+REQUESTS = 5_000
+VERIFY_CALLS = 20_000
+REPEATS = 3
+
+
+def build_app() -> FastAPI:
+    """Two routes that differ only in the auth dependency."""
+    bench = FastAPI()
+
+    @bench.get("/open")
+    async def open_route() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @bench.get("/private")
+    async def private_route(
+        claims: Dict[str, Any] = Depends(require_token),
+    ) -> Dict[str, str]:
+        return {"status": "ok"}
+
+    return bench
+
+
+async def per_request_us(
+    client: httpx.AsyncClient, path: str, headers: Optional[Dict[str, str]]
+) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+def verify_us(verify: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(VERIFY_CALLS):
+            verify()
+        best = min(best, time.perf_counter() - start)
+    return best / VERIFY_CALLS * 1e6
+
+
+async def run() -> List[List[Any]]:
+    token = token_service.issue("1")
+    auth = {"Authorization": f"Bearer {token}"}
+    cache_size = token_service.cache_size
+    scenarios = [
+        ("GET /open (no auth)", "/open", None, cache_size),
+        ("GET /private, verify every request", "/private", auth, 0),
+        ("GET /private, cached claims", "/private", auth, cache_size),
+    ]
+
+    best = [float("inf")] * len(scenarios)
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://localhost"
+    ) as client:
+        # Scenarios take turns, so drift in machine speed hits all of them
+        for _ in range(REPEATS):
+            for index, (_, path, headers, size) in enumerate(scenarios):
+                token_service.cache_size = size
+                token_service.clear()
+                best[index] = min(
+                    best[index], await per_request_us(client, path, headers)
+                )
+    token_service.cache_size = cache_size
+    return [[label, us] for (label, *_), us in zip(scenarios, best)]
+
+
+def main() -> None:
+    """Benchmark each path and print a table."""
+    console.print(f"🏁 {REQUESTS:,} requests per path...", style="blue")
+    rows = asyncio.run(run())
+
+    table = Table(title="📊 Authentication overhead", box=box.ROUNDED)
+    table.add_column("Path", style="yellow")
+    table.add_column("µs / call", style="green", justify="right")
+    table.add_column("overhead µs", style="cyan", justify="right")
+    baseline = rows[0][1]
+    for label, us in rows:
+        table.add_row(label, f"{us:.1f}", f"{us - baseline:+.1f}")
+    table.add_section()
+
+    token = token_service.issue("1")
+    token_service.cache_size = 0
+    uncached = verify_us(lambda: token_service.verify(token))
+    token_service.cache_size = 10_000
+    cached = verify_us(lambda: token_service.verify(token))
+    table.add_row("TokenService.verify, signature check", f"{uncached:.1f}", "")
+    table.add_row("TokenService.verify, cache hit", f"{cached:.1f}", "")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Bulk insert benchmark
+Loads users through POST /users:batch and compares the wall time with one
+POST /users/ per row, extrapolated from a sample, through an in-process
+ASGI transport. Passwords are hashed at bcrypt's lowest cost, which still
+accounts for most of the time per row
+
+Run from the api directory:
+    python -m tests.bench.bench_batch
+"""
+
+import os
+
+# Keep the per-client rate limit and per-request logging out of the numbers
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
+import asyncio  # noqa: E402
+import itertools  # noqa: E402
+import time  # noqa: E402
+from typing import Any, Dict, List  # noqa: E402
+
+import httpx  # noqa: E402
+from rich import box  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+console = Console()
+
+ROWS = 10_000
+BATCH_SIZES = [100, 1_000, 10_000]
+SINGLE_SAMPLE = 1_000
+
+_sequence = itertools.count(1)
+
+
+def users(count: int) -> List[Dict[str, Any]]:
+    rows = []
+    for _ in range(count):
+        n = next(_sequence)
+        rows.append(
+            {"email": f"bulk{n}@example.com", "name": f"Bulk {n}", "password": "x"}
+        )
+    return rows
+
+
+async def single_posts(client: httpx.AsyncClient) -> float:
+    """Seconds to insert ``ROWS`` users one request at a time (extrapolated)."""
+    rows = users(SINGLE_SAMPLE)
+    start = time.perf_counter()
+    for row in rows:
+        response = await client.post("/api/v1/users/", json=row)
+        response.raise_for_status()
+    return (time.perf_counter() - start) * ROWS / SINGLE_SAMPLE
+
+
+async def batched(client: httpx.AsyncClient, batch_size: int) -> float:
+    """Seconds to insert ``ROWS`` users in batches of ``batch_size``."""
+    batches = [users(batch_size) for _ in range(ROWS // batch_size)]
+    start = time.perf_counter()
+    for batch in batches:
+        response = await client.post("/api/v1/users:batch", json=batch)
+        response.raise_for_status()
+        assert response.json()["failed"] == 0
+    return time.perf_counter() - start
+
+
+async def run() -> List[List[Any]]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://localhost", timeout=None
+    ) as client:
+        rows = [["POST /users/ per row (extrapolated)", await single_posts(client)]]
+        for batch_size in BATCH_SIZES:
+            seconds = await batched(client, batch_size)
+            rows.append([f"POST /users:batch x {batch_size:,}", seconds])
+    return rows
+
+
+def main() -> None:
+    """Insert the users each way and print a table."""
+    console.print(f"🏁 Inserting {ROWS:,} users...", style="blue")
+    rows = asyncio.run(run())
+
+    table = Table(title=f"📊 {ROWS:,} user inserts", box=box.ROUNDED)
+    table.add_column("Path", style="yellow")
+    table.add_column("seconds", style="green", justify="right")
+    table.add_column("rows/s", justify="right")
+    table.add_column("speedup", style="cyan", justify="right")
+    baseline = rows[0][1]
+    for label, seconds in rows:
+        table.add_row(
+            label,
+            f"{seconds:.2f}",
+            f"{ROWS / seconds:,.0f}",
+            f"{baseline / seconds:.1f}x",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Request coalescing benchmark
+Fires bursts of identical concurrent GETs at an endpoint whose backend takes
+a few milliseconds per lookup, with and without the coalescing middleware,
+and counts backend calls and burst latency; also times the middleware's cost
+on uncontended requests
+
+Run from the api directory:
+    python -m tests.bench.bench_coalesce
+"""
+
+import asyncio
+import time
+from typing import Tuple
+
+import httpx
+from rich import box
+from rich.console import Console
+from rich.table import Table
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.types import ASGIApp
+
+from app.core.coalesce import CoalescingMiddleware, RequestCoalescer
+
+console = Console()
+
+BURSTS = [1, 10, 100, 1_000]
+BACKEND_MS = 5
+SEQUENTIAL = 2_000
+
+
+def make_app(coalesce: bool, backend_ms: float) -> Tuple[ASGIApp, list]:
+    calls: list = []
+
+    async def get_item(request: Request) -> Response:
+        calls.append(None)
+        if backend_ms:
+            await asyncio.sleep(backend_ms / 1000)
+        item_id = request.path_params["item_id"]
+        return JSONResponse({"id": item_id, "title": f"Item {item_id}"})
+
+    app: ASGIApp = Starlette(routes=[Route("/items/{item_id}", get_item)])
+    if coalesce:
+        coalescer = RequestCoalescer(
+            vary_headers=["accept", "authorization"], max_wait=5.0, max_body=1 << 20
+        )
+        app = CoalescingMiddleware(app, coalescer=coalescer)
+    return app, calls
+
+
+async def burst(coalesce: bool, size: int) -> Tuple[int, float]:
+    """Backend calls and wall time for ``size`` simultaneous identical GETs."""
+    app, calls = make_app(coalesce, BACKEND_MS)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client.get("/items/7") for _ in range(size)))
+        elapsed = time.perf_counter() - start
+    return len(calls), elapsed * 1000
+
+
+async def sequential_us(coalesce: bool) -> float:
+    """Per-request time for distinct, never-overlapping GETs."""
+    app, _ = make_app(coalesce, backend_ms=0)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+        start = time.perf_counter()
+        for i in range(SEQUENTIAL):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / SEQUENTIAL * 1e6
+
+
+async def run() -> None:
+    table = Table(
+        title=f"📊 Identical GET bursts ({BACKEND_MS} ms backend)", box=box.ROUNDED
+    )
+    table.add_column("Concurrent", style="cyan", justify="right")
+    table.add_column("Backend calls", style="red", justify="right")
+    table.add_column("Coalesced calls", style="green", justify="right")
+    table.add_column("Burst ms", style="red", justify="right")
+    table.add_column("Coalesced ms", style="green", justify="right")
+
+    for size in BURSTS:
+        plain_calls, plain_ms = await burst(False, size)
+        calls, ms = await burst(True, size)
+        table.add_row(
+            f"{size:,}",
+            f"{plain_calls:,}",
+            f"{calls:,}",
+            f"{plain_ms:,.1f}",
+            f"{ms:,.1f}",
+        )
+    console.print(table)
+
+    plain, coalesced = await sequential_us(False), await sequential_us(True)
+    console.print(
+        f"Uncontended GET: {plain:.1f} µs without, {coalesced:.1f} µs with "
+        f"coalescing ({coalesced - plain:+.1f} µs)"
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    console.print("🏁 Benchmarking request coalescing...", style="blue")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
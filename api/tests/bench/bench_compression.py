@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+Fetches representative response bodies from the app and, for each coding
+and level, reports the bytes saved against the CPU time spent compressing
+
+Run from the api directory:
+    python -m tests.bench.bench_compression
+"""
+
+import os
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("DEBUG", "true")
+
+import time  # noqa: E402
+from typing import Callable, Dict, List, Tuple  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+from rich import box  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from app.core.compression import available_encoders  # noqa: E402
+from app.main import app  # noqa: E402
+
+console = Console()
+
+REPEATS = 20
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 6, 11], "zstd": [1, 3, 9, 19]}
+
+
+def fetch_payloads(client: TestClient) -> Dict[str, bytes]:
+    """Seed data and fetch uncompressed bodies of typical responses."""
+    for kind, row in (
+        ("users", lambda i: {"email": f"c{i}@example.com", "name": f"User {i}"}),
+        ("items", lambda i: {"title": f"Item {i}", "description": "A short one"}),
+    ):
+        batch = [{**row(i), "password": "x"} for i in range(1000)]
+        client.post(f"/api/v1/{kind}:batch", json=batch).raise_for_status()
+
+    identity = {"Accept-Encoding": "identity"}
+    ndjson = {**identity, "Accept": "application/x-ndjson"}
+    return {
+        "items, 100 rows": client.get("/api/v1/items/", headers=identity),
+        "users, 1k rows": client.get("/api/v1/users/?limit=1000", headers=identity),
+        "items ndjson, 1k rows": client.get("/api/v1/items/", headers=ndjson),
+        "openapi.json": client.get("/api/v1/openapi.json", headers=identity),
+    }
+
+
+def measure(make: Callable[[], object], body: bytes) -> Tuple[int, float]:
+    """Compressed size and best-of-N microseconds to compress ``body``."""
+    best = float("inf")
+    size = 0
+    for _ in range(REPEATS):
+        encoder = make()
+        start = time.perf_counter_ns()
+        size = len(encoder.compress(body, final=True))  # type: ignore[attr-defined]
+        best = min(best, time.perf_counter_ns() - start)
+    return size, best / 1000
+
+
+def main() -> None:
+    """Compress each payload with every coding and level and print a table."""
+    encoders = available_encoders()
+    missing = sorted(set(LEVELS) - set(encoders))
+    if missing:
+        console.print(
+            f"⚠️  {', '.join(missing)} not installed (needs the [compression] extra)",
+            style="yellow",
+        )
+
+    with TestClient(app, base_url="http://localhost") as client:
+        responses = fetch_payloads(client)
+    payloads = {name: r.content for name, r in responses.items()}
+
+    table = Table(title="📊 Bytes saved vs CPU spent", box=box.ROUNDED)
+    table.add_column("Payload", style="yellow")
+    table.add_column("Coding")
+    table.add_column("Size", justify="right")
+    table.add_column("Ratio", style="green", justify="right")
+    table.add_column("µs / response", style="cyan", justify="right")
+    table.add_column("MB/s", justify="right")
+    table.add_column("µs per KiB saved", justify="right")
+
+    for name, body in payloads.items():
+        table.add_row(name, "identity", f"{len(body):,}", "1.0x", "-", "-", "-")
+        rows: List[Tuple[str, int, float]] = []
+        for coding, levels in LEVELS.items():
+            if coding not in encoders:
+                continue
+            for level in levels:
+                size, us = measure(lambda: encoders[coding](level), body)
+                rows.append((f"{coding} {level}", size, us))
+        for label, size, us in rows:
+            saved_kib = (len(body) - size) / 1024
+            table.add_row(
+                "",
+                label,
+                f"{size:,}",
+                f"{len(body) / size:.1f}x",
+                f"{us:,.0f}",
+                f"{len(body) / us:,.0f}",
+                f"{us / saved_kib:.2f}" if saved_kib > 0 else "-",
+            )
+        table.add_section()
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Sparse fieldset benchmark
+Bytes and serialization time for list_items and list_users at 10k rows with
+the full representation and with ?fields= subsets, raw and gzipped, plus the
+one-off cost of building a subset's serializer
+
+Run from the api directory:
+    python -m tests.bench.bench_fields
+"""
+
+import gzip
+import time
+from typing import Any, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.api.v1.fields import parse_fields
+from app.core.serialization import Fields, dump_rows, rows_adapter
+from app.schemas.item import Item
+from app.schemas.user import User
+from tests.bench.bench_serialization import make_rows
+
+console = Console()
+
+ROWS = 10_000
+REPEATS = 5
+
+SUBSETS: Dict[str, List[str]] = {
+    "items": ["", "id,title", "id", "id,title,is_active,owner_id"],
+    "users": ["", "id,email", "id", "id,name,is_active"],
+}
+
+
+def best_ms(
+    model: Type[BaseModel], rows: List[Dict[str, Any]], fields: Fields
+) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter_ns()
+        dump_rows(model, rows, fields)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / 1e6
+
+
+def build_us(model: Type[BaseModel], fields: Fields) -> float:
+    """Cold cost of the first request for a subset (then cached)."""
+    rows_adapter.cache_clear()
+    start = time.perf_counter_ns()
+    rows_adapter(model, fields)
+    return (time.perf_counter_ns() - start) / 1e3
+
+
+def measure(
+    model: Type[BaseModel], rows: List[Dict[str, Any]], spec: str
+) -> Tuple[int, int, float, float]:
+    fields = parse_fields(model, spec) if spec else None
+    body = dump_rows(model, rows, fields)
+    return (
+        len(body),
+        len(gzip.compress(body, compresslevel=1)),
+        best_ms(model, rows, fields),
+        build_us(model, fields),
+    )
+
+
+def main() -> None:
+    """Benchmark each subset for both list endpoints and print a table."""
+    console.print(f"🏁 Serializing {ROWS:,} rows per list...", style="blue")
+
+    table = Table(title="📊 Sparse fieldsets", box=box.ROUNDED)
+    table.add_column("Endpoint", style="yellow")
+    table.add_column("fields", overflow="fold")
+    table.add_column("KiB", style="cyan", justify="right")
+    table.add_column("gzip KiB", style="cyan", justify="right")
+    table.add_column("ms / response", style="green", justify="right")
+    table.add_column("vs full", style="green", justify="right")
+    table.add_column("first-use build µs", style="magenta", justify="right")
+
+    for kind, model in (("items", Item), ("users", User)):
+        rows = make_rows(kind, ROWS)
+        full_ms = None
+        for spec in SUBSETS[kind]:
+            size, zipped, ms, build = measure(model, rows, spec)
+            full_ms = full_ms or ms
+            table.add_row(
+                f"list_{kind}",
+                spec or "(all)",
+                f"{size / 1024:,.0f}",
+                f"{zipped / 1024:,.0f}",
+                f"{ms:.1f}",
+                f"{full_ms / ms:.1f}x",
+                f"{build:,.0f}",
+            )
+        table.add_section()
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
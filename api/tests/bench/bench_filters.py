@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Filtered list benchmark
+Times one page of items filtered by owner_id and/or is_active through the
+secondary indexes, against filtering a linear scan, as the collection grows
+
+Run from the api directory:
+    python -m tests.bench.bench_filters
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.services.repository import InMemoryRepository
+
+console = Console()
+
+SIZES = [10_000, 100_000, 1_000_000]
+OWNERS = 1_000
+PAGE = 50
+QUERIES = 200
+# Linear scans get slow quickly; only run the baseline up to this size
+LINEAR_MAX_SIZE = 100_000
+LINEAR_QUERIES = 5
+
+FILTERS: Dict[str, Dict[str, Any]] = {
+    "owner_id": {"owner_id": 7},
+    "is_active": {"is_active": False},
+    "owner_id + is_active": {"owner_id": 7, "is_active": False},
+}
+
+
+def make_records(count: int) -> List[Dict[str, Any]]:
+    """Build ``count`` item-shaped records; one in ten is inactive."""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": i,
+            "title": f"Item {i}",
+            "description": None,
+            "is_active": i % 10 != 0,
+            "owner_id": i % OWNERS,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def us_per_query(repository: InMemoryRepository, filters: Dict[str, Any]) -> float:
+    async def run() -> None:
+        for _ in range(QUERIES):
+            await repository.list(limit=PAGE, filters=filters)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return (time.perf_counter() - start) / QUERIES * 1e6
+
+
+def linear_us(records: List[Dict[str, Any]], filters: Dict[str, Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(LINEAR_QUERIES):
+        page = []
+        for record in records:
+            if all(record[field] == value for field, value in filters.items()):
+                page.append(record)
+        page[:PAGE]
+    return (time.perf_counter() - start) / LINEAR_QUERIES * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    console.print(f"🏁 Benchmarking {PAGE}-row filtered pages...", style="blue")
+
+    table = Table(title="📊 Filtered page latency (µs/query)", box=box.ROUNDED)
+    table.add_column("Rows", style="cyan", justify="right")
+    table.add_column("Filter", style="yellow")
+    table.add_column("Indexed", style="green", justify="right")
+    table.add_column("Linear scan", style="red", justify="right")
+
+    for size in SIZES:
+        records = make_records(size)
+        repository = InMemoryRepository(records, index_fields=("owner_id", "is_active"))
+        for label, filters in FILTERS.items():
+            linear = linear_us(records, filters) if size <= LINEAR_MAX_SIZE else None
+            table.add_row(
+                f"{size:,}",
+                label,
+                f"{us_per_query(repository, filters):,.1f}",
+                f"{linear:,.0f}" if linear is not None else "-",
+            )
+        table.add_section()
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
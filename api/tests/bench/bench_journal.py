@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Durable store benchmark
+Write throughput through the journal's group commit at increasing
+concurrency, snapshot time and size, and recovery time (memory-mapped
+snapshot plus journal tail, then index rebuild) for a 1M-record store
+
+Run from the api directory:
+    python -m tests.bench.bench_journal --records 1000000 --dir /var/tmp
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.services.journal import Journal
+from app.services.repository import InMemoryRepository
+from tests.bench.bench_filters import make_records
+
+console = Console()
+
+INDEX_FIELDS = ("owner_id", "is_active")
+CONCURRENCY = [1, 16, 256]
+
+
+def make_repository() -> InMemoryRepository:
+    return InMemoryRepository(index_fields=INDEX_FIELDS)
+
+
+def directory_mib(path: Path, pattern: str) -> float:
+    return sum(file.stat().st_size for file in path.glob(pattern)) / (1 << 20)
+
+
+async def write_throughput(
+    repository: InMemoryRepository, journal: Journal, writers: int, writes: int
+) -> tuple:
+    """Updates per second and frames per fsync with ``writers`` clients."""
+    count = len(repository)
+    flushes = journal.flushes
+
+    async def writer(offset: int) -> None:
+        for i in range(offset, writes, writers):
+            await repository.update(i * 7919 % count + 1, {"title": f"Updated {i}"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(offset) for offset in range(writers)))
+    elapsed = time.perf_counter() - start
+    return writes / elapsed, writes / max(1, journal.flushes - flushes)
+
+
+async def run(records: int, writes: int, root: Path) -> None:
+    console.print(f"🏁 Building {records:,} records in {root}...", style="blue")
+    repository = make_repository()
+    repository.restore(make_records(records), records)
+    journal = Journal(root)
+    journal.recover()
+
+    start = time.perf_counter()
+    await journal.snapshot(repository)
+    snapshot_s = time.perf_counter() - start
+    repository.attach(journal)
+
+    writes_table = Table(title="📊 Journaled updates (fsync on)", box=box.ROUNDED)
+    writes_table.add_column("Writers", style="cyan", justify="right")
+    writes_table.add_column("Writes/s", style="green", justify="right")
+    writes_table.add_column("Writes per fsync", style="magenta", justify="right")
+    for writers in CONCURRENCY:
+        # A lone writer waits out every fsync; keep its run short
+        total = writes if writers > 1 else max(1, writes // 10)
+        rate, batch = await write_throughput(repository, journal, writers, total)
+        writes_table.add_row(f"{writers:,}", f"{rate:,.0f}", f"{batch:,.1f}")
+    await journal.close()
+    repository.attach(None)
+    console.print(writes_table)
+
+    tail = journal.entries
+    del repository
+
+    start = time.perf_counter()
+    recovered = Journal(root).recover()
+    load_s = time.perf_counter() - start
+    assert recovered is not None
+    start = time.perf_counter()
+    restored = make_repository()
+    restored.restore(*recovered)
+    rebuild_s = time.perf_counter() - start
+
+    table = Table(title=f"📊 {records:,}-record store", box=box.ROUNDED)
+    table.add_column("Step", style="yellow")
+    table.add_column("Seconds", style="green", justify="right")
+    table.add_column("Detail", style="cyan")
+    table.add_row(
+        "Write snapshot",
+        f"{snapshot_s:.2f}",
+        f"{directory_mib(root, 'snapshot-*'):,.0f} MiB",
+    )
+    table.add_row(
+        "Load snapshot + replay tail",
+        f"{load_s:.2f}",
+        f"{tail:,} journaled writes, {directory_mib(root, 'journal-*'):,.1f} MiB",
+    )
+    table.add_row("Rebuild indexes", f"{rebuild_s:.2f}", f"{len(restored):,} records")
+    table.add_row("Recovery total", f"{load_s + rebuild_s:.2f}", "")
+    console.print(table)
+
+
+def main() -> None:
+    """Run the benchmark in a scratch directory and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--writes", type=int, default=20_000)
+    # fsync cost depends on the disk; point this at the one you deploy on
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as scratch:
+        asyncio.run(run(args.records, args.writes, Path(scratch)))
+
+
+if __name__ == "__main__":
+    main()
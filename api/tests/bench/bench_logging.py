@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Logging hot-path benchmark
+Measures what one logger.info call costs the calling thread (i.e. the event
+loop) for each logging mode, against a fast sink and a slow, blocking one
+
+Run from the api directory:
+    python -m tests.bench.bench_logging
+"""
+
+import os
+
+# The benchmark needs INFO events to reach the handlers
+os.environ["LOG_LEVEL"] = "INFO"
+
+import time  # noqa: E402
+from contextlib import contextmanager  # noqa: E402
+from typing import Any, Dict, Iterator, List, Optional, TextIO  # noqa: E402
+
+from rich import box  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from app.core import logging as app_logging  # noqa: E402
+
+console = Console()
+
+CALLS = 20_000
+SLOW_CALLS = 2_000
+# Rich renders in milliseconds, so it gets far fewer calls
+RICH_CALLS = 200
+REPEATS = 3
+# A blocking write of this long stands in for a busy terminal or log pipe
+SLOW_WRITE_SECONDS = 50e-6
+
+
+class SlowStream:
+    """Discards writes after blocking for ``delay`` seconds each."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+@contextmanager
+def serializer(name: str) -> Iterator[None]:
+    """Temporarily force the stdlib json serializer."""
+    saved = app_logging.orjson
+    if name == "json":
+        app_logging.orjson = None
+    try:
+        yield
+    finally:
+        app_logging.orjson = saved
+
+
+MODES: List[Dict[str, Any]] = [
+    {"name": "Rich console", "format": "console", "queue": False, "json": "-"},
+    {"name": "JSON, sync", "format": "json", "queue": False, "json": "json"},
+    {"name": "JSON, sync", "format": "json", "queue": False, "json": "orjson"},
+    {"name": "JSON, queued", "format": "json", "queue": True, "json": "orjson"},
+]
+
+
+def us_per_call(mode: Dict[str, Any], stream: TextIO, calls: int) -> float:
+    """Best-of-N microseconds per ``logger.info`` call in ``mode``."""
+    if mode["format"] != "json":
+        calls = min(calls, RICH_CALLS)
+    with serializer(mode["json"]):
+        app_logging.setup_logging(mode["format"], mode["queue"], stream)
+        logger = app_logging.get_logger("bench")
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter_ns()
+            for i in range(calls):
+                logger.info("Fetching item", item_id=i, path="/api/v1/items/1")
+            best = min(best, time.perf_counter_ns() - start)
+        # Drain the queue outside the timed section
+        app_logging.stop_logging()
+    return best / calls / 1000
+
+
+def filtered_us_per_call() -> float:
+    """Cost of a call below the configured level, for reference."""
+    app_logging.setup_logging("json", False, open(os.devnull, "w"))
+    logger = app_logging.get_logger("bench")
+    start = time.perf_counter_ns()
+    for i in range(CALLS):
+        logger.debug("Fetching item", item_id=i)
+    return (time.perf_counter_ns() - start) / CALLS / 1000
+
+
+def main() -> None:
+    """Run every mode against both sinks and print a table."""
+    if app_logging.orjson is None:
+        console.print(
+            "⚠️  orjson is not installed; orjson rows use json", style="yellow"
+        )
+
+    console.print("🏁 Benchmarking logger.info...", style="blue")
+    devnull = open(os.devnull, "w")
+    rows: List[List[Optional[float]]] = []
+    for mode in MODES:
+        rows.append(
+            [
+                us_per_call(mode, devnull, CALLS),
+                us_per_call(mode, SlowStream(SLOW_WRITE_SECONDS), SLOW_CALLS),
+            ]
+        )
+    filtered = filtered_us_per_call()
+    app_logging.setup_logging()
+
+    table = Table(title="📊 Per-call cost on the calling thread", box=box.ROUNDED)
+    table.add_column("Mode", style="yellow")
+    table.add_column("Serializer")
+    table.add_column("/dev/null (µs)", style="green", justify="right")
+    table.add_column(
+        f"{SLOW_WRITE_SECONDS * 1e6:.0f} µs writes (µs)", style="cyan", justify="right"
+    )
+    for mode, (fast, slow) in zip(MODES, rows):
+        table.add_row(mode["name"], mode["json"], f"{fast:.1f}", f"{slow:.1f}")
+    table.add_row("Below level", "-", f"{filtered:.2f}", "-")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Repository lookup benchmark
+Shows that indexed lookups stay flat as the collection grows
+
+Run from the api directory:
+    python -m tests.bench.bench_repository
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.services.repository import InMemoryRepository
+
+console = Console()
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+# Linear scans get slow quickly; only run the baseline up to this size
+LINEAR_MAX_SIZE = 100_000
+LINEAR_LOOKUPS = 200
+
+
+def make_records(count: int) -> List[Dict[str, Any]]:
+    """Build ``count`` user-shaped records."""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": i,
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def ns_per_op(func: Callable[[], Any], ops: int) -> float:
+    """Run ``func`` and return the mean nanoseconds per operation."""
+    start = time.perf_counter_ns()
+    func()
+    return (time.perf_counter_ns() - start) / ops
+
+
+def bench_size(size: int) -> Dict[str, Any]:
+    """Benchmark one collection size."""
+    records = make_records(size)
+    repository = InMemoryRepository(records, unique_fields=("email",))
+    ids = [random.randint(1, size) for _ in range(LOOKUPS)]
+    emails = [f"user{i}@example.com" for i in ids]
+
+    async def get_all() -> None:
+        for record_id in ids:
+            await repository.get(record_id)
+
+    async def get_by_all() -> None:
+        for email in emails:
+            await repository.get_by("email", email)
+
+    result = {
+        "size": size,
+        "get_ns": ns_per_op(lambda: asyncio.run(get_all()), LOOKUPS),
+        "get_by_email_ns": ns_per_op(lambda: asyncio.run(get_by_all()), LOOKUPS),
+        "linear_ns": None,
+    }
+
+    if size <= LINEAR_MAX_SIZE:
+        sample = ids[:LINEAR_LOOKUPS]
+
+        def scan() -> None:
+            for record_id in sample:
+                next((r for r in records if r["id"] == record_id), None)
+
+        result["linear_ns"] = ns_per_op(scan, LINEAR_LOOKUPS)
+
+    return result
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    console.print("🏁 Benchmarking repository lookups...", style="blue")
+
+    table = Table(title="📊 Lookup latency (ns/op)", box=box.ROUNDED)
+    table.add_column("Rows", style="cyan", justify="right")
+    table.add_column("get(id)", style="green", justify="right")
+    table.add_column("get_by(email)", style="green", justify="right")
+    table.add_column("Linear scan", style="red", justify="right")
+
+    for size in SIZES:
+        result = bench_size(size)
+        linear = result["linear_ns"]
+        table.add_row(
+            f"{size:,}",
+            f"{result['get_ns']:.0f}",
+            f"{result['get_by_email_ns']:.0f}",
+            f"{linear:,.0f}" if linear is not None else "-",
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+In-process route benchmark
+Drives every api_router route through an ASGI transport (no sockets) and
+compares ops/sec and allocations against tests/bench/baseline.json
+
+Run from the api directory:
+    python -m tests.bench.bench_routes                    # compare
+    python -m tests.bench.bench_routes --update-baseline  # re-record
+"""
+
+import os
+import tempfile
+
+# Benchmark the app without the per-client rate limit and terminal logging,
+# which would otherwise dominate (or reject) a tight request loop.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Same cheap bcrypt cost as the test suite, which replays this benchmark
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "1")
+# Uploaded benchmark files go to a scratch directory
+os.environ.setdefault("UPLOAD_PATH", tempfile.mkdtemp(prefix="oshima-bench-uploads-"))
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import gc  # noqa: E402
+import itertools  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple  # noqa: E402
+
+import httpx  # noqa: E402
+from rich import box  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from app.api.v1.api import api_router  # noqa: E402
+from app.main import app  # noqa: E402
+
+console = Console()
+
+API_PREFIX = "/api/v1"
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.3"))
+
+ITERATIONS = 300
+WARMUP = 30
+REPEATS = 3
+ALLOC_ITERATIONS = 50
+# Routes that look regressed are re-measured this many times before failing,
+# so one noisy sample on a busy machine does not fail the gate
+CONFIRM_ATTEMPTS = 2
+# Peak allocation differences below this are noise, not regressions
+ALLOC_SLACK_KIB = 16.0
+# Rows per request for the bulk routes
+BATCH_ROWS = 10
+
+# (url, JSON body or raw bytes, headers)
+RequestSpec = Tuple[str, Any, Optional[Dict[str, str]]]
+Scenario = Callable[[httpx.AsyncClient, int], Awaitable[List[RequestSpec]]]
+
+_sequence = itertools.count(1)
+
+
+def user_payload() -> Dict[str, Any]:
+    n = next(_sequence)
+    return {"email": f"bench{n}@example.com", "name": f"Bench {n}", "password": "x"}
+
+
+def item_payload() -> Dict[str, Any]:
+    return {"title": f"Bench item {next(_sequence)}", "description": "benchmark"}
+
+
+PAYLOADS = {"users": user_payload, "items": item_payload}
+
+
+async def create_records(client: httpx.AsyncClient, kind: str, count: int) -> List[int]:
+    """Create ``count`` records through the API and return their IDs."""
+    ids = []
+    for _ in range(count):
+        response = await client.post(f"{API_PREFIX}/{kind}/", json=PAYLOADS[kind]())
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+
+async def create_many_records(
+    client: httpx.AsyncClient, kind: str, count: int
+) -> List[int]:
+    """Create ``count`` records through the bulk endpoint and return their IDs."""
+    response = await client.post(
+        f"{API_PREFIX}/{kind}:batch", json=[PAYLOADS[kind]() for _ in range(count)]
+    )
+    response.raise_for_status()
+    return [row["id"] for row in response.json()["results"]]
+
+
+def static(path: str) -> Scenario:
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        return [(path, None, None)] * count
+
+    return build
+
+
+def create(kind: str) -> Scenario:
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        return [(f"/{kind}/", PAYLOADS[kind](), None) for _ in range(count)]
+
+    return build
+
+
+def existing(kind: str, body: Optional[Callable[[int], Dict[str, Any]]]) -> Scenario:
+    """Target one freshly created record, optionally with a request body."""
+
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        (record_id,) = await create_records(client, kind, 1)
+        return [
+            (f"/{kind}/{record_id}", body(i) if body else None, None)
+            for i in range(count)
+        ]
+
+    return build
+
+
+def consumed(kind: str) -> Scenario:
+    """Target a distinct record per request, for routes that remove it."""
+
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        ids = await create_records(client, kind, count)
+        return [(f"/{kind}/{record_id}", None, None) for record_id in ids]
+
+    return build
+
+
+def owned_items() -> Scenario:
+    """List the items of one user who owns a page's worth of them."""
+
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        (user_id,) = await create_records(client, "users", 1)
+        response = await client.post(
+            f"{API_PREFIX}/items:batch",
+            json=[{**item_payload(), "owner_id": user_id} for _ in range(BATCH_ROWS)],
+        )
+        response.raise_for_status()
+        return [(f"/users/{user_id}/items", None, None)] * count
+
+    return build
+
+
+def batch_create(kind: str) -> Scenario:
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        return [
+            (f"/{kind}:batch", [PAYLOADS[kind]() for _ in range(BATCH_ROWS)], None)
+            for _ in range(count)
+        ]
+
+    return build
+
+
+def batch_update(kind: str, body: Callable[[int], Dict[str, Any]]) -> Scenario:
+    """Update the same freshly created records with every request."""
+
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        ids = await create_many_records(client, kind, BATCH_ROWS)
+        return [
+            (
+                f"/{kind}:batch",
+                [{"id": record_id, **body(i)} for record_id in ids],
+                None,
+            )
+            for i in range(count)
+        ]
+
+    return build
+
+
+def batch_consumed(kind: str) -> Scenario:
+    """Delete a distinct set of records with every request."""
+
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        ids = await create_many_records(client, kind, count * BATCH_ROWS)
+        return [
+            (f"/{kind}:batch", ids[start : start + BATCH_ROWS], None)
+            for start in range(0, len(ids), BATCH_ROWS)
+        ]
+
+    return build
+
+
+async def sign_in(client: httpx.AsyncClient) -> Dict[str, str]:
+    """Create a user and return its email and password."""
+    credentials = {"email": user_payload()["email"], "password": "x"}
+    response = await client.post(
+        f"{API_PREFIX}/users/", json={**credentials, "name": "Bench"}
+    )
+    response.raise_for_status()
+    return credentials
+
+
+def issue_token() -> Scenario:
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        credentials = await sign_in(client)
+        return [("/auth/token", credentials, None)] * count
+
+    return build
+
+
+def authenticated(path: str) -> Scenario:
+    """Send the same bearer token with every request."""
+
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        response = await client.post(
+            f"{API_PREFIX}/auth/token", json=await sign_in(client)
+        )
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return [(path, None, auth)] * count
+
+    return build
+
+
+def file_content() -> bytes:
+    """16 KiB that no earlier upload has sent, so nothing is deduplicated."""
+    return f"{next(_sequence):016d}".encode() * 1024
+
+
+async def upload_file(client: httpx.AsyncClient) -> int:
+    response = await client.post(
+        f"{API_PREFIX}/files/?filename=bench.bin", content=file_content()
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def upload() -> Scenario:
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        return [
+            ("/files/?filename=bench.bin", file_content(), None) for _ in range(count)
+        ]
+
+    return build
+
+
+def download() -> Scenario:
+    async def build(client: httpx.AsyncClient, count: int) -> List[RequestSpec]:
+        file_id = await upload_file(client)
+        return [(f"/files/{file_id}", None, None)] * count
+
+    return build
+
+
+# One scenario per (method, route template) in api_router
+SCENARIOS: Dict[Tuple[str, str], Scenario] = {
+    ("GET", "/health/"): static("/health/"),
+    ("GET", "/health/live"): static("/health/live"),
+    ("GET", "/health/ready"): static("/health/ready"),
+    ("GET", "/health/detailed"): static("/health/detailed"),
+    ("POST", "/auth/token"): issue_token(),
+    ("GET", "/auth/me"): authenticated("/auth/me"),
+    ("GET", "/users/"): static("/users/"),
+    ("GET", "/users/{user_id}"): existing("users", None),
+    ("GET", "/users/{user_id}/items"): owned_items(),
+    ("POST", "/users/"): create("users"),
+    ("PUT", "/users/{user_id}"): existing("users", lambda i: {"name": f"U{i}"}),
+    ("DELETE", "/users/{user_id}"): consumed("users"),
+    ("GET", "/items/"): static("/items/"),
+    ("GET", "/items/{item_id}"): existing("items", None),
+    ("POST", "/items/"): create("items"),
+    ("PUT", "/items/{item_id}"): existing("items", lambda i: {"title": f"I{i}"}),
+    ("DELETE", "/items/{item_id}"): consumed("items"),
+    ("POST", "/users:batch"): batch_create("users"),
+    ("PATCH", "/users:batch"): batch_update("users", lambda i: {"name": f"U{i}"}),
+    ("DELETE", "/users:batch"): batch_consumed("users"),
+    ("POST", "/items:batch"): batch_create("items"),
+    ("PATCH", "/items:batch"): batch_update("items", lambda i: {"title": f"I{i}"}),
+    ("DELETE", "/items:batch"): batch_consumed("items"),
+    ("POST", "/files/"): upload(),
+    ("GET", "/files/{file_id}"): download(),
+}
+
+
+def discover_routes() -> List[Tuple[str, str]]:
+    """Return every (method, path) pair registered on ``api_router``."""
+    routes = []
+    for route in api_router.routes:
+        for method in sorted(getattr(route, "methods", None) or ()):
+            if method not in ("HEAD", "OPTIONS"):
+                routes.append((method, route.path))
+    return routes
+
+
+def calibrate(rounds: int = 5, loops: int = 2000) -> float:
+    """Score this machine with a fixed CPU workload (ops/sec, best of N).
+
+    Route throughput is scaled by the ratio of this score to the baseline's,
+    so a baseline recorded on one machine stays meaningful on another. Each
+    route carries its own score; the suite-level one is informational.
+    """
+    payload = {"id": 1, "title": "x" * 64, "tags": list(range(32)), "ok": True}
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            json.loads(json.dumps(payload))
+        best = min(best, time.perf_counter_ns() - start)
+    return loops / (best / 1e9)
+
+
+async def measure_route(
+    client: httpx.AsyncClient, method: str, path: str, scenario: Scenario
+) -> Dict[str, Any]:
+    """Benchmark one route: best-of-N ops/sec, then an allocation pass."""
+    total = WARMUP + ITERATIONS + ALLOC_ITERATIONS
+    specs = iter(await scenario(client, total))
+
+    async def send(spec: RequestSpec) -> None:
+        url, body, headers = spec
+        if isinstance(body, bytes):
+            response = await client.request(
+                method, API_PREFIX + url, content=body, headers=headers
+            )
+        else:
+            response = await client.request(
+                method, API_PREFIX + url, json=body, headers=headers
+            )
+        if response.status_code >= 400:
+            raise AssertionError(
+                f"{method} {url} returned {response.status_code}: {response.text}"
+            )
+
+    for spec in itertools.islice(specs, WARMUP):
+        await send(spec)
+
+    # Each repeat is paired with a calibration taken right before it, so a
+    # slow patch on a shared machine drags both numbers down together
+    per_repeat = ITERATIONS // REPEATS
+    best_ops, best_calibration = 0.0, 1.0
+    for _ in range(REPEATS):
+        batch = list(itertools.islice(specs, per_repeat))
+        calibration = calibrate(rounds=2, loops=500)
+        start = time.perf_counter_ns()
+        for spec in batch:
+            await send(spec)
+        ops = per_repeat / ((time.perf_counter_ns() - start) / 1e9)
+        if ops / calibration > best_ops / best_calibration:
+            best_ops, best_calibration = ops, calibration
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    baseline_bytes, _ = tracemalloc.get_traced_memory()
+    for spec in itertools.islice(specs, ALLOC_ITERATIONS):
+        await send(spec)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    blocks_after = sys.getallocatedblocks()
+
+    return {
+        "ops_per_sec": round(best_ops, 1),
+        "calibration": round(best_calibration, 1),
+        "peak_kib": round((peak_bytes - baseline_bytes) / 1024, 1),
+        "retained_blocks_per_op": round(
+            (blocks_after - blocks_before) / ALLOC_ITERATIONS, 1
+        ),
+    }
+
+
+async def run_suite(routes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Benchmark every api_router route in-process, or only ``routes``."""
+    missing = [r for r in discover_routes() if r not in SCENARIOS]
+    if missing:
+        raise LookupError(f"No benchmark scenario for routes: {missing}")
+
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Any] = {"calibration": round(calibrate(), 1), "routes": {}}
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://localhost"
+    ) as client:
+        for method, path in discover_routes():
+            route = f"{method} {path}"
+            if routes is None or route in routes:
+                results["routes"][route] = await measure_route(
+                    client, method, path, SCENARIOS[(method, path)]
+                )
+
+    return results
+
+
+def score(route: Dict[str, Any]) -> float:
+    """Throughput relative to the machine score measured alongside it."""
+    return route["ops_per_sec"] / route["calibration"]
+
+
+async def run_and_compare(
+    baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Run the suite and return its results and confirmed regressions.
+
+    Routes that regress are measured again up to ``CONFIRM_ATTEMPTS`` times,
+    keeping each route's best calibrated throughput and smallest peak
+    allocation.
+    """
+    results = await run_suite()
+    for _ in range(CONFIRM_ATTEMPTS):
+        regressions = compare(results, baseline, threshold)
+        suspects = [message.partition(": ")[0] for message in regressions]
+        if not suspects:
+            break
+
+        retry = await run_suite(suspects)
+        for route, current in retry["routes"].items():
+            best = results["routes"][route]
+            if score(current) > score(best):
+                best["ops_per_sec"] = current["ops_per_sec"]
+                best["calibration"] = current["calibration"]
+            best["peak_kib"] = min(best["peak_kib"], current["peak_kib"])
+
+    return results, compare(results, baseline, threshold)
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """Return a message for every route that regressed past ``threshold``."""
+    regressions = []
+
+    for route, current in results["routes"].items():
+        expected = baseline["routes"].get(route)
+        if expected is None:
+            regressions.append(f"{route}: no baseline (run with --update-baseline)")
+            continue
+
+        scale = current["calibration"] / expected["calibration"]
+        floor = expected["ops_per_sec"] * scale * (1 - threshold)
+        if current["ops_per_sec"] < floor:
+            regressions.append(
+                f"{route}: {current['ops_per_sec']:.0f} ops/s "
+                f"< {floor:.0f} (baseline {expected['ops_per_sec']:.0f} "
+                f"x machine factor {scale:.2f} - {threshold:.0%})"
+            )
+
+        ceiling = expected["peak_kib"] * (1 + threshold) + ALLOC_SLACK_KIB
+        if current["peak_kib"] > ceiling:
+            regressions.append(
+                f"{route}: peak {current['peak_kib']:.1f} KiB "
+                f"> {ceiling:.1f} KiB (baseline {expected['peak_kib']:.1f} KiB)"
+            )
+
+    return regressions
+
+
+def display(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    """Print results side by side with the baseline."""
+    table = Table(title="📊 In-process route benchmark", box=box.ROUNDED)
+    table.add_column("Route", style="yellow", no_wrap=True)
+    table.add_column("ops/s", style="green", justify="right")
+    table.add_column("baseline", justify="right")
+    table.add_column("peak KiB", style="cyan", justify="right")
+    table.add_column("baseline", justify="right")
+    table.add_column("retained blocks/op", justify="right")
+
+    routes = baseline["routes"] if baseline else {}
+    for route, current in results["routes"].items():
+        expected = routes.get(route, {})
+        table.add_row(
+            route,
+            f"{current['ops_per_sec']:,.0f}",
+            f"{expected['ops_per_sec']:,.0f}" if expected else "-",
+            f"{current['peak_kib']:.1f}",
+            f"{expected['peak_kib']:.1f}" if expected else "-",
+            f"{current['retained_blocks_per_op']:.1f}",
+        )
+
+    console.print(table)
+
+
+def main() -> None:
+    """Run the suite, then compare against or update the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    console.print("🏁 Benchmarking routes in-process...", style="blue")
+
+    if args.update_baseline:
+        results = asyncio.run(run_suite())
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        display(results, None)
+        console.print(f"💾 Baseline written to {BASELINE_PATH}", style="green")
+        return
+
+    baseline = load_baseline()
+    results, regressions = asyncio.run(run_and_compare(baseline, args.threshold))
+    display(results, baseline)
+    for message in regressions:
+        console.print(f"❌ {message}", style="red")
+    if regressions:
+        sys.exit(1)
+    console.print("✅ No regressions", style="green")
+
+
+if __name__ == "__main__":
+    main()
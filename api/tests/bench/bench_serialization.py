@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+List serialization benchmark
+Compares the old list path (build a model per row, then let FastAPI validate
+and serialize it through response_model into a JSONResponse) with dumping
+repository rows straight to bytes, for list_items and list_users at 10k rows
+
+Run from the api directory:
+    python -m tests.bench.bench_serialization
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import BaseModel
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.api.v1.api import api_router
+from app.core.serialization import default_response_class, dump_rows, json_response
+from app.schemas.item import Item
+from app.schemas.user import User
+
+console = Console()
+
+ROWS = 10_000
+REPEATS = 5
+
+
+def make_rows(kind: str, count: int) -> List[Dict[str, Any]]:
+    """Build ``count`` repository-shaped rows."""
+    now = datetime.utcnow()
+    if kind == "users":
+        return [
+            {
+                "id": i,
+                "email": f"user{i}@example.com",
+                "name": f"User {i}",
+                "hashed_password": "$2b$12$" + "x" * 53,
+                "is_active": True,
+                "version": 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, count + 1)
+        ]
+    return [
+        {
+            "id": i,
+            "title": f"Item {i}",
+            "description": "A benchmark item with a short description",
+            "is_active": True,
+            "owner_id": 1,
+            "version": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def response_field(path: str) -> Any:
+    """Return the response_model field FastAPI uses for ``GET path``."""
+    for route in api_router.routes:
+        if (
+            isinstance(route, APIRoute)
+            and route.path == path
+            and "GET" in route.methods
+        ):
+            return route.response_field
+    raise LookupError(path)
+
+
+def via_response_model(
+    model: Type[BaseModel], path: str, response_class: Type[JSONResponse]
+) -> Callable[[List[Dict[str, Any]]], bytes]:
+    """The old handler body plus FastAPI's response_model handling."""
+    field = response_field(path)
+
+    def run(rows: List[Dict[str, Any]]) -> bytes:
+        content = asyncio.run(
+            serialize_response(field=field, response_content=[model(**r) for r in rows])
+        )
+        return bytes(response_class(content).body)
+
+    return run
+
+
+def via_dump_rows(model: Type[BaseModel]) -> Callable[[List[Dict[str, Any]]], bytes]:
+    """The new handler body: rows dumped straight to a response body."""
+
+    def run(rows: List[Dict[str, Any]]) -> bytes:
+        return bytes(json_response(dump_rows(model, rows), Response()).body)
+
+    return run
+
+
+def best_ms(func: Callable[[List[Dict[str, Any]]], bytes], rows: List[Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter_ns()
+        func(rows)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / 1e6
+
+
+def main() -> None:
+    """Benchmark each path for both list endpoints and print a table."""
+    console.print(f"🏁 Serializing {ROWS:,} rows per list...", style="blue")
+
+    table = Table(title="📊 List serialization, before vs after", box=box.ROUNDED)
+    table.add_column("Endpoint", style="yellow")
+    table.add_column("Path")
+    table.add_column("ms / response", style="green", justify="right")
+    table.add_column("speedup", style="cyan", justify="right")
+
+    fast_class = default_response_class()
+    for name, model, path in (
+        ("list_items", Item, "/items/"),
+        ("list_users", User, "/users/"),
+    ):
+        rows = make_rows(name.split("_")[1], ROWS)
+        paths = [
+            (
+                "before: model per row + JSONResponse",
+                via_response_model(model, path, JSONResponse),
+            ),
+            (
+                f"model per row + {fast_class.__name__}",
+                via_response_model(model, path, fast_class),
+            ),
+            ("after: dump_rows", via_dump_rows(model)),
+        ]
+
+        # Every path must produce the same documents
+        expected = json.loads(paths[0][1](rows[:3]))
+        for label, func in paths:
+            assert json.loads(func(rows[:3])) == expected, label
+
+        baseline = None
+        for label, func in paths:
+            ms = best_ms(func, rows)
+            baseline = baseline or ms
+            table.add_row(name, label, f"{ms:.1f}", f"{baseline / ms:.1f}x")
+        table.add_section()
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+SQL repository throughput benchmark
+Measures ops/sec of the SQLAlchemy repository against aiosqlite
+
+Run from the api directory (requires the db extra):
+    python -m tests.bench.bench_sql_repository
+"""
+
+import asyncio
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.db import session as db
+from app.db.base import Base
+from app.models import User
+from app.services.sql_repository import SQLRepository
+
+console = Console()
+
+ROWS = 10_000
+OPERATIONS = 2_000
+CONCURRENCY = [1, 8, 32]
+
+
+def user_data(i: int) -> Dict[str, Any]:
+    """Build one user row."""
+    now = datetime.utcnow()
+    return {
+        "email": f"user{i}@example.com",
+        "name": f"User {i}",
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def run_concurrently(
+    operation: Callable[[int], Awaitable[Any]], concurrency: int
+) -> float:
+    """Run ``OPERATIONS`` calls spread over ``concurrency`` tasks; return ops/sec."""
+    per_task = OPERATIONS // concurrency
+
+    async def worker(offset: int) -> None:
+        for i in range(per_task):
+            await operation(offset + i)
+
+    start = time.perf_counter_ns()
+    await asyncio.gather(*(worker(n * per_task) for n in range(concurrency)))
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    return per_task * concurrency / elapsed
+
+
+async def bench(database_path: Path) -> Table:
+    """Seed the database and benchmark each operation."""
+    await db.init_db(f"sqlite:///{database_path}")
+    async with db.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    repository = SQLRepository(User, unique_fields=("email",))
+    async with db.session_factory.begin() as session:
+        session.add_all(User(**user_data(i)) for i in range(ROWS))
+
+    created = iter(range(ROWS, ROWS * 100))
+    operations = {
+        "get(id)": lambda _: repository.get(random.randint(1, ROWS)),
+        "get_by(email)": lambda _: repository.get_by(
+            "email", f"user{random.randrange(ROWS)}@example.com"
+        ),
+        "list(after, 100)": lambda _: repository.list(
+            after=random.randrange(ROWS - 100), limit=100
+        ),
+        "create": lambda _: repository.create(user_data(next(created))),
+    }
+
+    table = Table(
+        title=f"📊 aiosqlite throughput (ops/sec, {ROWS:,} rows)", box=box.ROUNDED
+    )
+    table.add_column("Operation", style="cyan")
+    for concurrency in CONCURRENCY:
+        table.add_column(f"{concurrency} tasks", style="green", justify="right")
+
+    for name, operation in operations.items():
+        row = [name]
+        for concurrency in CONCURRENCY:
+            row.append(f"{await run_concurrently(operation, concurrency):,.0f}")
+        table.add_row(*row)
+
+    await db.close_db()
+    return table
+
+
+def main() -> None:
+    """Run the benchmark and print a results table."""
+    console.print("🏁 Benchmarking SQL repository on aiosqlite...", style="blue")
+    with tempfile.TemporaryDirectory() as directory:
+        table = asyncio.run(bench(Path(directory) / "bench.db"))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
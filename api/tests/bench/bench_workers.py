@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Worker scaling benchmark
+Starts the production server (``app.server.serve``) with 1, 2, 4... workers
+up to the CPU count, loads ``GET /health`` from several client processes for
+a fixed time, and reports throughput and latency per worker count. Several
+workers need shared state, so the server gets a fixed SECRET_KEY and an
+SQLite DATABASE_URL (the db extra), which GET /health never touches
+
+Run from the api directory:
+    python -m tests.bench.bench_workers [--max-workers N] [--duration S]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from app.server import worker_count
+
+console = Console()
+
+PATH = "/health"
+CONNECTIONS = 32  # per client process
+STARTUP_TIMEOUT = 60.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Run ``app.server.serve`` with ``workers`` workers on ``port``."""
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        "DATABASE_URL": f"sqlite:///{tempfile.gettempdir()}/bench_workers.db",
+        "DB_CREATE_ALL": "false",
+        "SECRET_KEY": "bench-workers",
+        "RATE_LIMIT_ENABLED": "false",
+        "METRICS_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "RELOAD": "false",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-c", "from app.server import serve; serve()"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_up(url: str) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"server at {url} did not come up")
+
+
+async def _load(url: str, duration: float) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=CONNECTIONS)
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+        deadline = time.perf_counter() + duration
+
+        async def connection() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(connection() for _ in range(CONNECTIONS)))
+    return latencies, errors
+
+
+def load(args: Tuple[str, float]) -> Tuple[List[float], int]:
+    """One client process: request ``url`` for ``duration`` seconds."""
+    return asyncio.run(_load(*args))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(workers: int, clients: int, duration: float) -> Dict[str, float]:
+    """Start a server with ``workers`` workers and load it from ``clients``."""
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        url = f"http://127.0.0.1:{port}{PATH}"
+        wait_until_up(url)
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.map(load, [(url, duration)] * clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(lat for lats, _ in results for lat in lats)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "rps": len(latencies) / duration,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main() -> None:
+    """Benchmark each worker count and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--max-workers", type=int, default=worker_count())
+    parser.add_argument("--clients", type=int, default=max(2, worker_count()))
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    counts = []
+    workers = 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    console.print(
+        f"🏁 Loading {PATH} from {args.clients} clients x {CONNECTIONS} "
+        f"connections for {args.duration:g}s per worker count...",
+        style="blue",
+    )
+
+    table = Table(title="📊 Throughput by worker count", box=box.ROUNDED)
+    table.add_column("Workers", style="yellow", justify="right")
+    table.add_column("req/s", style="green", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("errors", justify="right")
+    table.add_column("scaling", style="cyan", justify="right")
+
+    baseline = None
+    for workers in counts:
+        result = measure(workers, args.clients, args.duration)
+        baseline = baseline or result["rps"]
+        table.add_row(
+            str(workers),
+            f"{result['rps']:,.0f}",
+            f"{result['p50']:.1f}",
+            f"{result['p99']:.1f}",
+            str(result["errors"]),
+            f"{result['rps'] / baseline:.2f}x",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Fail when a route regresses past the committed benchmark baseline."""
+
+import pytest
+
+from tests.bench.bench_routes import (
+    DEFAULT_THRESHOLD,
+    SCENARIOS,
+    discover_routes,
+    load_baseline,
+    run_and_compare,
+)
+
+
+def test_every_route_has_a_scenario():
+    assert [route for route in discover_routes() if route not in SCENARIOS] == []
+
+
+@pytest.mark.bench
+async def test_routes_match_baseline():
+    _, regressions = await run_and_compare(load_baseline(), DEFAULT_THRESHOLD)
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,14 @@
+"""Shared test configuration."""
+
+import os
+import tempfile
+
+# Tests drive the app far faster than one real client would, and do so
+# before the app module is imported, so settings pick these up.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# The cheapest bcrypt cost, so creating users in tests stays fast
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "1")
+# Keep uploads out of the working tree
+os.environ.setdefault("UPLOAD_PATH", tempfile.mkdtemp(prefix="oshima-uploads-"))
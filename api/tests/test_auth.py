@@ -0,0 +1,121 @@
+"""Tests for access tokens and the verified-claims cache."""
+
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import InvalidToken, TokenService
+from app.main import app
+from app.services.passwords import password_hasher
+
+
+@pytest.fixture
+def service() -> TokenService:
+    return TokenService({"k1": "secret-one"}, "k1", cache_size=3)
+
+
+def test_verify_caches_claims(service: TokenService):
+    token = service.issue("42", {"scope": "items"})
+
+    first = service.verify(token)
+    second = service.verify(token)
+
+    assert first == second
+    assert (first["sub"], first["scope"]) == ("42", "items")
+    assert service.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_cache_is_bounded(service: TokenService):
+    tokens = [service.issue(str(i)) for i in range(5)]
+    for token in tokens:
+        service.verify(token)
+
+    assert service.stats()["entries"] == 3
+    service.verify(tokens[0])
+    assert service.misses == 6
+
+
+def test_cached_token_expires_with_exp(service: TokenService, monkeypatch):
+    token = service.issue("1", expires_delta=timedelta(seconds=60))
+    service.verify(token)
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    with pytest.raises(InvalidToken, match="expired"):
+        service.verify(token)
+    assert service.stats()["entries"] == 0
+
+
+def test_rejects_tampered_and_expired_tokens(service: TokenService):
+    header, payload, signature = service.issue("1").split(".")
+    with pytest.raises(InvalidToken):
+        service.verify(f"{header}.{payload}.{signature[::-1]}")
+    with pytest.raises(InvalidToken, match="expired"):
+        service.verify(service.issue("1", expires_delta=timedelta(seconds=-1)))
+    with pytest.raises(InvalidToken):
+        service.verify("not-a-token")
+
+
+def test_key_rotation(service: TokenService):
+    old = service.issue("1")
+    service.verify(old)
+
+    service.rotate("k2", "secret-two")
+    new = service.issue("1")
+    assert service.verify(old)["sub"] == service.verify(new)["sub"] == "1"
+
+    service.retire("k1")
+    with pytest.raises(InvalidToken, match="unknown key"):
+        service.verify(old)
+    assert service.verify(new)["sub"] == "1"
+    with pytest.raises(ValueError):
+        service.retire("k2")
+
+
+def test_token_endpoint_and_current_user():
+    credentials = {"email": "auth@example.com", "password": "s3cret"}
+    with TestClient(app, base_url="http://localhost") as client:
+        client.post(
+            "/api/v1/users/", json={**credentials, "name": "Auth"}
+        ).raise_for_status()
+
+        response = client.post("/api/v1/auth/token", json=credentials)
+        assert response.status_code == 200
+        token = response.json()["access_token"]
+
+        me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert me.status_code == 200
+        assert me.json()["email"] == credentials["email"]
+
+        wrong = client.post(
+            "/api/v1/auth/token", json={**credentials, "password": "nope"}
+        )
+        assert wrong.status_code == 401
+
+        missing = client.get("/api/v1/auth/me")
+        assert missing.status_code == 401
+        assert missing.headers["WWW-Authenticate"] == "Bearer"
+        bad = client.get("/api/v1/auth/me", headers={"Authorization": "Bearer x.y.z"})
+        assert bad.status_code == 401
+
+
+def test_rehash_on_login_refreshes_the_cached_user(monkeypatch):
+    credentials = {"email": "rehash@example.com", "password": "s3cret"}
+    with TestClient(app, base_url="http://localhost") as client:
+        user = client.post("/api/v1/users/", json={**credentials, "name": "Re"}).json()
+        url = f"/api/v1/users/{user['id']}"
+        before = client.get(url)
+
+        monkeypatch.setattr(password_hasher, "needs_rehash", lambda hashed: True)
+        client.post("/api/v1/auth/token", json=credentials).raise_for_status()
+
+        after = client.get(url)
+        assert after.json()["version"] == before.json()["version"] + 1
+        assert after.json()["updated_at"] > before.json()["updated_at"]
+        renamed = client.put(
+            url, json={"name": "Renamed"}, headers={"If-Match": after.headers["ETag"]}
+        )
+        assert renamed.status_code == 200
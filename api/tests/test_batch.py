@@ -0,0 +1,118 @@
+"""Tests for the bulk create/update/delete endpoints."""
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.passwords import password_hasher
+
+_sequence = itertools.count(1)
+
+
+def new_user() -> dict:
+    n = next(_sequence)
+    return {"email": f"batch{n}@example.com", "name": f"Batch {n}", "password": "x"}
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+def test_create_reports_each_row(client):
+    taken = new_user()
+    client.post("/api/v1/users/", json=taken).raise_for_status()
+    fresh = new_user()
+
+    response = client.post(
+        "/api/v1/users:batch",
+        json=[fresh, {"email": "not-an-email", "name": "x"}, fresh, taken],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 3)
+    assert [row["status"] for row in body["results"]] == [201, 422, 400, 400]
+    assert body["results"][1]["error"].startswith("email:")
+    created = client.get(f"/api/v1/users/{body['results'][0]['id']}").json()
+    assert created["email"] == fresh["email"]
+
+
+def test_rows_without_a_hashing_slot_get_503(client, monkeypatch):
+    async def hash_many(passwords):
+        # As if the pool filled up after the first chunk
+        return ["$2b$04$" + "x" * 53] + [None] * (len(passwords) - 1)
+
+    monkeypatch.setattr(password_hasher, "hash_many", hash_many)
+    first, second = new_user(), new_user()
+
+    body = client.post("/api/v1/users:batch", json=[first, second]).json()
+
+    assert [row["status"] for row in body["results"]] == [201, 503]
+    assert body["results"][1]["error"].startswith("Too many password changes")
+    created_id = body["results"][0]["id"]
+
+    updated = client.patch(
+        "/api/v1/users:batch",
+        json=[
+            {"id": created_id, "password": "a"},
+            {"id": created_id, "name": "Renamed"},
+            {"id": created_id, "password": "b"},
+        ],
+    ).json()
+
+    assert [row["status"] for row in updated["results"]] == [200, 200, 503]
+    assert client.get(f"/api/v1/users/{created_id}").json()["name"] == "Renamed"
+
+
+def test_update_and_delete(client):
+    created = client.post("/api/v1/items:batch", json=[{"title": "a"}, {"title": "b"}])
+    ids = [row["id"] for row in created.json()["results"]]
+    # Cache one of them so the bulk update has to invalidate it
+    client.get(f"/api/v1/items/{ids[0]}")
+
+    updated = client.patch(
+        "/api/v1/items:batch",
+        json=[
+            {"id": ids[0], "title": "A"},
+            {"id": 10**9, "title": "?"},
+            {"title": "?"},
+        ],
+    ).json()
+
+    assert [row["status"] for row in updated["results"]] == [200, 404, 422]
+    assert client.get(f"/api/v1/items/{ids[0]}").json()["title"] == "A"
+
+    deleted = client.request("DELETE", "/api/v1/items:batch", json=[ids[1], ids[1]])
+
+    assert [row["status"] for row in deleted.json()["results"]] == [204, 404]
+    assert client.get(f"/api/v1/items/{ids[1]}").status_code == 404
+
+
+def test_rejects_body_that_is_not_a_list(client):
+    assert client.post("/api/v1/items:batch", json={"title": "a"}).status_code == 422
+    assert client.post("/api/v1/items:batch", content=b"[").status_code == 422
+
+
+def test_rejects_oversized_batch(client, monkeypatch):
+    monkeypatch.setattr("app.api.v1.batch.settings.BATCH_MAX_ROWS", 2)
+
+    response = client.post("/api/v1/items:batch", json=[{"title": "a"}] * 3)
+
+    assert response.status_code == 413
+
+
+def test_oversized_batch_is_not_validated(client, monkeypatch):
+    class Refuses:
+        def validate_python(self, rows):
+            raise AssertionError("validated an oversized batch")
+
+    monkeypatch.setattr("app.api.v1.batch.settings.BATCH_MAX_ROWS", 2)
+    monkeypatch.setattr("app.api.v1.endpoints.items._create_rows", Refuses())
+
+    response = client.post("/api/v1/items:batch", json=[{"title": 1}] * 3)
+
+    assert response.status_code == 413
@@ -0,0 +1,125 @@
+"""Tests for the two-tier response cache."""
+
+import time
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import LRUCache, ResponseCache, response_cache
+from app.main import app
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of ``redis.asyncio`` the cache uses."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, bytes] = {}
+        self.published: list = []
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def publish(self, channel: str, message: Any) -> None:
+        self.published.append((channel, message))
+
+    async def aclose(self) -> None:
+        pass
+
+
+@pytest.fixture
+def client():
+    response_cache.local.clear()
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_lru_expires_entries(monkeypatch):
+    cache = LRUCache(max_entries=10, ttl=5)
+    cache.set("a", b"1")
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+async def test_redis_tier_backfills_local_tier():
+    redis = FakeRedis()
+    cache = ResponseCache()
+    await cache.connect(redis, listen=False)
+
+    await cache.set("items:1", b"{}")
+    assert redis.data["oshima:cache:items:1"] == b"{}"
+    assert len(redis.published) == 1
+
+    cache.local.clear()
+    assert await cache.get("items:1") == b"{}"
+    assert cache.stats()["redis"]["hits"] == 1
+    assert await cache.get("items:1") == b"{}"
+    assert cache.stats()["local"]["hits"] == 1
+
+    await cache.delete("items:1")
+    assert await cache.get("items:1") is None
+    assert cache.stats()["redis"]["misses"] == 1
+    await cache.close()
+
+
+async def test_delete_many_publishes_one_invalidation():
+    redis = FakeRedis()
+    cache = ResponseCache()
+    await cache.connect(redis, listen=False)
+    await cache.set("items:1", b"{}")
+    await cache.set("items:2", b"{}")
+    redis.published.clear()
+
+    await cache.delete_many(["items:1", "items:2"])
+
+    assert redis.data == {}
+    assert len(cache.local) == 0
+    ((_, message),) = redis.published
+    assert message.split(" ")[1:] == ["items:1", "items:2"]
+    await cache.close()
+
+
+def test_get_is_served_from_cache(client):
+    stats = response_cache.stats()["local"]
+    hits, misses = stats["hits"], stats["misses"]
+
+    first = client.get("/api/v1/items/1")
+    second = client.get("/api/v1/items/1")
+
+    assert first.json() == second.json()
+    stats = response_cache.stats()["local"]
+    assert stats["misses"] == misses + 1
+    assert stats["hits"] == hits + 1
+
+
+def test_writes_keep_cache_fresh(client):
+    created = client.post("/api/v1/items/", json={"title": "Cached"}).json()
+    assert client.get(f"/api/v1/items/{created['id']}").json() == created
+
+    updated = client.put(f"/api/v1/items/{created['id']}", json={"title": "New"})
+    assert client.get(f"/api/v1/items/{created['id']}").json() == updated.json()
+
+    assert client.delete(f"/api/v1/items/{created['id']}").status_code == 204
+    assert client.get(f"/api/v1/items/{created['id']}").status_code == 404
@@ -0,0 +1,137 @@
+"""Tests for single-flight coalescing of identical concurrent GETs."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.core.coalesce import CoalescingMiddleware, RequestCoalescer
+from app.main import app
+
+
+def make_client(delay: float = 0.05, **kwargs):
+    """A client for a slow echo app behind its own coalescer."""
+    calls = []
+
+    async def echo(request: Request) -> Response:
+        calls.append(request.url.path)
+        call = len(calls)
+        await asyncio.sleep(delay)
+        size = int(request.query_params.get("size", "0"))
+        return JSONResponse(
+            {
+                "call": call,
+                "query": dict(request.query_params),
+                "auth": request.headers.get("authorization"),
+                "padding": "x" * size,
+            },
+            headers={"ETag": f'"{call}"'},
+        )
+
+    options = {"vary_headers": ["authorization"], "max_wait": 5.0, "max_body": 1024}
+    coalescer = RequestCoalescer(**{**options, **kwargs})
+    routes = [Route("/echo/{name}", echo, methods=["GET", "POST"])]
+    inner = CoalescingMiddleware(Starlette(routes=routes), coalescer=coalescer)
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=inner), base_url="http://test"
+    )
+    return client, coalescer, calls
+
+
+async def test_identical_gets_share_one_response():
+    client, coalescer, calls = make_client()
+    async with client:
+        responses = await asyncio.gather(
+            *(client.get("/echo/a?x=1&y=2") for _ in range(20)),
+            client.get("/echo/a?y=2&x=1"),  # same parameters, another order
+        )
+        # Finished flights are not reused
+        again = await client.get("/echo/a?x=1&y=2")
+
+    assert again.json()["call"] == 2
+    assert len(calls) == 2
+    assert {response.json()["call"] for response in responses} == {1}
+    assert {response.headers["ETag"] for response in responses} == {'"1"'}
+    assert coalescer.stats() == {
+        "in_flight": 0,
+        "leaders": 2,
+        "coalesced": 20,
+        "timeouts": 0,
+        "fallbacks": 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ({"url": "/echo/a"}, {"url": "/echo/b"}),
+        ({"url": "/echo/a?x=1"}, {"url": "/echo/a?x=2"}),
+        ({"url": "/echo/a?x=1&x=2"}, {"url": "/echo/a?x=2&x=1"}),
+        (
+            {"url": "/echo/a", "headers": {"Authorization": "Bearer one"}},
+            {"url": "/echo/a", "headers": {"Authorization": "Bearer two"}},
+        ),
+    ],
+)
+async def test_different_requests_are_not_merged(first, second):
+    client, coalescer, calls = make_client()
+    async with client:
+        one, two = await asyncio.gather(client.get(**first), client.get(**second))
+
+    assert len(calls) == 2
+    assert one.json()["call"] != two.json()["call"]
+    assert coalescer.coalesced == 0
+
+
+async def test_only_bodyless_gets_are_coalesced():
+    client, coalescer, calls = make_client()
+    async with client:
+        await asyncio.gather(
+            client.post("/echo/a"),
+            client.post("/echo/a"),
+            client.request("GET", "/echo/a", content=b"body"),
+            client.request("GET", "/echo/a", content=b"body"),
+        )
+
+    assert len(calls) == 4
+    assert coalescer.leaders == 0
+
+
+async def test_followers_stop_waiting_after_max_wait():
+    client, coalescer, calls = make_client(delay=0.2, max_wait=0.01)
+    async with client:
+        responses = await asyncio.gather(*(client.get("/echo/a") for _ in range(3)))
+
+    assert len(calls) == 3
+    assert all(response.status_code == 200 for response in responses)
+    assert coalescer.timeouts == 2
+
+
+async def test_large_responses_are_not_shared():
+    client, coalescer, calls = make_client(max_body=100)
+    async with client:
+        responses = await asyncio.gather(
+            *(client.get("/echo/a?size=200") for _ in range(3))
+        )
+
+    assert len(calls) == 3
+    assert all(len(response.json()["padding"]) == 200 for response in responses)
+    assert coalescer.fallbacks == 2
+
+
+def test_detailed_health_reports_counters():
+    with TestClient(app, base_url="http://localhost") as client:
+        coalescing = client.get("/api/v1/health/detailed").json()["coalescing"]
+
+    assert set(coalescing) == {
+        "in_flight",
+        "leaders",
+        "coalesced",
+        "timeouts",
+        "fallbacks",
+    }
@@ -0,0 +1,125 @@
+"""Tests for response compression."""
+
+import gzip
+import zlib
+from typing import Any, Dict, List
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, negotiate
+
+BODY = b'{"title": "compressible"}' * 100
+
+
+async def large(request: Any) -> Response:
+    return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+async def small(request: Any) -> Response:
+    return Response(b"{}", media_type="application/json")
+
+
+async def image(request: Any) -> Response:
+    return Response(BODY, media_type="image/png")
+
+
+async def stream(request: Any) -> StreamingResponse:
+    async def chunks():
+        for _ in range(3):
+            yield BODY
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+app = CompressionMiddleware(
+    Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    ),
+    minimum_size=500,
+    encodings=["gzip"],
+)
+
+
+async def call(path: str, accept_encoding: str) -> List[Dict[str, Any]]:
+    """Run one request through ``app`` and return the messages it sends."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    sent: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def headers(start: Dict[str, Any]) -> Dict[str, str]:
+    return {k.decode(): v.decode() for k, v in start["headers"]}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, br", "br"),
+        ("gzip, br;q=0.5", "gzip"),
+        ("*", "zstd"),
+        ("br;q=0, *", "zstd"),
+        ("identity", None),
+        ("gzip;q=0", None),
+        ("GZIP", "gzip"),
+    ],
+)
+def test_negotiate(header: str, expected: str):
+    assert negotiate(header, ("zstd", "br", "gzip")) == expected
+
+
+async def test_compresses_large_body():
+    start, body = await call("/large", "gzip")
+
+    response_headers = headers(start)
+    assert response_headers["content-encoding"] == "gzip"
+    assert response_headers["vary"] == "Accept-Encoding"
+    assert response_headers["etag"] == '"v1-gzip"'
+    assert int(response_headers["content-length"]) == len(body["body"])
+    assert gzip.decompress(body["body"]) == BODY
+
+
+@pytest.mark.parametrize(
+    "path, accept_encoding",
+    [("/small", "gzip"), ("/image", "gzip"), ("/large", "identity")],
+)
+async def test_sends_as_is(path: str, accept_encoding: str):
+    start, body = await call(path, accept_encoding)
+
+    assert "content-encoding" not in headers(start)
+    assert not body["body"] or body["body"] in (BODY, b"{}")
+
+
+async def test_streams_incrementally():
+    start, *bodies = await call("/stream", "gzip")
+
+    assert headers(start)["content-encoding"] == "gzip"
+    assert "content-length" not in headers(start)
+    # Each chunk is flushed, so it decompresses without waiting for the rest
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for message in bodies[:3]:
+        assert decompressor.decompress(message["body"]) == BODY
+    assert bodies[-1]["more_body"] is False
+    assert decompressor.decompress(bodies[-1]["body"]) == b""
+    assert decompressor.eof
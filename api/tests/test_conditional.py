@@ -0,0 +1,97 @@
+"""Tests for ETags, If-None-Match and If-Match on the item endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+@pytest.fixture
+def url(client) -> str:
+    item = client.post("/api/v1/items/", json={"title": "c"}).json()
+    return f"/api/v1/items/{item['id']}"
+
+
+def test_a_matching_if_none_match_gets_304(client, url):
+    etag = client.get(url).headers["ETag"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(url, headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_the_record_etag_changes_with_the_record(client, url):
+    etag = client.get(url).headers["ETag"]
+
+    client.put(url, json={"title": "changed"})
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_the_list_etag_changes_after_a_write(client, url):
+    etag = client.get("/api/v1/items/").headers["ETag"]
+    assert (
+        client.get("/api/v1/items/", headers={"If-None-Match": etag}).status_code == 304
+    )
+    # Each query gets its own tag
+    assert client.get("/api/v1/items/?fields=id").headers["ETag"] != etag
+
+    client.put(url, json={"title": "changed"})
+
+    response = client.get("/api/v1/items/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_a_stale_if_match_gets_412(client, url):
+    etag = client.get(url).headers["ETag"]
+    assert client.put(url, json={"title": "a"}, headers={"If-Match": etag}).is_success
+
+    stale = client.put(url, json={"title": "b"}, headers={"If-Match": etag})
+
+    assert stale.status_code == 412
+    assert stale.json()["detail"] == "Resource has been modified"
+    assert client.get(url).json()["title"] == "a"
+    # A weak validator never satisfies If-Match
+    current = client.get(url).headers["ETag"]
+    weak = client.put(url, json={"title": "b"}, headers={"If-Match": f"W/{current}"})
+    assert weak.status_code == 412
+    assert client.put(url, json={"title": "b"}, headers={"If-Match": "*"}).is_success
+
+
+def test_if_match_on_a_missing_record_gets_404(client):
+    response = client.put(
+        "/api/v1/items/999999", json={"title": "x"}, headers={"If-Match": '"x"'}
+    )
+
+    assert response.status_code == 404
+
+
+def test_the_etag_of_a_compressed_read_satisfies_if_match(client):
+    item = client.post(
+        "/api/v1/items/", json={"title": "big", "description": "x" * 4096}
+    ).json()
+    url = f"/api/v1/items/{item['id']}"
+    read = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert read.headers["Content-Encoding"] == "gzip"
+    etag = read.headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    written = client.put(url, json={"title": "a"}, headers={"If-Match": etag})
+
+    assert written.status_code == 200
+    stale = client.put(url, json={"title": "b"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
@@ -0,0 +1,80 @@
+"""Tests for sparse fieldsets (?fields=)."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.serialization import dump_rows, rows_adapter
+from app.main import app
+from app.schemas.item import Item
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+def test_serializer_is_built_once_per_subset():
+    rows_adapter.cache_clear()
+    rows = [{"id": 1, "title": "a", "description": None, "owner_id": 3}]
+
+    assert dump_rows(Item, rows, ("title", "id")) == b'[{"id":1,"title":"a"}]'
+    dump_rows(Item, rows, ("title", "id"))
+
+    assert rows_adapter.cache_info().misses == 1
+
+
+def test_list_returns_only_requested_fields(client):
+    response = client.get("/api/v1/items/?fields=title, id")
+    assert response.status_code == 200
+    assert all(set(item) == {"id", "title"} for item in response.json())
+
+    # The full list carries a different ETag than the sparse one
+    full = client.get("/api/v1/items/")
+    assert full.headers["ETag"] != response.headers["ETag"]
+    assert len(full.content) > len(response.content)
+
+    streamed = client.get(
+        "/api/v1/users/?fields=email", headers={"Accept": "application/x-ndjson"}
+    )
+    assert all(
+        set(json.loads(line)) == {"email"} for line in streamed.text.splitlines()
+    )
+
+
+def test_single_record_fields_bypass_the_cache(client):
+    full = client.get("/api/v1/users/1")
+    sparse = client.get("/api/v1/users/1?fields=name")
+    again = client.get("/api/v1/users/1")
+
+    assert sparse.json() == {"name": full.json()["name"]}
+    assert again.json() == full.json()
+    assert sparse.headers["ETag"] != full.headers["ETag"]
+
+    etag = sparse.headers["ETag"]
+    cached = client.get("/api/v1/users/1?fields=name", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_every_field_is_the_full_representation(client):
+    every = ",".join(Item.model_fields)
+    assert client.get(f"/api/v1/items/1?fields={every}").json() == (
+        client.get("/api/v1/items/1").json()
+    )
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/v1/users/?fields=hashed_password",
+        "/api/v1/users/1?fields=name,nope",
+        "/api/v1/items/?fields=",
+        "/api/v1/users/1/items?fields=email",
+    ],
+)
+def test_unknown_fields_are_rejected(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert "choose from" in response.json()["detail"]
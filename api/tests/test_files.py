@@ -0,0 +1,116 @@
+"""Tests for streaming file upload and download."""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.files import file_store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_store, "root", tmp_path)
+    monkeypatch.setattr(file_store, "max_size", 1000)
+    monkeypatch.setattr(file_store, "buffer_size", 64)
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+def upload(client: TestClient, content: bytes, name: str = "a.bin") -> dict:
+    response = client.post(
+        "/api/v1/files/", files={"file": (name, content, "application/x-test")}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_multipart_upload_is_stored_by_hash(client, tmp_path):
+    content = os.urandom(700)
+
+    info = upload(client, content, name="../../etc/report.bin")
+
+    assert info["filename"] == "report.bin"
+    assert info["content_type"] == "application/x-test"
+    assert info["size"] == 700
+    assert not info["deduplicated"]
+    stored = tmp_path / "objects" / info["sha256"][:2] / info["sha256"][2:]
+    assert stored.read_bytes() == content
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_identical_content_is_deduplicated(client, tmp_path):
+    first = upload(client, b"same bytes", name="one.txt")
+    second = client.post(
+        "/api/v1/files/?filename=two.txt",
+        content=b"same bytes",
+        headers={"Content-Type": "text/plain"},
+    ).json()
+
+    assert second["deduplicated"]
+    assert second["sha256"] == first["sha256"]
+    assert (second["filename"], second["content_type"]) == ("two.txt", "text/plain")
+    assert len(list((tmp_path / "objects").rglob("*"))) == 2  # one dir, one blob
+
+
+def test_oversized_uploads_are_rejected(client, tmp_path):
+    # Declared up front, and discovered while streaming a chunked body
+    declared = client.post("/api/v1/files/", content=b"x" * 1001)
+    streamed = client.post("/api/v1/files/", content=(b"x" * 100 for _ in range(20)))
+    multipart = client.post("/api/v1/files/", files={"file": ("big", b"x" * 1001)})
+
+    assert declared.status_code == streamed.status_code == 413
+    assert multipart.status_code == 413
+    assert list((tmp_path / "tmp").iterdir()) == []
+    assert not (tmp_path / "objects").exists()
+
+
+def test_multipart_without_file_field(client):
+    response = client.post("/api/v1/files/", files={"other": ("x", b"data")})
+    assert response.status_code == 400
+
+
+def test_download_supports_ranges_and_conditionals(client):
+    content = bytes(range(256)) * 3
+    info = upload(client, content)
+    url = f"/api/v1/files/{info['id']}"
+
+    full = client.get(url)
+    assert full.content == content
+    assert full.headers["ETag"] == f'"{info["sha256"]}"'
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert 'filename="a.bin"' in full.headers["Content-Disposition"]
+
+    part = client.get(url, headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.content == content[10:20]
+    assert part.headers["Content-Range"] == f"bytes 10-19/{len(content)}"
+
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == content
+
+    etag = full.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    since = full.headers["Last-Modified"]
+    assert client.get(url, headers={"If-Modified-Since": since}).status_code == 304
+
+    head = client.head(url)
+    assert head.status_code == 200 and head.content == b""
+    assert head.headers["Content-Length"] == str(len(content))
+
+    assert client.get("/api/v1/files/999999").status_code == 404
+
+
+def test_download_via_accel_redirect(client, monkeypatch):
+    info = upload(client, b"served by nginx")
+    monkeypatch.setattr(settings, "FILES_ACCEL_REDIRECT", "/_files/")
+
+    response = client.get(f"/api/v1/files/{info['id']}")
+
+    sha = info["sha256"]
+    assert (
+        response.headers["X-Accel-Redirect"] == f"/_files/objects/{sha[:2]}/{sha[2:]}"
+    )
+    assert response.content == b""
@@ -0,0 +1,143 @@
+"""Tests for secondary indexes and filtered list endpoints."""
+
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.repository import InMemoryRepository
+
+
+def make_repository(count: int) -> InMemoryRepository:
+    return InMemoryRepository(
+        (
+            {"id": i, "owner_id": i % 10, "is_active": i % 3 != 0}
+            for i in range(1, count + 1)
+        ),
+        index_fields=("owner_id", "is_active"),
+    )
+
+
+def expected(count: int, owner_id: int, is_active: bool) -> list:
+    return [
+        i
+        for i in range(1, count + 1)
+        if i % 10 == owner_id and (i % 3 != 0) == is_active
+    ]
+
+
+async def ids(repository: InMemoryRepository, **kwargs) -> list:
+    return [record["id"] for record in await repository.list(**kwargs)]
+
+
+@pytest.mark.parametrize("count", [50, 1000])  # sorting an index vs an ID scan
+async def test_filters_intersect_indexes_in_id_order(count):
+    repository = make_repository(count)
+    matching = expected(count, 7, True)
+    both = {"owner_id": 7, "is_active": True}
+
+    assert await ids(repository, filters=both) == matching
+    assert await ids(repository, filters=both, after=matching[1]) == matching[2:]
+    assert await ids(repository, filters=both, limit=3) == matching[:3]
+    assert await ids(repository, filters={"is_active": False}, limit=2) == [3, 6]
+    assert await ids(repository, filters={"owner_id": 42}) == []
+
+
+async def test_indexes_follow_writes():
+    repository = make_repository(20)
+
+    created = await repository.create({"owner_id": 7, "is_active": True})
+    await repository.update(7, {"owner_id": 3})
+    await repository.update(17, {"is_active": False})
+    await repository.delete(11)
+    await repository.update_many([(1, {"owner_id": 7})])
+    await repository.delete_many([created["id"]])
+
+    assert await ids(repository, filters={"owner_id": 7}) == [1, 17]
+    assert await ids(repository, filters={"owner_id": 7, "is_active": False}) == [17]
+    assert await ids(repository, filters={"owner_id": 3}) == [3, 7, 13]
+    # Emptied value sets are dropped rather than kept around
+    await repository.update(3, {"owner_id": 1})
+    await repository.update(7, {"owner_id": 1})
+    await repository.update(13, {"owner_id": 1})
+    assert 3 not in repository._indexes["owner_id"]
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+@pytest.fixture
+def owner(client):
+    """A fresh user owning two active items and one inactive one."""
+    response = client.post(
+        "/api/v1/users/",
+        json={"email": f"{uuid.uuid4().hex}@example.com", "name": "O", "password": "x"},
+    )
+    user_id = response.json()["id"]
+    item_ids = []
+    for title, is_active in (("a", True), ("b", False), ("c", True)):
+        response = client.post(
+            "/api/v1/items/",
+            json={"title": title, "is_active": is_active, "owner_id": user_id},
+        )
+        item_ids.append(response.json()["id"])
+    return user_id, item_ids
+
+
+def test_list_items_filters(client, owner):
+    user_id, (a, b, c) = owner
+
+    items = client.get(f"/api/v1/items/?owner_id={user_id}").json()
+    assert [item["id"] for item in items] == [a, b, c]
+    items = client.get(f"/api/v1/items/?owner_id={user_id}&is_active=false").json()
+    assert [item["id"] for item in items] == [b]
+
+    first = client.get(f"/api/v1/items/?owner_id={user_id}&is_active=true&limit=1")
+    assert [item["id"] for item in first.json()] == [a]
+    cursor = first.headers["X-Next-Cursor"]
+    rest = client.get(
+        f"/api/v1/items/?owner_id={user_id}&is_active=true&limit=1&after={cursor}"
+    )
+    assert [item["id"] for item in rest.json()] == [c]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_user_items(client, owner):
+    user_id, (a, b, c) = owner
+
+    response = client.get(f"/api/v1/users/{user_id}/items")
+    assert [item["id"] for item in response.json()] == [a, b, c]
+
+    client.put(f"/api/v1/items/{a}", json={"owner_id": 1})
+    client.delete(f"/api/v1/items/{c}")
+    response = client.get(
+        f"/api/v1/users/{user_id}/items", headers={"Accept": "application/x-ndjson"}
+    )
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [b]
+
+    assert client.get("/api/v1/users/999999/items").status_code == 404
+
+
+def test_list_users_filter(client):
+    response = client.post(
+        "/api/v1/users/",
+        json={
+            "email": f"{uuid.uuid4().hex}@example.com",
+            "name": "Inactive",
+            "password": "x",
+            "is_active": False,
+        },
+    )
+    user_id = response.json()["id"]
+
+    inactive = client.get("/api/v1/users/?is_active=false&limit=1000").json()
+    active = client.get("/api/v1/users/?is_active=true&limit=1000").json()
+
+    assert user_id in [user["id"] for user in inactive]
+    assert all(not user["is_active"] for user in inactive)
+    assert user_id not in [user["id"] for user in active]
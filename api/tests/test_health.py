@@ -0,0 +1,147 @@
+"""Tests for the health probe registry and endpoints."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.health import HEALTHY, UNHEALTHY, HealthRegistry, health_registry
+from app.main import app
+
+
+class Counter:
+    """A probe that counts its calls and can be made to fail or hang."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None) -> None:
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+
+async def test_probes_run_concurrently_with_their_own_timeouts():
+    registry = HealthRegistry(timeout=0.1)
+    registry.register("a", Counter(delay=0.05))
+    registry.register("b", Counter(delay=0.05))
+    registry.register("hung", Counter(delay=10), critical=False)
+    registry.register("broken", Counter(error=ConnectionError("refused")))
+
+    start = time.perf_counter()
+    results = await registry.refresh()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5  # the slowest probe's timeout, not the sum
+    assert results["a"].status == results["b"].status == HEALTHY
+    assert results["a"].latency_ms >= 50
+    assert results["hung"].status == UNHEALTHY
+    assert "Timed out" in results["hung"].error
+    assert results["broken"].error == "ConnectionError: refused"
+    assert not registry.is_ready(results)
+
+
+async def test_reads_are_served_from_the_cache():
+    registry = HealthRegistry(ttl=60)
+    probe = Counter()
+    registry.register("db", probe)
+
+    for _ in range(100):
+        await registry.results()
+
+    assert probe.calls == 1
+
+
+async def test_stale_results_are_returned_while_refreshing():
+    registry = HealthRegistry(ttl=0)
+    probe = Counter(delay=0.05)
+    registry.register("db", probe)
+    first = await registry.results()
+
+    start = time.perf_counter()
+    stale = await registry.results()
+    assert time.perf_counter() - start < 0.02
+    assert stale is first
+
+    await asyncio.sleep(0.1)
+    assert probe.calls == 2
+    assert (await registry.results()) is not first
+
+
+async def test_concurrent_refreshes_share_one_run():
+    registry = HealthRegistry()
+    probe = Counter(delay=0.05)
+    registry.register("db", probe)
+
+    await asyncio.gather(*(registry.refresh() for _ in range(10)))
+
+    assert probe.calls == 1
+
+
+async def test_background_refresher():
+    registry = HealthRegistry(ttl=60, interval=0.02)
+    probe = Counter()
+    registry.register("db", probe)
+
+    await registry.start()
+    await asyncio.sleep(0.1)
+    await registry.stop()
+    calls = probe.calls
+    await asyncio.sleep(0.05)
+
+    assert calls >= 3
+    assert probe.calls == calls
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+    for name in ("db", "cache"):
+        health_registry.unregister(name)
+
+
+def test_health_endpoints(client):
+    health_registry.register("db", Counter())
+    health_registry.register("cache", Counter(), critical=False)
+
+    assert client.get("/api/v1/health/live").json() == {"status": "alive"}
+
+    ready = client.get("/api/v1/health/ready")
+    assert ready.status_code == 200
+    assert ready.json()["checks"] == {"db": HEALTHY, "cache": HEALTHY}
+
+    detailed = client.get("/api/v1/health/detailed").json()
+    assert detailed["status"] == "healthy"
+    assert set(detailed["checks"]["db"]) == {
+        "status",
+        "latency_ms",
+        "checked_at",
+        "critical",
+    }
+
+
+def test_failing_probes_degrade_or_fail_readiness(client):
+    health_registry.register("cache", Counter(error=OSError("down")), critical=False)
+    health_registry.register("db", Counter())
+
+    assert client.get("/api/v1/health/ready").status_code == 200
+    detailed = client.get("/api/v1/health/detailed")
+    assert detailed.status_code == 200
+    assert detailed.json()["status"] == "degraded"
+    assert detailed.json()["checks"]["cache"]["error"] == "OSError: down"
+
+    health_registry.register("db", Counter(error=OSError("down")))
+
+    ready = client.get("/api/v1/health/ready")
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "not_ready"
+    detailed = client.get("/api/v1/health/detailed")
+    assert detailed.status_code == 503
+    assert detailed.json()["status"] == "unhealthy"
+    # Liveness is unaffected by dependencies
+    assert client.get("/api/v1/health/live").status_code == 200
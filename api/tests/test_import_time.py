@@ -0,0 +1,48 @@
+"""Import-time budget for app.main, measured with ``-X importtime``."""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+# Generous for a busy CI runner; app.main takes well under half of this on
+# a quiet machine. Override with IMPORT_TIME_BUDGET_MS.
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2000"))
+RUNS = 3
+
+# Only needed to serve from the CLI entry point or for console logging
+LAZY_MODULES = ["uvicorn", "rich.logging"]
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module ``module`` loads."""
+    env = {**os.environ, "LOG_FORMAT": "json"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            times[match.group(3)] = int(match.group(2))
+    return times
+
+
+def test_app_main_imports_within_budget():
+    runs = [import_times("app.main") for _ in range(RUNS)]
+    best_ms = min(times["app.main"] for times in runs) / 1000
+
+    assert best_ms <= BUDGET_MS, f"import app.main took {best_ms:.0f} ms"
+    for module in LAZY_MODULES:
+        assert module not in runs[0], f"app.main imports {module} eagerly"
@@ -0,0 +1,214 @@
+"""Tests for the journaled, snapshotted in-memory store."""
+
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.items import item_repository
+from app.services.journal import (
+    JOURNAL_MAGIC,
+    CorruptSnapshotError,
+    DurableStore,
+    Journal,
+    JournalFailedError,
+    StoreFormatError,
+    StoreLockedError,
+)
+from app.services.repository import InMemoryRepository
+
+NOW = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+
+def make_repository(records=()) -> InMemoryRepository:
+    return InMemoryRepository(
+        records, unique_fields=("email",), index_fields=("is_active",)
+    )
+
+
+async def reopen(path) -> InMemoryRepository:
+    """A new repository restored from the journal directory at ``path``."""
+    store = DurableStore(str(path), {"users": make_repository()})
+    await store.open()
+    await store.close()
+    return store.repositories["users"]
+
+
+async def test_writes_survive_a_restart(tmp_path):
+    repository = make_repository([{"id": 1, "email": "a@x", "is_active": True}])
+    store = DurableStore(str(tmp_path), {"users": repository})
+    await store.open()
+
+    bob = await repository.create({"email": "b@x", "is_active": True, "at": NOW})
+    await repository.update(1, {"is_active": False})
+    carol = await repository.create({"email": "c@x", "is_active": True})
+    await repository.delete(carol["id"])
+    await repository.create_many([{"email": "d@x", "is_active": False}])
+    await store.close()
+
+    restored = await reopen(tmp_path)
+    assert list(restored) == list(repository)
+    assert (await restored.get(bob["id"]))["at"] == NOW
+    assert await restored.get_by("email", "d@x") is not None
+    assert [r["id"] for r in await restored.list(filters={"is_active": False})] == [
+        1,
+        4,
+    ]
+    # The deleted record's ID is not handed out again
+    assert restored.last_id == 4
+    assert (await restored.create({"email": "e@x"}))["id"] == 5
+
+
+async def test_snapshot_compacts_and_keeps_the_tail(tmp_path):
+    repository = make_repository()
+    store = DurableStore(str(tmp_path), {"users": repository})
+    await store.open()
+    for i in range(50):
+        await repository.create({"email": f"{i}@x", "is_active": True})
+    await store.snapshot()
+    for record_id in range(1, 11):
+        await repository.delete(record_id)
+    await repository.update(11, {"email": "new@x"})
+    await store.close()
+
+    files = sorted(os.listdir(tmp_path / "users"))
+    assert files == ["journal-00000002.log", "snapshot-00000002.snap"]
+    restored = await reopen(tmp_path)
+    assert list(restored) == list(repository)
+    assert (await restored.get(11))["email"] == "new@x"
+
+
+async def test_a_torn_tail_is_discarded(tmp_path):
+    repository = make_repository()
+    store = DurableStore(str(tmp_path), {"users": repository})
+    await store.open()
+    for i in range(3):
+        await repository.create({"email": f"{i}@x"})
+    await store.close()
+
+    # A crash in the middle of writing a frame leaves part of it behind
+    path = tmp_path / "users" / "journal-00000001.log"
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+
+    restored = await reopen(tmp_path)
+    assert [record["id"] for record in restored] == [1, 2]
+    # The next run writes to a new segment after the torn one
+    assert (await restored.create({"email": "z@x"}))["id"] == 3
+
+
+async def test_a_corrupt_snapshot_is_reported(tmp_path):
+    store = DurableStore(str(tmp_path), {"users": make_repository([{"id": 1}])})
+    await store.open()
+    await store.close()
+    path = tmp_path / "users" / "snapshot-00000001.snap"
+    path.write_bytes(path.read_bytes()[:-1])
+
+    with pytest.raises(CorruptSnapshotError):
+        await reopen(tmp_path)
+
+
+async def test_files_in_another_format_are_refused(tmp_path):
+    repository = make_repository()
+    store = DurableStore(str(tmp_path), {"users": repository})
+    await store.open()
+    await repository.create({"email": "a@x", "at": NOW})
+    await store.close()
+
+    path = tmp_path / "users" / "journal-00000001.log"
+    data = path.read_bytes()
+    assert data.startswith(JOURNAL_MAGIC)
+    path.write_bytes(b"OSHJRNL1" + data[len(JOURNAL_MAGIC) :])
+
+    with pytest.raises(StoreFormatError):
+        await reopen(tmp_path)
+
+
+async def test_a_store_is_opened_by_one_process(tmp_path):
+    store = DurableStore(str(tmp_path), {"users": make_repository()})
+    await store.open()
+    # flock locks belong to the open file, so a second open stands in for
+    # another worker process
+    with pytest.raises(StoreLockedError):
+        await DurableStore(str(tmp_path), {"users": make_repository()}).open()
+    await store.close()
+    await reopen(tmp_path)
+
+
+async def test_concurrent_writes_share_fsyncs(tmp_path):
+    repository = make_repository()
+    store = DurableStore(str(tmp_path), {"users": repository})
+    await store.open()
+    journal = store.journals["users"]
+
+    await asyncio.gather(*(repository.create({"email": f"{i}@x"}) for i in range(200)))
+    await store.close()
+
+    assert journal.entries == 200
+    # The first write goes out alone; the rest queue up behind it
+    assert journal.flushes <= 3
+    assert len(await reopen(tmp_path)) == 200
+
+
+async def test_reads_and_missing_records_do_not_write(tmp_path):
+    journal = Journal(tmp_path)
+    assert journal.recover() is None
+
+    repository = make_repository([{"id": 1, "email": "a@x"}])
+    repository.attach(journal)
+    await repository.update(99, {"email": "b@x"})
+    await repository.delete(99)
+    await repository.get(1)
+    await journal.close()
+
+    assert journal.entries == 0
+    assert journal.flushes == 0
+
+
+def test_app_restores_the_store_on_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORE_PATH", str(tmp_path))
+    with TestClient(app, base_url="http://localhost") as client:
+        item = client.post("/api/v1/items/", json={"title": "Kept"}).json()
+    assert (tmp_path / "items" / "snapshot-00000001.snap").exists()
+
+    # As if the process had restarted with an empty store
+    item_repository.restore([])
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.get(f"/api/v1/items/{item['id']}")
+    assert response.json()["title"] == "Kept"
+
+
+async def test_a_failed_write_stops_the_journal_until_a_snapshot(tmp_path):
+    repository = make_repository()
+    store = DurableStore(str(tmp_path), {"users": repository})
+    await store.open()
+    journal = store.journals["users"]
+    await repository.create({"email": "a@x"})
+
+    write = journal._write
+
+    def full_disk(data, segment):
+        raise OSError(28, "No space left on device")
+
+    journal._write = full_disk
+    with pytest.raises(OSError):
+        await repository.create({"email": "b@x"})
+    journal._write = write
+
+    # Nothing is appended after the lost frame, and memory is left alone
+    with pytest.raises(JournalFailedError):
+        await repository.create({"email": "c@x"})
+    with pytest.raises(JournalFailedError):
+        await repository.update(1, {"email": "z@x"})
+    assert [record["email"] for record in repository] == ["a@x", "b@x"]
+
+    await store.snapshot(min_entries=10**6)
+    await repository.create({"email": "d@x"})
+    await store.close()
+
+    restored = await reopen(tmp_path)
+    assert [record["email"] for record in restored] == ["a@x", "b@x", "d@x"]
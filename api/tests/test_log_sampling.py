@@ -0,0 +1,145 @@
+"""Tests for log sampling and suppression."""
+
+import io
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+import pytest
+import structlog
+
+from app.core.config import settings
+from app.core.logging import LogSampler, setup_logging, stop_logging
+
+LOGGER = logging.getLogger("app.api.v1.endpoints.items")
+
+
+def run(
+    sampler: LogSampler, count: int, method: str = "info", event: str = "Fetching item"
+) -> List[Dict[str, Any]]:
+    """Feed ``count`` events through ``sampler`` and return the kept ones."""
+    kept = []
+    for i in range(count):
+        try:
+            kept.append(sampler(LOGGER, method, {"event": event, "item_id": i}))
+        except structlog.DropEvent:
+            pass
+    return kept
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_sampling_keeps_one_in_n():
+    sampler = LogSampler(sample_rates={"Fetching*": 10})
+
+    kept = run(sampler, 100)
+
+    assert len(kept) == 10
+    assert kept[0]["item_id"] == 0
+    assert all(event["sample_rate"] == 10 for event in kept)
+    assert len(run(sampler, 5, event="Creating item")) == 5
+
+
+def test_rate_limit_reports_suppressed_count(clock: List[float]):
+    sampler = LogSampler(rate=10, burst=5, summary_interval=60)
+
+    assert len(run(sampler, 20)) == 5
+
+    clock[0] += 0.1
+    (admitted,) = run(sampler, 1)
+    assert admitted["suppressed"] == 15
+
+    clock[0] += 0.1
+    (admitted,) = run(sampler, 1)
+    assert "suppressed" not in admitted
+
+
+def test_rate_limit_is_per_event(clock: List[float]):
+    sampler = LogSampler(rate=1, burst=2)
+
+    assert len(run(sampler, 10, event="Fetching item")) == 2
+    assert len(run(sampler, 10, event="Fetching user")) == 2
+
+
+def test_summary_replaces_dropped_event(clock: List[float]):
+    sampler = LogSampler(rate=0.01, burst=1, summary_interval=10)
+    run(sampler, 1)
+
+    assert run(sampler, 50) == []
+    clock[0] += 10
+    (summary,) = run(sampler, 1)
+
+    assert summary == {
+        "event": "Suppressed 51 similar events",
+        "suppressed_event": "Fetching item",
+        "suppressed": 51,
+    }
+
+
+@pytest.mark.parametrize("method", ["warning", "error", "critical", "exception"])
+def test_warnings_and_errors_always_pass(method: str):
+    sampler = LogSampler(sample_rates={"Fetching item": 100}, rate=1, burst=1)
+
+    assert len(run(sampler, 50, method=method)) == 50
+
+
+def test_pending_reports_bursts_that_stopped(clock: List[float]):
+    sampler = LogSampler(rate=1, burst=1, summary_interval=10)
+    run(sampler, 5)
+    run(sampler, 3, event="Fetching user")
+
+    assert sampler.pending() == []
+    clock[0] += 10
+    assert [
+        (name, method, event["suppressed_event"], event["suppressed"])
+        for name, method, event in sampler.pending()
+    ] == [
+        (LOGGER.name, "info", "Fetching item", 4),
+        (LOGGER.name, "info", "Fetching user", 2),
+    ]
+    assert sampler.pending(force=True) == []
+
+    # The bucket refilled meanwhile, so the first of these gets through
+    run(sampler, 3, method="debug")
+    (summary,) = sampler.pending(force=True)
+    assert summary[1:] == (
+        "debug",
+        {
+            "event": "Suppressed 2 similar events",
+            "suppressed_event": "Fetching item",
+            "suppressed": 2,
+        },
+    )
+    # A reported summary passes the sampler untouched
+    assert sampler(LOGGER, "debug", dict(summary[2])) == summary[2]
+
+
+def test_shutdown_logs_pending_counts(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_LEVEL", "INFO")
+    monkeypatch.setattr(settings, "LOG_RATE_LIMIT", 1)
+    monkeypatch.setattr(settings, "LOG_RATE_LIMIT_BURST", 1)
+    monkeypatch.setattr(settings, "LOG_SUPPRESSION_SUMMARY_INTERVAL", 3600)
+    stream = io.StringIO()
+    try:
+        setup_logging(log_format="json", use_queue=True, stream=stream)
+        logger = structlog.get_logger("tests.burst")
+        for n in range(10):
+            logger.info("Burst", n=n)
+        stop_logging()
+    finally:
+        monkeypatch.undo()
+        setup_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["event"] for line in lines] == [
+        "Burst",
+        "Suppressed 9 similar events",
+    ]
+    assert lines[1]["logger"] == "tests.burst"
+    assert lines[1]["suppressed_event"] == "Burst"
@@ -0,0 +1,84 @@
+"""Tests for the background log writer and caller lookup."""
+
+import io
+import json
+import logging
+
+import structlog
+
+from app.core import logging as app_logging
+from app.core.logging import LogWriter
+
+
+def test_a_full_queue_drops_and_reports_lines():
+    stream = io.StringIO()
+    writer = LogWriter(stream, max_lines=3)
+
+    # The thread is not running yet, so nothing drains the queue
+    for n in range(5):
+        writer.put(f"line {n}")
+    assert writer.dropped == 2
+
+    writer.start()
+    writer.stop()
+
+    *lines, report = stream.getvalue().splitlines()
+    assert lines == ["line 0", "line 1", "line 2"]
+    report = json.loads(report)
+    assert report["dropped"] == 2
+    assert report["level"] == "warning"
+    assert report["event"] == "Dropped 2 log lines behind a slow log stream"
+
+
+def test_drops_are_reported_once():
+    stream = io.StringIO()
+    writer = LogWriter(stream, max_lines=1)
+    writer.put("a")
+    writer.put("b")
+    writer.start()
+    writer.stop()
+
+    writer.put("c")
+    writer.start()
+    writer.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert [line for line in lines if not line.startswith("{")] == ["a", "c"]
+    assert len(lines) == 3
+    assert writer.dropped == 1
+
+
+def located(logger: logging.Logger, stack_info: bool = False) -> logging.LogRecord:
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append  # type: ignore[method-assign]
+    logger.addHandler(handler)
+    logger.propagate = False
+    if stack_info:
+        logger.warning("located", stack_info=True)
+    else:
+        structlog.wrap_logger(logger).warning("located")
+    return records[0]
+
+
+def test_the_caller_is_found_past_structlog(monkeypatch):
+    monkeypatch.setattr(app_logging._Logger, "find_caller", True)
+
+    record = located(app_logging._Logger("tests.caller"))
+
+    assert (record.filename, record.funcName) == (
+        "test_log_writer.py",
+        "located",
+    )
+    assert record.stack_info is None
+
+
+def test_the_caller_lookup_is_skipped_in_json_mode(monkeypatch):
+    monkeypatch.setattr(app_logging._Logger, "find_caller", False)
+
+    record = located(app_logging._Logger("tests.caller"))
+    assert (record.filename, record.lineno) == ("(unknown file)", 0)
+
+    record = located(app_logging._Logger("tests.caller"), stack_info=True)
+    assert record.funcName == "located"
+    assert "test_log_writer.py" in record.stack_info
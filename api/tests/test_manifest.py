@@ -0,0 +1,37 @@
+"""Tests for the precomputed route manifest."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.manifest import build_manifest, load_manifest, manifest_routes
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize("debug", [False, True])
+@pytest.mark.parametrize("metrics", [False, True])
+def test_manifest_lists_every_route(monkeypatch, debug, metrics):
+    # The manifest is the same whatever the environment sets
+    monkeypatch.setattr(settings, "DEBUG", debug)
+    monkeypatch.setattr(settings, "METRICS_ENABLED", metrics)
+
+    assert load_manifest() == build_manifest(
+        manifest_routes()
+    ), "route_manifest.json is out of date; run python -m app.manifest"
+    assert (settings.DEBUG, settings.METRICS_ENABLED) == (debug, metrics)
+
+
+def test_ping_endpoints_does_not_import_app():
+    code = "import sys, ping_endpoints; print('app.main' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,39 @@
+"""Tests for the Prometheus metrics middleware."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("prometheus_client")
+
+from app.core.metrics import REGISTRY, UNMATCHED_ROUTE  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_labeled_by_route_template():
+    route = "/api/v1/items/{item_id}"
+    before = sample("http_requests_total", method="GET", route=route, status="200")
+    unmatched = sample(
+        "http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404"
+    )
+
+    with TestClient(app, base_url="http://localhost") as client:
+        client.get("/api/v1/items/1")
+        client.get("/no/such/path")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "/api/v1/items/1" not in response.text
+    assert (
+        sample("http_requests_total", method="GET", route=route, status="200")
+        == before + 1
+    )
+    assert (
+        sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404")
+        == unmatched + 1
+    )
+    assert sample("http_requests_in_progress", method="GET", route=route) == 0
+    assert sample("http_response_size_bytes_count", method="GET", route=route) >= 1
@@ -0,0 +1,114 @@
+"""Tests for keyset cursors and NDJSON streaming on list endpoints."""
+
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.pagination import encode_cursor
+from app.core.config import settings
+from app.main import app
+
+ITEMS = 5
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+@pytest.fixture
+def owned(client):
+    """A fresh owner's ID and the IDs of the items it owns."""
+    response = client.post(
+        "/api/v1/users/",
+        json={"email": f"{uuid.uuid4().hex}@example.com", "name": "P", "password": "x"},
+    )
+    owner_id = response.json()["id"]
+    item_ids = [
+        client.post(
+            "/api/v1/items/", json={"title": str(n), "owner_id": owner_id}
+        ).json()["id"]
+        for n in range(ITEMS)
+    ]
+    return owner_id, item_ids
+
+
+def page_ids(response) -> list:
+    return [item["id"] for item in response.json()]
+
+
+def test_cursors_walk_every_page(client, owned):
+    owner_id, item_ids = owned
+    url = f"/api/v1/items/?owner_id={owner_id}&limit=2"
+
+    first = client.get(url)
+    assert page_ids(first) == item_ids[:2]
+    cursor = first.headers["X-Next-Cursor"]
+    assert cursor == encode_cursor(item_ids[1])
+    next_url = first.headers["Link"].partition(">")[0].lstrip("<")
+    assert first.headers["Link"].endswith('; rel="next"')
+
+    second = client.get(next_url)
+    assert page_ids(second) == item_ids[2:4]
+    assert client.get(f"{url}&after={cursor}").json() == second.json()
+
+    last = client.get(f"{url}&after={second.headers['X-Next-Cursor']}")
+    assert page_ids(last) == item_ids[4:]
+    assert "X-Next-Cursor" not in last.headers
+    assert "Link" not in last.headers
+
+
+def test_a_full_last_page_has_no_cursor(client, owned):
+    owner_id, item_ids = owned
+
+    response = client.get(f"/api/v1/items/?owner_id={owner_id}&limit={ITEMS}")
+
+    assert page_ids(response) == item_ids
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_a_cursor_outlives_the_record_it_points_at(client, owned):
+    owner_id, item_ids = owned
+    cursor = encode_cursor(item_ids[1])
+    client.delete(f"/api/v1/items/{item_ids[1]}")
+
+    response = client.get(f"/api/v1/items/?owner_id={owner_id}&after={cursor}")
+
+    assert page_ids(response) == item_ids[2:]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "!!", encode_cursor(1)[:-1]])
+def test_invalid_cursors_are_rejected(client, cursor):
+    response = client.get(f"/api/v1/items/?after={cursor}")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.parametrize("limit", [0, settings.PAGINATION_MAX_LIMIT + 1])
+def test_limits_outside_the_bounds_are_rejected(client, limit):
+    assert client.get(f"/api/v1/items/?limit={limit}").status_code == 422
+
+
+def test_ndjson_streams_every_record_in_chunks(client, owned, monkeypatch):
+    owner_id, item_ids = owned
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 2)
+    headers = {"Accept": "application/x-ndjson"}
+    url = f"/api/v1/items/?owner_id={owner_id}"
+
+    response = client.get(url, headers=headers)
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "X-Next-Cursor" not in response.headers
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == item_ids
+    assert json.loads(lines[0])["title"] == "0"
+
+    after = encode_cursor(item_ids[0])
+    response = client.get(f"{url}&after={after}&limit=3", headers=headers)
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == (
+        item_ids[1:4]
+    )
@@ -0,0 +1,123 @@
+"""Tests for process-pool password hashing."""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.passwords import PasswordHasher, PasswordHashingBusy
+from app.services.users import user_repository
+
+
+@pytest.fixture
+async def hasher():
+    # bcrypt cost 12 takes a few hundred ms per hash, long enough to measure
+    hasher = PasswordHasher(rounds=12, workers=1, queue_timeout=30)
+    await hasher.start()
+    yield hasher
+    hasher.close()
+
+
+async def test_hash_and_verify(hasher: PasswordHasher):
+    hashed = await hasher.hash("correct horse")
+
+    assert hashed.startswith("$2b$12$")
+    assert await hasher.verify("correct horse", hashed)
+    assert not await hasher.verify("battery staple", hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=13).needs_rehash(hashed)
+
+
+async def test_hash_many_keeps_order():
+    hasher = PasswordHasher(rounds=4, workers=1, max_concurrency=2)
+    try:
+        passwords = [f"secret-{i}" for i in range(40)]
+        hashed = await hasher.hash_many(passwords)
+        assert len(hashed) == 40
+        assert all([await hasher.verify(p, h) for p, h in zip(passwords, hashed)])
+    finally:
+        hasher.close()
+
+
+async def test_event_loop_stays_responsive_while_hashing(hasher: PasswordHasher):
+    lags = []
+
+    async def ticker(stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(hasher.hash(f"pw{i}") for i in range(3)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+
+    # Hashing inline would have stalled the loop for the whole time
+    assert elapsed > 0.2
+    assert len(lags) > 10
+    assert max(lags) < 0.05
+
+
+async def test_queue_timeout_rejects_when_saturated():
+    hasher = PasswordHasher(rounds=12, workers=1, queue_timeout=0.05)
+    try:
+        await hasher.start()
+        first = asyncio.create_task(hasher.hash("first"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordHashingBusy):
+            await hasher.hash("second")
+        assert (await first).startswith("$2b$")
+    finally:
+        hasher.close()
+
+
+async def test_a_single_hash_gets_a_slot_while_a_batch_runs():
+    hasher = PasswordHasher(rounds=10, workers=2, max_concurrency=2)
+    try:
+        await hasher.start()
+        batch = asyncio.create_task(hasher.hash_many([f"pw{i}" for i in range(32)]))
+        await asyncio.sleep(0.05)
+
+        assert (await hasher.hash("single")).startswith("$2b$10$")
+        assert not batch.done()
+        assert all(await batch)
+    finally:
+        hasher.close()
+
+
+async def test_hash_many_returns_none_for_chunks_without_a_slot():
+    hasher = PasswordHasher(rounds=12, workers=1, queue_timeout=0.05)
+    try:
+        await hasher.start()
+        first = asyncio.create_task(hasher.hash("first"))
+        await asyncio.sleep(0)
+
+        assert await hasher.hash_many(["a", "b"]) == [None, None]
+        await first
+        assert all(await hasher.hash_many(["a", "b"]))
+    finally:
+        hasher.close()
+
+
+def test_created_user_stores_a_hash():
+    with TestClient(app, base_url="http://localhost") as client:
+        response = client.post(
+            "/api/v1/users/",
+            json={"email": "hashed@example.com", "name": "H", "password": "s3cret"},
+        )
+        user_id = response.json()["id"]
+        created = dict(asyncio.run(user_repository.get(user_id)))
+        client.put(f"/api/v1/users/{user_id}", json={"password": "n3w"})
+        updated = asyncio.run(user_repository.get(user_id))
+
+    assert "hashed_password" not in response.json()
+    assert created["hashed_password"].startswith("$2b$04$")
+    assert updated["hashed_password"] != created["hashed_password"]
+    assert "password" not in updated
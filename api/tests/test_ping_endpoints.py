@@ -0,0 +1,88 @@
+"""Tests for the load mode of ping_endpoints.py."""
+
+import sys
+
+import httpx
+import pytest
+
+import ping_endpoints
+from app.main import app
+from ping_endpoints import EndpointTester, parse_args
+
+ENDPOINTS = [
+    {"path": "/api/v1/health/live", "methods": ["GET"]},
+    {"path": "/api/v1/missing/{thing_id}", "methods": ["GET", "PUT"]},
+    {"path": "/api/v1/items/", "methods": ["POST"]},
+]
+
+
+@pytest.fixture
+def tester():
+    tester = EndpointTester("http://localhost")
+    tester.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    return tester
+
+
+def test_duration_defaults_only_without_a_request_count(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["ping_endpoints.py", "--load"])
+    args = parse_args()
+    assert (args.load, args.users, args.duration, args.requests) == (
+        True,
+        10,
+        10.0,
+        None,
+    )
+
+    argv = ["ping_endpoints.py", "--load", "--users", "4", "--requests", "50"]
+    monkeypatch.setattr(sys, "argv", argv + ["--rate", "200"])
+    args = parse_args()
+    assert (args.users, args.duration, args.requests, args.rate) == (4, None, 50, 200)
+
+
+async def test_closed_loop_load_counts_every_request(tester, capsys):
+    load = await tester.run_load(ENDPOINTS, users=4, duration=None, total_requests=20)
+
+    assert load["config"]["mode"] == "closed"
+    assert [route["endpoint"] for route in load["routes"]] == [
+        "/api/v1/health/live",
+        "/api/v1/missing/{thing_id}",
+    ]
+    health, missing = load["routes"]
+    assert (health["requests"], health["errors"]) == (10, 0)
+    assert health["status_codes"] == {"200": 10}
+    assert (missing["requests"], missing["errors"]) == (10, 10)
+    assert missing["status_codes"] == {"404": 10}
+
+    total = load["total"]
+    assert (total["requests"], total["errors"]) == (20, 10)
+    assert total["status_codes"] == {"200": 10, "404": 10}
+    assert 0 < total["p50_ms"] <= total["p99_ms"] <= total["p99.9_ms"]
+    assert total["throughput_rps"] > 0
+
+    tester.display_load_table(load)
+    output = capsys.readouterr().out
+    assert "LOAD TEST RESULTS" in output
+    assert "TOTAL" in output
+    assert "rate limited" not in output
+
+
+async def test_open_loop_load_sends_at_the_given_rate(tester):
+    load = await tester.run_load(
+        ENDPOINTS[:1], duration=None, total_requests=10, rate=200
+    )
+
+    assert load["config"]["mode"] == "open"
+    assert load["total"]["requests"] == 10
+    # Ten arrivals 5 ms apart take at least 45 ms
+    assert load["config"]["elapsed_s"] >= 0.045
+
+
+def test_rate_limited_runs_are_flagged(capsys, monkeypatch):
+    monkeypatch.setattr(ping_endpoints.console, "width", 200)
+    route = EndpointTester._summarize(
+        "/", [1_000_000], {"errors": 1, "status_codes": {429: 1}}, 1.0
+    )
+
+    EndpointTester().display_load_table({"routes": [route], "total": route})
+
+    assert "1 requests were rate limited" in capsys.readouterr().out
@@ -0,0 +1,108 @@
+"""Tests for the sliding-window rate limiter and its middleware."""
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core import rate_limit
+from app.core.rate_limit import MemoryRateLimiter, RateLimitMiddleware
+
+LIMIT = 2
+WINDOW = 10
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter():
+    return MemoryRateLimiter(limit=LIMIT, window=WINDOW, max_clients=3)
+
+
+@pytest.fixture
+async def client(limiter):
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = RateLimitMiddleware(
+        Starlette(routes=[Route("/", ok), Route("/health", ok)]),
+        limiter=limiter,
+        exempt_paths=["/health"],
+        trust_forwarded=True,
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        yield client
+
+
+def get(client, ip="10.0.0.1", path="/"):
+    return client.get(path, headers={"X-Forwarded-For": ip})
+
+
+async def test_requests_over_the_limit_get_429(client, clock):
+    first = await get(client)
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == str(LIMIT)
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert (await get(client)).status_code == 200
+
+    rejected = await get(client)
+
+    assert rejected.status_code == 429
+    assert rejected.json() == {"detail": "Too Many Requests"}
+    assert rejected.headers["Retry-After"] == str(WINDOW)
+    assert rejected.headers["X-RateLimit-Remaining"] == "0"
+
+
+async def test_the_window_slides_and_resets(client, clock):
+    for _ in range(LIMIT):
+        await get(client)
+
+    # The full previous window still counts at the start of the next one
+    clock.now += WINDOW
+    rejected = await get(client)
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == str(WINDOW // 2)
+
+    # Half of it has decayed, which leaves room for one request
+    clock.now += WINDOW / 2
+    assert (await get(client)).status_code == 200
+    assert (await get(client)).status_code == 429
+
+    clock.now += 2 * WINDOW
+    assert (await get(client)).status_code == 200
+
+
+async def test_clients_are_limited_separately(client, clock):
+    for _ in range(LIMIT):
+        await get(client, "10.0.0.1")
+    assert (await get(client, "10.0.0.1")).status_code == 429
+
+    assert (await get(client, "10.0.0.2")).status_code == 200
+    # Exempt paths are never counted
+    assert (await get(client, "10.0.0.1", "/health")).status_code == 200
+
+
+async def test_least_recently_seen_clients_are_evicted(client, clock, limiter):
+    for _ in range(LIMIT):
+        await get(client, "10.0.0.1")
+    for ip in ("10.0.0.2", "10.0.0.3", "10.0.0.4"):
+        await get(client, ip)
+
+    assert len(limiter) == limiter.max_clients
+    # The first client was dropped, so its count starts over
+    assert (await get(client, "10.0.0.1")).status_code == 200
@@ -0,0 +1,93 @@
+"""Tests for the in-memory repository's IDs and index upkeep."""
+
+import pytest
+
+from app.services.repository import DuplicateKeyError, InMemoryRepository
+
+
+def make_repository() -> InMemoryRepository:
+    return InMemoryRepository(unique_fields=("email",), index_fields=("owner_id",))
+
+
+async def ids(repository: InMemoryRepository, **kwargs) -> list:
+    return [record["id"] for record in await repository.list(**kwargs)]
+
+
+async def test_ids_are_allocated_in_order_and_never_reused():
+    repository = make_repository()
+    first = await repository.create({"email": "a", "owner_id": 1, "id": 99})
+    second = await repository.create({"email": "b", "owner_id": 1})
+
+    assert (first["id"], second["id"]) == (1, 2)
+    assert await repository.delete(2)
+    third = await repository.create({"email": "c", "owner_id": 1})
+
+    assert third["id"] == 3
+    assert repository.last_id == 3
+
+
+async def test_seeded_ids_advance_the_allocator_and_keep_id_order():
+    repository = InMemoryRepository([{"id": 10}, {"id": 4}])
+
+    assert (await repository.create({}))["id"] == 11
+    assert await ids(repository) == [4, 10, 11]
+    with pytest.raises(DuplicateKeyError):
+        InMemoryRepository([{"id": 1}, {"id": 1}])
+
+
+async def test_updates_move_unique_and_secondary_index_entries():
+    repository = make_repository()
+    record = await repository.create({"email": "a", "owner_id": 1})
+    await repository.create({"email": "b", "owner_id": 1})
+
+    await repository.update(record["id"], {"email": "c", "owner_id": 2})
+
+    assert await repository.get_by("email", "a") is None
+    assert (await repository.get_by("email", "c"))["id"] == record["id"]
+    assert await ids(repository, filters={"owner_id": 1}) == [2]
+    assert await ids(repository, filters={"owner_id": 2}) == [1]
+    # The freed value can be taken by another record
+    assert (await repository.create({"email": "a", "owner_id": 3}))["id"] == 3
+
+
+async def test_a_rejected_update_leaves_the_indexes_alone():
+    repository = make_repository()
+    record = await repository.create({"email": "a", "owner_id": 1})
+    await repository.create({"email": "b", "owner_id": 1})
+
+    with pytest.raises(DuplicateKeyError):
+        await repository.update(record["id"], {"email": "b", "owner_id": 2})
+
+    assert await repository.get(record["id"]) == record
+    assert (await repository.get_by("email", "a"))["id"] == record["id"]
+    assert await ids(repository, filters={"owner_id": 1}) == [1, 2]
+    assert await ids(repository, filters={"owner_id": 2}) == []
+
+
+async def test_deletes_drop_index_entries():
+    repository = make_repository()
+    record = await repository.create({"email": "a", "owner_id": 1})
+
+    assert await repository.delete(record["id"])
+    assert not await repository.delete(record["id"])
+
+    assert await repository.get_by("email", "a") is None
+    assert await ids(repository, filters={"owner_id": 1}) == []
+    # Emptied value sets are removed rather than left behind
+    assert repository._indexes["owner_id"] == {}
+    await repository.create({"email": "a", "owner_id": 1})
+
+
+async def test_tombstones_are_compacted_once_they_outnumber_live_rows():
+    repository = InMemoryRepository({"id": i} for i in range(1, 201))
+
+    for record_id in range(1, 101):
+        await repository.delete(record_id)
+    # 100 tombstones among 100 live rows stay under the threshold
+    assert len(repository._ids) == 200
+    assert await ids(repository, after=50, limit=3) == [101, 102, 103]
+
+    await repository.delete_many(list(range(101, 180)))
+
+    assert repository._ids == list(range(180, 201))
+    assert await ids(repository, after=100, limit=3) == [180, 181, 182]
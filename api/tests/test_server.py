@@ -0,0 +1,160 @@
+"""Tests for the production server entry point."""
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.server import (
+    WorkerOptions,
+    WorkerServer,
+    WorkerSupervisor,
+    build_config,
+    request_limit,
+    safe_worker_count,
+    worker_count,
+)
+
+
+def test_worker_count_defaults_to_usable_cpus():
+    assert worker_count(3) == 3
+    assert worker_count(None) == len(os.sched_getaffinity(0))
+
+
+def test_in_process_state_runs_a_single_worker(monkeypatch):
+    monkeypatch.setattr(settings, "STORE_PATH", "/srv/data")
+    monkeypatch.setattr(settings, "DATABASE_URL", None)
+    monkeypatch.setattr(settings, "SERVER_WORKERS", None)
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", {"SECRET_KEY"})
+    assert safe_worker_count(8) == 1
+
+    monkeypatch.setattr(settings, "STORE_PATH", None)
+    assert safe_worker_count(8) == 1
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    with pytest.raises(SystemExit, match="DATABASE_URL"):
+        safe_worker_count(4)
+
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite:///db.sqlite")
+    assert safe_worker_count(4) == 4
+
+
+def test_a_generated_secret_key_runs_a_single_worker(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite:///db.sqlite")
+    monkeypatch.setattr(settings, "SERVER_WORKERS", None)
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", set())
+    assert safe_worker_count(8) == 1
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    with pytest.raises(SystemExit, match="SECRET_KEY"):
+        safe_worker_count(4)
+    assert safe_worker_count(1) == 1
+
+
+def test_request_limit_adds_jitter():
+    assert request_limit(0, 50) == 0
+    assert request_limit(100, 0) == 100
+    limits = {request_limit(100, 10) for _ in range(200)}
+    assert min(limits) >= 100 and max(limits) <= 110
+    assert len(limits) > 1
+
+
+def test_build_config_reads_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_BACKLOG", 4096)
+    monkeypatch.setattr(settings, "SERVER_KEEP_ALIVE_TIMEOUT", 15)
+    monkeypatch.setattr(settings, "SERVER_GRACEFUL_TIMEOUT", 7)
+    monkeypatch.setattr(settings, "SERVER_HTTP", "h11")
+
+    config = build_config(4)
+
+    assert config.workers == 4
+    assert config.backlog == 4096
+    assert config.timeout_keep_alive == 15
+    assert config.timeout_graceful_shutdown == 7
+    assert config.http == "h11"
+    # Workers recycle through the supervisor, never on their own
+    assert config.limit_max_requests is None
+
+
+@pytest.mark.parametrize("served, retired", [(9, False), (10, True)])
+async def test_worker_asks_to_retire_at_its_limit(served: int, retired: bool):
+    retire = threading.Event()
+    server = WorkerServer(build_config(1), threading.Event(), retire, 10)
+    server.server_state.total_requests = served
+
+    should_exit = await server.on_tick(1)
+
+    assert retire.is_set() is retired
+    assert should_exit is False
+
+
+class FakeWorker:
+    """Stands in for a worker process; ``exited`` is set once it stops."""
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.ready = threading.Event()
+        self.retire = threading.Event()
+        self.exited = threading.Event()
+        self.terminated = False
+        self.process = self
+
+    def is_alive(self, timeout: float = 5) -> bool:
+        return not self.exited.is_set()
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+    def join(self) -> None:
+        assert self.exited.is_set(), "join() would block"
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    # Keep uvicorn from installing its signal handlers in the test process
+    monkeypatch.setattr(signal, "signal", lambda *args: None)
+    supervisor = WorkerSupervisor(
+        build_config(2), [], WorkerOptions(), ready_timeout=60
+    )
+    pids = iter(range(100, 200))
+    monkeypatch.setattr(supervisor, "spawn_worker", lambda: FakeWorker(next(pids)))
+    supervisor.processes = [FakeWorker(1), FakeWorker(2)]
+    return supervisor
+
+
+def test_rolling_restart_never_blocks_the_supervisor(supervisor):
+    old = list(supervisor.processes)
+    supervisor.restart_all()
+
+    start = time.perf_counter()
+    for _ in range(3):
+        supervisor.keep_subprocess_alive()
+    assert time.perf_counter() - start < 1
+    # The first replacement is starting; both old workers still serve
+    assert supervisor.processes == old
+    new = supervisor.replacing[1]
+
+    new.ready.set()
+    supervisor.keep_subprocess_alive()
+    assert supervisor.processes == [new, old[1]]
+    assert old[0].terminated and supervisor.stopping == [old[0]]
+
+    old[0].exited.set()
+    supervisor.keep_subprocess_alive()
+    assert supervisor.stopping == []
+    assert supervisor.replacing[0] == 1
+
+
+def test_a_worker_not_ready_in_time_still_replaces_the_old_one(supervisor):
+    supervisor.ready_timeout = 0
+    supervisor.processes[1].retire.set()
+
+    supervisor.keep_subprocess_alive()
+    new = supervisor.replacing[1]
+    supervisor.keep_subprocess_alive()
+
+    assert supervisor.processes[1] is new
+    assert supervisor.replacing is None
@@ -0,0 +1,162 @@
+"""Tests for the SQLAlchemy repository against aiosqlite."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.db.base import Base  # noqa: E402
+from app.models import Item, User  # noqa: E402
+from app.services.repository import (  # noqa: E402
+    DuplicateKeyError,
+    VersionConflictError,
+)
+from app.services.sql_repository import SQLRepository  # noqa: E402
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def users(sessions) -> SQLRepository:
+    return SQLRepository(User, unique_fields=("email",), sessions=sessions)
+
+
+@pytest.fixture
+def items(sessions) -> SQLRepository:
+    return SQLRepository(Item, sessions=sessions)
+
+
+def user(n: int, **fields) -> dict:
+    now = datetime(2026, 1, 1)
+    return {
+        "email": f"user{n}@example.com",
+        "name": f"User {n}",
+        "created_at": now,
+        "updated_at": now,
+        **fields,
+    }
+
+
+def item(owner_id: int, **fields) -> dict:
+    now = datetime(2026, 1, 1)
+    return {
+        "title": "t",
+        "owner_id": owner_id,
+        "created_at": now,
+        "updated_at": now,
+        **fields,
+    }
+
+
+async def test_create_get_and_get_by(users):
+    created = await users.create(user(1, id=99, version=7))
+
+    assert created["id"] == 1
+    assert created["version"] == 1
+    assert created["is_active"] is True
+    assert await users.get(1) == created
+    assert await users.get_by("email", "user1@example.com") == created
+    assert await users.get(2) is None
+    with pytest.raises(DuplicateKeyError) as duplicate:
+        await users.create(user(1))
+    assert duplicate.value.field == "email"
+
+
+async def test_updates_bump_the_version_and_check_it(users):
+    created = await users.create(user(1))
+
+    updated = await users.update(created["id"], {"name": "New", "version": 9})
+
+    assert (updated["name"], updated["version"]) == ("New", 2)
+    assert await users.get(created["id"]) == updated
+    with pytest.raises(VersionConflictError) as conflict:
+        await users.update(created["id"], {"name": "Stale"}, expected_version=1)
+    assert conflict.value.actual == 2
+    assert (await users.update(created["id"], {"name": "Ok"}, 2))["version"] == 3
+    assert await users.update(404, {"name": "x"}) is None
+
+    await users.create(user(2))
+    with pytest.raises(DuplicateKeyError):
+        await users.update(created["id"], {"email": "user2@example.com"})
+
+
+async def test_deletes_check_the_version(users):
+    created = await users.create(user(1))
+    await users.update(created["id"], {"name": "New"})
+
+    with pytest.raises(VersionConflictError) as conflict:
+        await users.delete(created["id"], expected_version=1)
+    assert conflict.value.actual == 2
+    assert await users.delete(created["id"], expected_version=2)
+    assert not await users.delete(created["id"])
+    assert not await users.delete(created["id"], expected_version=2)
+
+
+async def test_list_pages_and_filters(items):
+    for n in range(6):
+        await items.create(item(n % 2, is_active=n != 3))
+    await items.delete(2)
+
+    def ids(rows):
+        return [row["id"] for row in rows]
+
+    assert ids(await items.list()) == [1, 3, 4, 5, 6]
+    assert ids(await items.list(after=1, limit=2)) == [3, 4]
+    assert ids(await items.list(after=6)) == []
+    assert ids(await items.list(filters={"owner_id": 1})) == [4, 6]
+    assert ids(await items.list(filters={"owner_id": 1, "is_active": True})) == [6]
+    assert ids(await items.list(after=4, filters={"owner_id": 0})) == [5]
+
+
+async def test_collection_version_changes_on_every_write(items):
+    first = await items.create(item(1))
+    versions = [await items.collection_version()]
+    await items.create(item(1))
+    versions.append(await items.collection_version())
+    await items.update(first["id"], {"updated_at": datetime(2026, 1, 2)})
+    versions.append(await items.collection_version())
+    await items.delete(first["id"])
+    versions.append(await items.collection_version())
+
+    assert len(set(versions)) == len(versions)
+    assert await items.collection_version() == versions[-1]
+
+
+async def test_batches_report_each_row(users):
+    first = await users.create(user(1))
+
+    created = await users.create_many([user(2), user(1), user(2), user(3)])
+    assert [type(row).__name__ for row in created] == [
+        "dict",
+        "DuplicateKeyError",
+        "DuplicateKeyError",
+        "dict",
+    ]
+
+    updated = await users.update_many(
+        [(first["id"], {"name": "A"}), (created[0]["id"], {"name": "B"}), (404, {})],
+        [1, 5, None],
+    )
+    assert updated[0]["version"] == 2
+    assert isinstance(updated[1], VersionConflictError)
+    assert updated[2] is None
+
+    assert await users.delete_many([first["id"], first["id"], 404]) == [
+        True,
+        False,
+        False,
+    ]
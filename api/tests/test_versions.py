@@ -0,0 +1,142 @@
+"""Tests for per-record versions and compare-and-swap writes."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.repository import InMemoryRepository, VersionConflictError
+
+
+@pytest.fixture
+def client():
+    with TestClient(app, base_url="http://localhost") as client:
+        yield client
+
+
+def new_item(client, title="v") -> dict:
+    response = client.post("/api/v1/items/", json={"title": title})
+    response.raise_for_status()
+    return response.json()
+
+
+async def test_updates_bump_the_version_and_copy_the_record():
+    repository = InMemoryRepository([{"id": 1, "n": 0}], index_fields=("n",))
+    before = await repository.get(1)
+
+    after = await repository.update(1, {"n": 1, "version": 99}, expected_version=1)
+
+    assert before == {"id": 1, "n": 0, "version": 1}
+    assert after == {"id": 1, "n": 1, "version": 2}
+    assert await repository.list(filters={"n": 1}) == [after]
+    with pytest.raises(VersionConflictError) as conflict:
+        await repository.update(1, {"n": 2}, expected_version=1)
+    assert conflict.value.actual == 2
+    with pytest.raises(VersionConflictError):
+        await repository.delete(1, expected_version=1)
+    assert await repository.delete(1, expected_version=2)
+
+
+async def test_concurrent_read_modify_write_loses_nothing():
+    records, updaters = 20, 2_000
+    repository = InMemoryRepository([{"id": i, "n": 0} for i in range(records)])
+    conflicts = 0
+
+    async def increment(record_id: int) -> None:
+        nonlocal conflicts
+        while True:
+            record = await repository.get(record_id)
+            # Let every other updater read the same version first
+            await asyncio.sleep(0)
+            try:
+                await repository.update(
+                    record_id, {"n": record["n"] + 1}, record["version"]
+                )
+                return
+            except VersionConflictError:
+                conflicts += 1
+
+    await asyncio.gather(*(increment(i % records) for i in range(updaters)))
+
+    per_record = updaters // records
+    for record in repository:
+        assert (record["n"], record["version"]) == (per_record, per_record + 1)
+    assert conflicts > 0
+
+
+async def test_update_many_reports_conflicts_per_row():
+    repository = InMemoryRepository([{"id": 1, "n": 0}, {"id": 2, "n": 0}])
+
+    results = await repository.update_many(
+        [(1, {"n": 1}), (2, {"n": 1}), (3, {"n": 1})], [1, 5, None]
+    )
+
+    assert results[0]["version"] == 2
+    assert isinstance(results[1], VersionConflictError)
+    assert results[2] is None
+    assert (await repository.get(2))["n"] == 0
+
+
+def test_if_match_and_body_versions(client):
+    item = new_item(client)
+    assert item["version"] == 1
+    etag = client.get(f"/api/v1/items/{item['id']}").headers["ETag"]
+    url = f"/api/v1/items/{item['id']}"
+
+    updated = client.put(url, json={"title": "a"}, headers={"If-Match": etag})
+    assert updated.json()["version"] == 2
+    assert updated.headers["ETag"] != etag
+
+    stale = client.put(url, json={"title": "b"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    conflict = client.put(url, json={"title": "b", "version": 1})
+    assert conflict.status_code == 409
+    assert "version 2" in conflict.json()["detail"]
+    assert client.put(url, json={"title": "b", "version": 2}).status_code == 200
+
+    assert client.delete(url, headers={"If-Match": etag}).status_code == 412
+    current = client.get(url).headers["ETag"]
+    assert client.delete(url, headers={"If-Match": current}).status_code == 204
+
+
+def test_batch_rows_with_stale_versions_fail(client):
+    item = new_item(client)
+    client.put(f"/api/v1/items/{item['id']}", json={"title": "moved on"})
+
+    body = client.patch(
+        "/api/v1/items:batch", json=[{"id": item["id"], "title": "x", "version": 1}]
+    ).json()
+
+    assert [row["status"] for row in body["results"]] == [409]
+    assert client.get(f"/api/v1/items/{item['id']}").json()["title"] == "moved on"
+
+
+async def test_concurrent_clients_retry_instead_of_overwriting():
+    clients = 50
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://localhost"
+    ) as http:
+        item = (await http.post("/api/v1/items/", json={"title": "0"})).json()
+        url = f"/api/v1/items/{item['id']}"
+
+        async def increment() -> None:
+            while True:
+                current = (await http.get(url)).json()
+                response = await http.put(
+                    url,
+                    json={
+                        "title": str(int(current["title"]) + 1),
+                        "version": current["version"],
+                    },
+                )
+                if response.status_code != 409:
+                    response.raise_for_status()
+                    return
+
+        await asyncio.gather(*(increment() for _ in range(clients)))
+        final = (await http.get(url)).json()
+
+    assert (final["title"], final["version"]) == (str(clients), clients + 1)